@@ -0,0 +1,85 @@
+"""
+Memory of a 100k-run enriched history, with the plain dtypes and with compact_enriched.
+Reports DataFrame.memory_usage(deep=True) and, when it can be read (psutil or /proc),
+the growth of resident memory (RSS) from loading the history the way the app does:
+from a ColumnStore, in a fresh process per variant so one does not pad the other.
+
+    python -m benchmarks.bench_compact_memory
+"""
+import gc
+import os
+import tempfile
+import multiprocessing
+import numpy as np
+import pandas as pd
+from core.analytics.history_store import ColumnStore
+from core.analytics.schema import FLAG_BITS, RANK_FLAGS, FLOAT32_COLUMNS, INT32_COLUMNS, compact_enriched, unpack_flags
+
+MB = 1024 ** 2
+
+def rss_bytes():
+    """Resident set size of this process, None where neither psutil nor /proc is available."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError: pass
+    try:
+        with open('/proc/self/statm', 'r') as f: return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError): return None
+
+def make_history(runs):
+    """Enriched history as enrich_history_with_stats leaves it (object strings, float64 / int64, bool flags)."""
+    rng = np.random.default_rng(0)
+    names = np.array([f"Scenario {i} {m}" for i in range(300) for m in ['', 'Small', 'Fast 120%']])
+    sessions = np.sort(rng.integers(0, 2000, runs))
+    df = pd.DataFrame({
+        'Scenario': names[rng.integers(0, len(names), runs)].astype(object),
+        'Score': rng.integers(200, 5000, runs) + rng.integers(0, 10, runs) / 10.0,
+        'Sens': rng.choice([25.0, 30.0, 32.5, 35.0, 40.0], runs),
+        'Timestamp': pd.Timestamp('2024-01-01') + pd.to_timedelta(np.sort(rng.integers(0, 10 ** 8, runs)), unit='s'),
+        'Duration': np.full(runs, 60.0),
+        'SessionID': sessions,
+        'Scen_Start_SessID': sessions,
+        'Combo_Start_SessID': sessions,
+    })
+    for name in FLAG_BITS:
+        df[name] = rng.random(runs) < 0.2
+        if name in RANK_FLAGS: df[name] = df[name].astype(int)
+    return df
+
+def load_rss(root, compact):
+    """RSS growth from loading the stored history (run in a child process)."""
+    store = ColumnStore(root)
+    gc.collect()
+    start = rss_bytes()
+    if compact: df = compact_enriched(store.load(mmap=False, categorical=('Scenario',)))
+    else: df = store.load(mmap=False)
+    gc.collect()
+    end = rss_bytes()
+    return None if start is None or end is None else end - start, len(df)
+
+def main(runs=100000):
+    df = make_history(runs)
+    compact = compact_enriched(df.copy())
+    before, after = df.memory_usage(deep=True), compact.memory_usage(deep=True)
+
+    print("memory_usage(deep=True)")
+    for col in ['Scenario'] + FLOAT32_COLUMNS + INT32_COLUMNS:
+        print(f"{col:>20} | {before[col] / MB:7.2f} MB -> {after[col] / MB:7.2f} MB")
+    flags_before = sum(before[name] for name in FLAG_BITS)
+    print(f"{'Is_* / Rank_*':>20} | {flags_before / MB:7.2f} MB -> {after['Flags'] / MB:7.2f} MB (Flags)")
+    restored = unpack_flags(compact)
+    same = all(np.array_equal(restored[col].to_numpy(dtype=object), df[col].to_numpy(dtype=object)) for col in df.columns)
+    print(f"{'total':>20} | {before.sum() / MB:7.2f} MB -> {after.sum() / MB:7.2f} MB | lossless: {same}")
+
+    with tempfile.TemporaryDirectory() as folder:
+        ColumnStore(folder).write(df)
+        ctx = multiprocessing.get_context('spawn')
+        rss = {}
+        for mode in [False, True]:
+            with ctx.Pool(1) as pool: rss[mode] = pool.apply(load_rss, (folder, mode))[0]
+    if rss[False] is None: print("RSS: not available here (needs psutil or /proc)")
+    else: print(f"RSS growth loading {runs} runs | {rss[False] / MB:7.2f} MB -> {rss[True] / MB:7.2f} MB")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Grid colouring: the per-cell QColor path the highlight modes used before the shared
+palette, against get_color_indices + palette lookups, on a 100 x 50 grid.
+
+    python -m benchmarks.bench_grid_colors
+"""
+import time
+import numpy as np
+import pandas as pd
+from PyQt6.QtGui import QColor
+from modules.dashboard.strategies import HIGHLIGHT_MODES, HLNone, get_palette
+
+def legacy_cell_color(mode, val, ctx, setting):
+    """The per-cell QColor the highlight modes returned before the palette."""
+    if mode.name in ("Row Heatmap", "Global Heatmap"):
+        lo, hi = (ctx['r_min'], ctx['r_max']) if mode.name == "Row Heatmap" else (ctx['g_min'], ctx['g_max'])
+        if hi <= lo: return None
+        ratio = max(0.0, min(1.0, (val - lo) / (hi - lo)))
+        c_red, c_yel, c_grn = np.array([120, 47, 47]), np.array([122, 118, 50]), np.array([54, 107, 54])
+        if ratio < 0.5: res = (1 - ratio * 2) * c_red + ratio * 2 * c_yel
+        else: res = (1 - (ratio - 0.5) * 2) * c_yel + (ratio - 0.5) * 2 * c_grn
+        return QColor(int(res[0]), int(res[1]), int(res[2]))
+    if mode.name == "Performance Drop":
+        return QColor(89, 32, 32) if ctx.get('prev_val') is not None and val < ctx['prev_val'] else None
+    if mode.name == "Target Score":
+        return QColor(46, 105, 49) if val >= setting else QColor(83, 31, 31)
+    if mode.name == "Recent Success":
+        recent = ctx.get('recent_max')
+        if recent is None or pd.isna(recent): return None
+        return QColor(46, 105, 49) if recent >= val else QColor(83, 31, 31)
+    return None
+
+def main(rows=100, cols=50, repeats=5):
+    rng = np.random.default_rng(0)
+    vals = rng.normal(3000, 600, (rows, cols)).round(1)
+    vals[rng.random(vals.shape) < 0.2] = np.nan # Sensitivities a scenario was never played at
+    recent = np.where(rng.random(vals.shape) < 0.5, vals + rng.normal(0, 300, vals.shape), np.nan)
+    prev = np.full(vals.shape, np.nan)
+    prev[1:] = vals[:-1]
+    filled = np.argwhere(~np.isnan(vals))
+    row_min, row_max = np.nanmin(vals, axis=1), np.nanmax(vals, axis=1)
+    g_min, g_max = np.nanmin(vals), np.nanmax(vals)
+    palette = get_palette()
+
+    for mode in [cls() for cls in HIGHLIGHT_MODES if cls is not HLNone]:
+        setting = 3000
+
+        t = time.perf_counter()
+        for _ in range(repeats):
+            old = {}
+            for r, c in filled: # What the model did for every painted cell
+                ctx = {'r_min': row_min[r], 'r_max': row_max[r], 'g_min': g_min, 'g_max': g_max,
+                       'prev_val': None if np.isnan(prev[r, c]) else prev[r, c], 'recent_max': recent[r, c]}
+                old[r, c] = legacy_cell_color(mode, vals[r, c], ctx, setting)
+        t_old = (time.perf_counter() - t) / repeats
+
+        t = time.perf_counter()
+        for _ in range(repeats):
+            ctx = {'r_min': row_min[:, None], 'r_max': row_max[:, None], 'g_min': g_min, 'g_max': g_max,
+                   'prev_val': prev, 'recent_max': recent}
+            indices = mode.get_color_indices(vals, ctx, setting)
+        t_indices = (time.perf_counter() - t) / repeats
+        t = time.perf_counter()
+        for _ in range(repeats): # What GridModel.data() does for every painted cell
+            new = {(r, c): palette[indices[r, c]] if indices[r, c] >= 0 else None for r, c in filled}
+        t_lookup = (time.perf_counter() - t) / repeats
+
+        same_cells = all((old[k] is None) == (new[k] is None) for k in old)
+        max_diff = max([0] + [int(np.abs(np.subtract(old[k].getRgb()[:3], new[k].color().getRgb()[:3])).max())
+                              for k in old if old[k] is not None and new[k] is not None])
+        print(f"{rows}x{cols} ({len(filled)} cells) | {mode.name:>16} | per-cell {t_old * 1000:7.2f} ms"
+              f" | indices {t_indices * 1000:5.2f} ms + lookups {t_lookup * 1000:5.2f} ms | same cells: {same_cells} | max RGB diff: {max_diff}")
+
+if __name__ == '__main__':
+    main()
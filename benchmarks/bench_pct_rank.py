@@ -0,0 +1,39 @@
+"""
+Expanding percentile rank (the Rank_* columns): pandas' grouped expanding().rank(pct=True)
+against kernels.expanding_pct_rank, 100k runs split into groups of different lengths.
+The kernel's win is on short groups (most combos). Groups longer than KERNEL_MAX_GROUP
+are ranked by pandas too, so there both take about the same time.
+
+    python -m benchmarks.bench_pct_rank
+"""
+import time
+import numpy as np
+import pandas as pd
+from core.analytics.kernels import expanding_pct_rank
+
+def main():
+    rng = np.random.default_rng(0)
+    for size in [10, 300, 1000, 50000, 'mixed']:
+        if size == 'mixed':
+            # Realistic spread: many short combos, a few played for thousands of runs
+            lengths = np.r_[rng.integers(1, 60, 2000), rng.integers(1000, 8000, 5)]
+            codes = rng.permutation(np.repeat(np.arange(len(lengths)), lengths))
+            groups, size = len(lengths), f"~{len(codes) // len(lengths)}"
+        else:
+            groups = max(1, 100000 // size) if size < 50000 else 1
+            codes = np.repeat(np.arange(groups), size)
+        values = rng.integers(500, 1500, len(codes)).astype(np.float64)
+
+        t = time.perf_counter()
+        expected = pd.Series(values).groupby(codes).transform(lambda x: x.expanding().rank(pct=True)).to_numpy()
+        t_pandas = time.perf_counter() - t
+
+        t = time.perf_counter()
+        result = expanding_pct_rank(values, codes)
+        t_kernel = time.perf_counter() - t
+
+        same = np.array_equal(expected, result)
+        print(f"{groups:>6} groups x {size:>6} runs | pandas {t_pandas:8.3f}s | kernel {t_kernel:8.3f}s | identical: {same}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+"""
+Settings saves: many changes written one by one (the old synchronous save_settings)
+against the debounced SettingsStore, on a config with many per-scenario entries.
+
+    python -m benchmarks.bench_settings_save
+"""
+import json
+import time
+import tempfile
+from pathlib import Path
+from core.config_manager import SettingsStore
+
+def main(calls=1000, scenarios=500):
+    with tempfile.TemporaryDirectory() as folder:
+        results = {}
+        for mode in ['every call', 'debounced']:
+            store = SettingsStore(Path(folder) / f"{mode.replace(' ', '_')}.json")
+            # A long-used config: per-scenario view settings for many scenarios
+            for i in range(scenarios):
+                store.settings["scenarios"][f"Scenario {i}"] = {"hidden_cms": [25.0, 40.0], "highlight": "Row Heatmap", "recent_days": 14}
+            store.mark_dirty(); store.flush()
+            store.saves = 0
+
+            t = time.perf_counter()
+            for i in range(calls): # e.g. a spin box arrow held down
+                with store.lock: store.settings["scenarios"]["Scenario 0"]["recent_days"] = i
+                store.mark_dirty()
+                if mode == 'every call': store.flush() # Old save_settings: a synchronous write
+            t_calls = time.perf_counter() - t
+            store.flush()
+            with open(store.config_path, 'r') as f: results[mode] = json.load(f)
+            print(f"{calls} set calls | {mode:>10} | {t_calls:7.3f}s in the callers | {store.saves:>4} file writes")
+        print(f"same file content: {results['every call'] == results['debounced']}")
+
+if __name__ == '__main__':
+    main()
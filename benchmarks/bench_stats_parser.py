@@ -0,0 +1,120 @@
+"""
+Stats file parsing: the readlines() parser the app used before, against
+parse_kovaaks_stats_file with its summary tail window and with a window no file
+exceeds (every file read whole). Reports bytes read per file and files per second.
+
+Bytes are the read() traffic of this process (psutil, or /proc/self/io 'rchar'),
+so they count what the parser asked for, whether or not it came from the page cache.
+The files are freshly written, so files/s is a warm-cache figure.
+
+    python -m benchmarks.bench_stats_parser
+"""
+import os
+import re
+import time
+import tempfile
+from datetime import datetime, timedelta
+from core.analytics.parsers import parse_kovaaks_stats_file, SUMMARY_TAIL_BYTES
+
+def read_chars():
+    """Bytes this process has read so far, None where that is not available."""
+    try:
+        import psutil
+        io = psutil.Process().io_counters()
+        return getattr(io, 'read_chars', io.read_bytes)
+    except (ImportError, AttributeError): pass
+    try:
+        with open('/proc/self/io', 'r') as f:
+            for line in f:
+                if line.startswith('rchar:'): return int(line.split()[1])
+    except OSError: pass
+    return None
+
+def legacy_parse_stats_file(file_path):
+    """parse_kovaaks_stats_file before the tail window: every line of the file, only the core fields."""
+    try:
+        filename = os.path.basename(file_path)
+        timestamp_match = re.search(r'(\d{4}\.\d{2}\.\d{2}-\d{2}\.\d{2}\.\d{2})', filename)
+        if timestamp_match:
+            end_time = datetime.strptime(timestamp_match.group(1), '%Y.%m.%d-%H.%M.%S')
+        else:
+            end_time = datetime.fromtimestamp(os.path.getmtime(file_path))
+
+        with open(file_path, 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+
+        data = {'Duration': 60.0}
+        start_time_str = None
+        for line in lines:
+            if line.startswith('Scenario:'): data['Scenario'] = line.split(',', 1)[1].strip()
+            elif line.startswith('Score:'): data['Score'] = float(line.split(',')[1].strip())
+            elif line.startswith('Horiz Sens:'): data['Sens'] = float(line.split(',')[1].strip())
+            elif line.startswith('Challenge Start:'): start_time_str = line.split(',')[1].strip()
+
+        if start_time_str:
+            try:
+                if '.' in start_time_str and len(start_time_str.split('.')[1]) > 6:
+                    start_time_str = start_time_str[:start_time_str.find('.')+7]
+                parsed_time = datetime.strptime(start_time_str, '%H:%M:%S.%f').time()
+                start_time = end_time.replace(hour=parsed_time.hour, minute=parsed_time.minute,
+                                              second=parsed_time.second, microsecond=parsed_time.microsecond)
+                if start_time > end_time: start_time -= timedelta(days=1)
+                duration_seconds = (end_time - start_time).total_seconds()
+                if 0 < duration_seconds < 600: data['Duration'] = duration_seconds
+            except: pass
+
+        if 'Scenario' in data and 'Score' in data and 'Sens' in data:
+            data['Timestamp'] = end_time
+            return data
+        else: return None
+    except: return None
+
+def write_sample_stats_file(folder, index, kills):
+    """A stats file laid out like KovaaK's: kill table, weapon table, then the summary block."""
+    stamp = (datetime(2024, 1, 1) + timedelta(minutes=index)).strftime('%Y.%m.%d-%H.%M.%S')
+    lines = ["Kill #,Timestamp,Bot,Weapon,TTK,Shots,Hits,Accuracy,Damage Done,Damage Possible,Efficiency,Cheated,OverShots"]
+    lines += [f"{k},12:00:{k % 60:02d}.123,Bot,Gun,0.5s,3,2,0.66,200.0,300.0,0.66,false,0" for k in range(1, kills + 1)]
+    lines += ["", "Weapon,Shots,Hits,Damage Done,Damage Possible,,,", "Gun,300,200,20000.0,30000.0,,,", ""]
+    lines += [f"Kills:,{kills}", "Deaths:,0", "Fight Time:,60.0", "Avg TTK:,0.5", "Damage Done:,20000.0",
+              "Hit Count:,200", "Miss Count:,100", f"Score:,{500 + index % 700}.0", "Scenario:,Benchmark Scenario",
+              "Challenge Start:,11:59:00.123456789", f"Horiz Sens:,{20 + index % 10}.0", "Vert Sens:,30.0",
+              "FOV:,103.0", "Resolution:,1920x1080", "Avg FPS:,240.5"]
+    path = os.path.join(folder, f"Benchmark Scenario - Challenge - {stamp} Stats.csv")
+    with open(path, 'w') as f: f.write("\n".join(lines) + "\n")
+    return path
+
+def run(parse, paths):
+    """(records, seconds, bytes read per file or None)."""
+    start_bytes = read_chars()
+    t = time.perf_counter()
+    records = [parse(p) for p in paths]
+    elapsed = time.perf_counter() - t
+    end_bytes = read_chars()
+    per_file = None if start_bytes is None or end_bytes is None else (end_bytes - start_bytes) / len(paths)
+    return records, elapsed, per_file
+
+def main(files=500):
+    parsers = [
+        ('readlines (old)', legacy_parse_stats_file),
+        ('full window', lambda p: parse_kovaaks_stats_file(p, tail_bytes=float('inf'))),
+        (f'tail {SUMMARY_TAIL_BYTES} B', parse_kovaaks_stats_file),
+    ]
+    for kills in [50, 500, 5000]:
+        with tempfile.TemporaryDirectory() as folder:
+            paths = [write_sample_stats_file(folder, i, kills) for i in range(files)]
+            print(f"{files} files of {os.path.getsize(paths[0]) / 1024:.1f} KB")
+            results = {}
+            for name, parse in parsers:
+                records, elapsed, per_file = run(parse, paths)
+                results[name] = records
+                read = "n/a" if per_file is None else f"{per_file / 1024:8.1f} KB"
+                print(f"  {name:>16} | read/file {read} | {files / elapsed:9.0f} files/s")
+            # The old parser only has the core fields: compare those, and the new ones among themselves
+            core = ['Scenario', 'Score', 'Sens', 'Duration', 'Timestamp']
+            tail = results[parsers[-1][0]]
+            same_core = all(new is not None and {k: new[k] for k in core} == old
+                            for old, new in zip(results[parsers[0][0]], tail))
+            print(f"  identical: core fields vs old {same_core}, all fields vs full window {tail == results[parsers[1][0]]}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,238 @@
+import os
+import json
+import shutil
+import sqlite3
+import numpy as np
+import pandas as pd
+from contextlib import closing
+from pathlib import Path
+
+# Bump when the on-disk layout below changes (independent of processors.CACHE_VERSION)
+STORE_FORMAT = 1
+
+# Appends create one segment each. Past this count, segments are merged into one.
+MAX_SEGMENTS = 8
+
+class ColumnStore:
+    """
+    Append-friendly columnar store for history DataFrames.
+    Layout:
+        <root>/manifest.json        -> version, segment list, string dictionaries, free-form meta
+        <root>/seg_000001/<col>.npy -> one plain NumPy array per column
+    Numeric / bool / datetime columns are saved as-is so they can be memory-mapped on load.
+    String columns are dictionary-encoded (int32 codes, -1 = missing) with the dictionary in the manifest.
+    """
+    def __init__(self, root, version=1):
+        self.root = Path(root)
+        self.version = version
+        self.manifest_path = self.root / 'manifest.json'
+        self._manifest = None
+
+    # --- MANIFEST ---
+    def _empty_manifest(self):
+        return {'format': STORE_FORMAT, 'version': self.version, 'next_segment': 1,
+                'segments': [], 'dictionaries': {}, 'meta': {}}
+
+    def _read_manifest(self):
+        if self._manifest is None:
+            try:
+                with open(self.manifest_path, 'r') as f: m = json.load(f)
+                if m.get('format') != STORE_FORMAT or m.get('version') != self.version: m = None
+            except (OSError, ValueError): m = None
+            self._manifest = m
+        return self._manifest
+
+    def _write_manifest(self, manifest):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.manifest_path.with_suffix('.tmp')
+        with open(tmp, 'w') as f: json.dump(manifest, f)
+        os.replace(tmp, self.manifest_path)
+        self._manifest = manifest
+
+    def exists(self):
+        return self._read_manifest() is not None
+
+    @property
+    def meta(self):
+        m = self._read_manifest()
+        return dict(m['meta']) if m else {}
+
+    @property
+    def columns(self):
+        """Column names as load() returns them ([] for a missing store)."""
+        return _manifest_columns(self._read_manifest() or self._empty_manifest())
+
+    @property
+    def row_count(self):
+        m = self._read_manifest()
+        return sum(seg['rows'] for seg in m['segments']) if m else 0
+
+    # --- WRITE ---
+    def _write_segment(self, manifest, df):
+        name = f"seg_{manifest['next_segment']:06d}"
+        manifest['next_segment'] += 1
+        seg_dir = self.root / name
+        seg_dir.mkdir(parents=True, exist_ok=True)
+
+        for col in df.columns:
+            s = df[col]
+            if pd.api.types.is_bool_dtype(s.dtype) or pd.api.types.is_datetime64_dtype(s.dtype):
+                arr = s.to_numpy()
+            elif pd.api.types.is_numeric_dtype(s.dtype):
+                arr = s.to_numpy(dtype=np.float64, na_value=np.nan) if pd.api.types.is_extension_array_dtype(s.dtype) else s.to_numpy()
+            else:
+                # Dictionary-encode strings. The dictionary only ever grows, so old segments stay valid.
+                values = manifest['dictionaries'].setdefault(col, [])
+                lookup = {v: i for i, v in enumerate(values)}
+                inverse, uniques = pd.factorize(s.astype(object), use_na_sentinel=True)
+                mapping = np.empty(len(uniques), dtype=np.int32)
+                for i, u in enumerate(uniques):
+                    if u not in lookup:
+                        lookup[u] = len(values); values.append(u)
+                    mapping[i] = lookup[u]
+                arr = np.where(inverse >= 0, mapping[inverse] if len(mapping) else -1, -1).astype(np.int32)
+            np.save(seg_dir / f"{col}.npy", arr, allow_pickle=False)
+
+        manifest['segments'].append({'name': name, 'rows': len(df), 'columns': list(df.columns)})
+
+    def append(self, df, meta=None):
+        """Writes df as a new segment. Compacts once there are too many segments."""
+        manifest = self._read_manifest() or self._empty_manifest()
+        manifest = json.loads(json.dumps(manifest)) # Work on a copy until the swap
+        if df is not None and not df.empty: self._write_segment(manifest, df)
+        if meta is not None: manifest['meta'] = meta
+        self._write_manifest(manifest)
+        if len(manifest['segments']) > MAX_SEGMENTS: self.compact()
+
+    def write(self, df, meta=None):
+        """Replaces the whole store with a single segment."""
+        old = self._read_manifest()
+        manifest = self._empty_manifest()
+        if old: manifest['next_segment'] = old['next_segment'] # Never reuse a name that may still be mapped
+        if df is not None and not df.empty: self._write_segment(manifest, df)
+        manifest['meta'] = meta if meta is not None else (old['meta'] if old else {})
+        self._write_manifest(manifest)
+        self._purge_orphans()
+
+    def compact(self):
+        df = self.load(mmap=False)
+        if df is not None: self.write(df, meta=self.meta)
+
+    def clear(self):
+        self._manifest = None
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _purge_orphans(self):
+        # Segments dropped from the manifest. On Windows they can still be mapped by a
+        # DataFrame the UI holds; those are skipped now and removed on a later write.
+        live = {seg['name'] for seg in self._read_manifest()['segments']}
+        for p in self.root.glob('seg_*'):
+            if p.name not in live: shutil.rmtree(p, ignore_errors=True)
+
+    # --- READ ---
+    def load(self, mmap=True, categorical=()):
+        """
+        Returns the stored DataFrame or None if the store is missing / from another version.
+        With mmap=True a single-segment store is returned as memory-mapped (read-only) columns.
+        String columns named in categorical come back as pandas categoricals built straight
+        from the stored codes (sorted categories, unused dictionary entries dropped).
+        """
+        manifest = self._read_manifest()
+        if manifest is None: return None
+
+        columns = _manifest_columns(manifest)
+
+        pieces = {col: [] for col in columns}
+        for seg in manifest['segments']:
+            seg_dir = self.root / seg['name']
+            for col in columns:
+                if col in seg['columns']:
+                    pieces[col].append(np.load(seg_dir / f"{col}.npy", mmap_mode='r' if mmap else None, allow_pickle=False))
+                else:
+                    # Column added after this segment was written (e.g. new parser fields)
+                    fill = np.full(seg['rows'], -1, dtype=np.int32) if col in manifest['dictionaries'] else np.full(seg['rows'], np.nan)
+                    pieces[col].append(fill)
+
+        data = {}
+        for col in columns:
+            parts = pieces[col]
+            # asarray drops the np.memmap subclass but keeps the mapping
+            arr = np.asarray(parts[0]) if len(parts) == 1 else np.concatenate(parts)
+            if col in manifest['dictionaries'] and col in categorical:
+                arr = _codes_to_categorical(arr, manifest['dictionaries'][col])
+            elif col in manifest['dictionaries']:
+                lookup = np.array(manifest['dictionaries'][col] + [None], dtype=object)
+                arr = lookup[arr] # -1 -> trailing None
+            data[col] = arr
+
+        return pd.DataFrame(data, columns=columns, copy=False)
+
+def _manifest_columns(manifest):
+    # Union of the segments' columns, first seen first (later segments may add some)
+    columns = []
+    for seg in manifest['segments']:
+        for col in seg['columns']:
+            if col not in columns: columns.append(col)
+    return columns
+
+def _codes_to_categorical(codes, dictionary):
+    values = np.array(dictionary, dtype=object)
+    used = np.unique(codes[codes >= 0])
+    order = np.argsort(values[used])
+    remap = np.full(len(values) + 1, -1, dtype=np.int32) # Last slot keeps -1 (missing) at -1
+    remap[used[order]] = np.arange(len(used), dtype=np.int32)
+    return pd.Categorical.from_codes(remap[codes], categories=values[used][order])
+
+class FileManifest:
+    """
+    Stats files already parsed for one folder (name -> mtime), plus the change signals of
+    the last scan (directory mtime, newest file name timestamp), in SQLite.
+    Unlike a JSON dump, a scan only writes the rows that changed.
+    """
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def _connect(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        conn.execute("CREATE TABLE IF NOT EXISTS files (name TEXT PRIMARY KEY, mtime REAL NOT NULL) WITHOUT ROWID")
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value) WITHOUT ROWID")
+        return conn
+
+    def exists(self):
+        return self.path.exists()
+
+    def signals(self):
+        """{dir_mtime_ns, scanned_at, high_water} of the last folder listing, or None."""
+        if not self.path.exists(): return None
+        try:
+            with closing(self._connect()) as conn:
+                row = conn.execute("SELECT value FROM meta WHERE key = 'signals'").fetchone()
+            return json.loads(row[0]) if row else None
+        except (sqlite3.Error, ValueError): return None
+
+    def mtimes(self, names=None):
+        """{name: mtime} of every file, or only of names."""
+        if not self.path.exists(): return {}
+        with closing(self._connect()) as conn:
+            if names is None: return dict(conn.execute("SELECT name, mtime FROM files"))
+            names = list(names)
+            found = {}
+            for i in range(0, len(names), 500): # SQLite variable limit
+                chunk = names[i:i + 500]
+                query = f"SELECT name, mtime FROM files WHERE name IN ({','.join('?' * len(chunk))})"
+                found.update(conn.execute(query, chunk))
+            return found
+
+    def save(self, files, removed=(), signals=None, replace=False):
+        """Upserts files {name: mtime} and drops removed in one transaction. replace clears the rest first."""
+        with closing(self._connect()) as conn, conn:
+            if replace: conn.execute("DELETE FROM files")
+            conn.executemany("DELETE FROM files WHERE name = ?", ((name,) for name in removed))
+            conn.executemany("INSERT OR REPLACE INTO files (name, mtime) VALUES (?, ?)", files.items())
+            if signals is not None:
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('signals', ?)", (json.dumps(signals),))
+
+    def clear(self):
+        try: self.path.unlink()
+        except FileNotFoundError: pass
@@ -0,0 +1,159 @@
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+# Longest group _block_pct_rank handles. Its O(n log^2 n) passes beat pandas' per-group
+# overhead on short groups (most combos), but not on long ones: those go to pandas'
+# skiplist expanding rank, O(n log n) per group. Crossover measured at ~1k runs.
+KERNEL_MAX_GROUP = 512
+
+def expanding_pct_rank(values, group_codes):
+    """
+    Vectorized equivalent of
+        pd.Series(values).groupby(group_codes).transform(lambda x: x.expanding().rank(pct=True))
+    Average rank for ties, divided by the number of runs seen so far in the group.
+    group_codes are ngroup() style codes (0 .. groups-1); rows with a negative code
+    (NaN keys) get NaN, like the groupby would. Values must not contain NaN.
+    Groups up to KERNEL_MAX_GROUP runs are ranked all at once by _block_pct_rank,
+    longer ones one by one with pandas.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    codes = np.asarray(group_codes)
+    out = np.full(len(values), np.nan)
+    valid = codes >= 0
+    if not valid.any(): return out
+
+    sizes = np.bincount(codes[valid])
+    is_long = np.zeros(len(codes), dtype=bool)
+    is_long[valid] = sizes[codes[valid]] > KERNEL_MAX_GROUP
+    short = ~is_long
+    out[short] = _block_pct_rank(values[short], codes[short])
+
+    # Long groups: rows in time order per group, split once
+    long_rows = np.flatnonzero(is_long)
+    long_rows = long_rows[np.argsort(codes[long_rows], kind='stable')]
+    bounds = np.flatnonzero(np.diff(codes[long_rows])) + 1
+    for rows in np.split(long_rows, bounds) if len(long_rows) else []:
+        out[rows] = pd.Series(values[rows]).expanding().rank(pct=True).to_numpy()
+    return out
+
+def _block_pct_rank(values, codes):
+    """
+    expanding_pct_rank for short groups. Instead of re-ranking the whole prefix for every
+    row (O(n^2) per group), it counts, for each run, the earlier runs of its group that
+    scored lower / equal. That is done bottom-up merge-sort style: at level k every block
+    of 2^(k+1) positions is split in two halves and each right-half run looks up the left
+    half with searchsorted. Each (earlier, later) pair lands in exactly one such split
+    -> O(n log^2 n) total, with log n bounded by the longest group.
+    """
+    n = len(values)
+    out = np.full(n, np.nan)
+    if n == 0: return out
+
+    # Group rows together, keeping time order inside each group
+    order = np.argsort(codes, kind='stable')
+    g = codes[order]
+    v = values[order]
+    starts = np.flatnonzero(np.r_[True, g[1:] != g[:-1]])
+    sizes = np.diff(np.r_[starts, n])
+    start_of = np.repeat(starts, sizes)
+    pos = np.arange(n) - start_of
+
+    # Dense value ranks, so (block, value) fits in one sortable int64 key
+    _, vr = np.unique(v, return_inverse=True)
+    span = np.int64(vr.max() + 1)
+
+    less = np.zeros(n, dtype=np.int64)
+    equal = np.zeros(n, dtype=np.int64)
+    k = 0
+    while (1 << k) < sizes.max():
+        block = (start_of + (pos >> (k + 1))).astype(np.int64)
+        key = block * span + vr
+        right = ((pos >> k) & 1).astype(bool)
+
+        left_keys = np.sort(key[~right])
+        r_key = key[right]
+        lo = np.searchsorted(left_keys, r_key, 'left')
+        hi = np.searchsorted(left_keys, r_key, 'right')
+        first = np.searchsorted(left_keys, block[right] * span, 'left')
+        less[right] += lo - first
+        equal[right] += hi - lo
+        k += 1
+
+    # Ties share the average of ranks less+1 .. less+equal+1 (the run itself included)
+    rank = less + (equal + 2) / 2.0
+    out[order] = rank / (pos + 1)
+    out[codes < 0] = np.nan
+    return out
+
+class GroupedOrderStats:
+    """
+    Order statistics of a value column per group (by default Score per Scenario / Sens).
+    The runs are sorted once by (group, value descending), so every group is one block of
+    'sorted' starting at starts[g]. The k-th best of a group is then sorted[starts + k - 1],
+    a percentile two lookups and an interpolation, a top-k mean a difference of cumulative
+    sums: every rank / percentile setting is answered for all groups with fancy indexing.
+    Groups come out in groupby order; NaN values and keys are left out like groupby does.
+    """
+    def __init__(self, df, keys=('Scenario', 'Sens'), value='Score'):
+        self.source = df
+        self.keys = list(keys)
+        if df[value].isna().any(): df = df[df[value].notna()]
+        grouped = df.groupby(self.keys, observed=True, sort=True)
+        codes = grouped.ngroup().to_numpy()
+        values = df[value].to_numpy(dtype=np.float64)
+        valid = codes >= 0
+        codes, values = codes[valid], values[valid]
+
+        order = np.lexsort((-values, codes))
+        self.sorted = values[order]
+        sizes = grouped.size()
+        self.groups = sizes.index
+        self.sizes = sizes.to_numpy()
+        self.starts = np.r_[0, np.cumsum(self.sizes)[:-1]].astype(np.int64)
+        self._cumsum = None
+
+    def nth_best(self, k):
+        """k-th highest value per group (1 = best), NaN for groups with fewer than k runs."""
+        out = np.full(len(self.sizes), np.nan)
+        has = self.sizes >= k
+        out[has] = self.sorted[self.starts[has] + k - 1]
+        return out
+
+    def quantile(self, q):
+        """Linearly interpolated q-quantile per group (same as groupby().quantile(q))."""
+        # Position in ascending order, mirrored into the descending block
+        pos = (self.sizes - 1) * q
+        lo = np.floor(pos).astype(np.int64)
+        frac = pos - lo
+        hi = np.minimum(lo + 1, self.sizes - 1)
+        end = self.starts + self.sizes - 1
+        v_lo, v_hi = self.sorted[end - lo], self.sorted[end - hi]
+        return np.where(frac == 0, v_lo, v_lo + (v_hi - v_lo) * frac)
+
+    def top_k_mean(self, k):
+        """Mean of the best k values per group (all of them for smaller groups)."""
+        if self._cumsum is None: self._cumsum = np.r_[0.0, np.cumsum(self.sorted)]
+        take = np.minimum(self.sizes, k)
+        return (self._cumsum[self.starts + take] - self._cumsum[self.starts]) / take
+
+    def frame(self, values, name='Score'):
+        """Per group values as a flat DataFrame (key columns + name), like groupby(...).agg().reset_index()."""
+        out = self.groups.to_frame(index=False)
+        out[name] = values
+        return out
+
+# Sorted orders kept for the last few run sets (grid tabs keep handing in the same filtered frame)
+MAX_ORDER_STATS = 4
+_order_stats_cache = OrderedDict()
+
+def get_order_stats(df):
+    """Shared GroupedOrderStats of df (Score per Scenario / Sens), sorted once per frame."""
+    stats = _order_stats_cache.get(id(df))
+    if stats is not None and stats.source is df:
+        _order_stats_cache.move_to_end(id(df))
+        return stats
+    stats = GroupedOrderStats(df)
+    _order_stats_cache[id(df)] = stats
+    if len(_order_stats_cache) > MAX_ORDER_STATS: _order_stats_cache.popitem(last=False)
+    return stats
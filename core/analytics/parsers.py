@@ -1,15 +1,82 @@
 import os
 import re
+import json
+import threading
+from bisect import bisect_left, insort
 from datetime import datetime, timedelta
+from pathlib import Path
+import numpy as np
 import pandas as pd
 
-# --- GLOBAL CACHE ---
-# Stores parsed modifiers: "ScenarioName" -> {Modifiers Dict}
-# Prevents expensive regex recalculation on every tab open
-MODIFIER_CACHE = {} 
+# --- MODIFIER PARSING ---
+# Compiled once; parse_modifiers runs for every (base, variant) pair at ingestion
+MOD_UNIT_MAP = {'s': 'Duration', 'sec': 'Duration', 'm': 'Distance', 'hp': 'Health'}
+MOD_TOKEN_RE = re.compile(r'(\d[\d.]*%?[a-zA-Z]*|[A-Za-z]+)')
+MOD_VALUE_RE = re.compile(r'[\d.]+%?')
+MOD_UNIT_VALUE_RE = re.compile(r'([\d.]+%?)(\w+)')
+
+# Per-run modifier columns of a family DataFrame. Only variants with exactly one
+# modifier get an axis (the grid shows nothing else); Mod_Count is the full count.
+MOD_COLUMNS = ['Mod_Axis', 'Mod_Value', 'Mod_Pattern', 'Mod_Count']
 # --------------------
 
-def parse_kovaaks_stats_file(file_path):
+# KovaaK's writes the per-kill and per-weapon tables first and the summary block
+# (Score, Scenario, Horiz Sens...) last. Reading only this much of the tail is enough
+# for every stats file seen so far; anything bigger falls back to a full scan.
+SUMMARY_TAIL_BYTES = 4096
+# First line of the summary block: a tail without it cut the block short
+SUMMARY_FIRST_LABEL = 'Kills:'
+
+# Optional summary fields -> (Column, Type). Missing fields simply stay NaN.
+SUMMARY_FIELDS = {
+    'Kills:': ('Kills', int),
+    'Deaths:': ('Deaths', int),
+    'Hit Count:': ('Hit_Count', int),
+    'Miss Count:': ('Miss_Count', int),
+    'Damage Done:': ('Damage_Done', float),
+    'Avg TTK:': ('Avg_TTK', float),
+    'Fight Time:': ('Fight_Time', float),
+    'Resolution:': ('Resolution', str),
+    'Avg FPS:': ('FPS', float),
+}
+
+def _read_summary_lines(file_path, full=False, tail_bytes=SUMMARY_TAIL_BYTES):
+    """Returns the decoded lines of the last tail_bytes (or the whole file if full=True / file is small)."""
+    with open(file_path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        if full or size <= tail_bytes:
+            f.seek(0)
+            return f.read().decode('utf-8').splitlines(), True
+        f.seek(size - tail_bytes)
+        chunk = f.read()
+    # Drop the first (probably cut) line before decoding so we never split a UTF-8 sequence
+    chunk = chunk[chunk.find(b'\n') + 1:]
+    return chunk.decode('utf-8').splitlines(), False
+
+def _parse_summary_lines(lines, data):
+    """
+    Single pass over the summary lines. Fills data in place, returns the raw Challenge Start
+    string and whether the start of the summary block (SUMMARY_FIRST_LABEL) was among them.
+    """
+    start_time_str = None
+    has_start = False
+    for line in lines:
+        label, sep, value = line.partition(',')
+        if not sep: continue
+        if label == SUMMARY_FIRST_LABEL: has_start = True
+        if label == 'Scenario:': data['Scenario'] = value.strip()
+        elif label == 'Score:': data['Score'] = float(value.split(',')[0].strip())
+        elif label == 'Horiz Sens:': data['Sens'] = float(value.split(',')[0].strip())
+        elif label == 'Challenge Start:': start_time_str = value.split(',')[0].strip()
+        elif label in SUMMARY_FIELDS:
+            col, cast = SUMMARY_FIELDS[label]
+            raw = value.split(',')[0].strip()
+            try: data[col] = cast(float(raw)) if cast is int else cast(raw)
+            except ValueError: pass
+    return start_time_str, has_start
+
+def parse_kovaaks_stats_file(file_path, tail_bytes=SUMMARY_TAIL_BYTES):
     try:
         filename = os.path.basename(file_path)
         timestamp_match = re.search(r'(\d{4}\.\d{2}\.\d{2}-\d{2}\.\d{2}\.\d{2})', filename)
@@ -19,17 +86,16 @@ def parse_kovaaks_stats_file(file_path):
         else:
             end_time = datetime.fromtimestamp(os.path.getmtime(file_path))
         
-        with open(file_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-            
+        # Fast path: only the summary block at the end of the file
+        lines, is_full = _read_summary_lines(file_path, tail_bytes=tail_bytes)
         data = {'Duration': 60.0} 
-        start_time_str = None
-        
-        for line in lines:
-            if line.startswith('Scenario:'): data['Scenario'] = line.split(',', 1)[1].strip()
-            elif line.startswith('Score:'): data['Score'] = float(line.split(',')[1].strip())
-            elif line.startswith('Horiz Sens:'): data['Sens'] = float(line.split(',')[1].strip())
-            elif line.startswith('Challenge Start:'): start_time_str = line.split(',')[1].strip()
+        start_time_str, has_start = _parse_summary_lines(lines, data)
+
+        if not is_full and not (has_start and 'Scenario' in data and 'Score' in data and 'Sens' in data):
+            # Unusually large summary (or odd layout) -> scan everything
+            lines, _ = _read_summary_lines(file_path, full=True)
+            data = {'Duration': 60.0}
+            start_time_str, _ = _parse_summary_lines(lines, data)
         
         if start_time_str:
             try:
@@ -49,56 +115,190 @@ def parse_kovaaks_stats_file(file_path):
         else: return None
     except: return None
 
-def get_scenario_family_info(all_runs_df, base_scenario):
+class ScenarioIndex:
+    """
+    Prefix index over the unique scenario names of a runs DataFrame.
+    names is kept sorted, so every name starting with a base name sits in one bisect range;
+    rows maps each name to its row positions (ascending). Family lookups cost O(family size).
+    """
+    def __init__(self, df):
+        self.source = None
+        self.rows_seen = 0
+        self.names = []
+        self.rows = {}
+        self.extend(df, 0)
+
+    def extend(self, df, start):
+        """Indexes the rows of df from 'start' on (earlier rows must be the ones already indexed)."""
+        if start != self.rows_seen: self.names, self.rows, start = [], {}, 0
+        codes, uniques = pd.factorize(df['Scenario'].iloc[start:], use_na_sentinel=True)
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+        for i, name in enumerate(uniques):
+            pos = start + order[bounds[i]:bounds[i + 1]]
+            if name in self.rows: self.rows[name] = np.concatenate([self.rows[name], pos])
+            else:
+                self.rows[name] = pos
+                insort(self.names, name)
+        self.source = df
+        self.rows_seen = len(df)
+
+    def family(self, base_scenario):
+        """Scenario names starting with base_scenario, sorted."""
+        members = []
+        for i in range(bisect_left(self.names, base_scenario), len(self.names)):
+            if not self.names[i].startswith(base_scenario): break
+            members.append(self.names[i])
+        return members
+
+    def family_rows(self, base_scenario):
+        """Row positions of the whole family, in df order."""
+        parts = [self.rows[name] for name in self.family(base_scenario)]
+        return np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+
+_index_cache = {'index': None}
+
+def get_scenario_index(df, delta=None):
+    """
+    Shared ScenarioIndex for df, built once per data load.
+    With an append delta (see StateManager.data_appended) the cached one is extended instead.
+    """
+    index = _index_cache['index']
+    if index is not None and index.source is df: return index
+    if index is not None and delta is not None and not delta['reenriched']:
+        index.extend(df, delta['start'])
+    else:
+        index = ScenarioIndex(df)
+    _index_cache['index'] = index
+    return index
+
+def _is_mod_value(token):
+    if MOD_VALUE_RE.fullmatch(token): return True
+    unit_match = MOD_UNIT_VALUE_RE.fullmatch(token)
+    return bool(unit_match and unit_match.group(2) in MOD_UNIT_MAP)
+
+def parse_modifiers(base_scenario, scenario_name):
+    """
+    Splits what scenario_name adds to base_scenario into modifiers.
+    Returns [[axis, value, pattern], ...]; empty if anything is left unexplained.
+    """
+    modifier_str = scenario_name.replace(base_scenario, '', 1).strip()
+    if not modifier_str: return []
+    tokens = MOD_TOKEN_RE.findall(modifier_str)
+    values = [_is_mod_value(t) for t in tokens]
+
+    modifiers = {}
+    consumed = [False] * len(tokens); i = 0
+    while i < len(tokens) - 1:
+        if not consumed[i] and not consumed[i+1]:
+            t1, t2 = tokens[i], tokens[i+1]
+            if not values[i] and values[i+1]:
+                modifiers[t1] = (t2, 'word_value'); consumed[i] = consumed[i+1] = True; i += 2; continue
+            elif values[i] and not values[i+1]:
+                modifiers[t2] = (t1, 'value_word'); consumed[i] = consumed[i+1] = True; i += 2; continue
+        i += 1
+    for i, token in enumerate(tokens):
+        if not consumed[i]:
+            unit_match = MOD_UNIT_VALUE_RE.fullmatch(token)
+            if unit_match:
+                unit = unit_match.group(2)
+                if unit in MOD_UNIT_MAP: modifiers[MOD_UNIT_MAP[unit]] = (token, 'standalone'); consumed[i] = True
+            elif '%' in token and values[i]:
+                modifiers['Percent'] = (token, 'standalone'); consumed[i] = True
+
+    if not all(consumed): return []
+    return [[axis, val, pat] for axis, (val, pat) in modifiers.items()]
+
+class ModifierIndex:
+    """
+    (base, variant) -> parsed modifiers. A parse depends on the base name, so the same
+    variant opened from two base tabs gets two entries.
+    add_names() batch-parses every prefix pair of newly seen scenario names at ingestion;
+    get() parses a missing pair on demand. With a path it persists as JSON, and a file
+    written under another version is discarded.
+    """
+    def __init__(self, path=None, version=None):
+        self.path = Path(path) if path else None
+        self.version = version
+        self.names = [] # Sorted names add_names() has paired up
+        self.entries = {} # base -> {variant: [[axis, value, pattern], ...]}
+        self.dirty = False
+        self.lock = threading.Lock() # Ingestion runs on the loader thread
+        self._load()
+
+    def _load(self):
+        if not self.path: return
+        try:
+            with open(self.path, 'r') as f: data = json.load(f)
+            if data.get('version') != self.version: return
+            self.names, self.entries = sorted(data['names']), data['entries']
+        except (OSError, ValueError, KeyError): pass
+
+    def save(self):
+        if not self.path or not self.dirty: return
+        with self.lock:
+            data = json.dumps({'version': self.version, 'names': self.names, 'entries': self.entries})
+            self.dirty = False
+        tmp = self.path.with_suffix('.tmp')
+        with open(tmp, 'w') as f: f.write(data)
+        os.replace(tmp, self.path)
+
+    def add_names(self, names):
+        """Parses every (base, variant) pair that involves a new name."""
+        with self.lock:
+            known = set(self.names)
+            new = sorted({n for n in names if isinstance(n, str)} - known)
+            if not new: return
+            for name in new: insort(self.names, name)
+            known.update(new)
+            for name in new:
+                # As variant: every known name that is a prefix of it
+                for i in range(1, len(name)):
+                    if name[:i] in known: self._parse(name[:i], name)
+                # As base: the bisect range of names starting with it
+                for i in range(bisect_left(self.names, name) + 1, len(self.names)):
+                    if not self.names[i].startswith(name): break
+                    self._parse(name, self.names[i])
+
+    def _parse(self, base, variant):
+        family = self.entries.setdefault(base, {})
+        if variant not in family:
+            family[variant] = parse_modifiers(base, variant)
+            self.dirty = True
+        return family[variant]
+
+    def get(self, base, variant):
+        with self.lock: return self._parse(base, variant)
+
+    def family_table(self, base, members):
+        """Long table (Scenario, Axis, Value, Pattern): one row per modifier of each member."""
+        rows = [(name, axis, val, pat) for name in members if name != base for axis, val, pat in self.get(base, name)]
+        return pd.DataFrame(rows, columns=['Scenario', 'Axis', 'Value', 'Pattern'])
+
+def get_family_modifiers(all_runs_df, base_scenario, modifier_index):
+    """Modifiers of every variant of base_scenario present in all_runs_df (see ModifierIndex.family_table)."""
+    members = get_scenario_index(all_runs_df).family(base_scenario) if all_runs_df is not None else []
+    return modifier_index.family_table(base_scenario, members)
+
+def with_no_modifiers(df):
+    """Adds empty modifier columns (exact-match / playlist frames)."""
+    return df.assign(Mod_Axis=None, Mod_Value=None, Mod_Pattern=None, Mod_Count=0)
+
+def get_scenario_family_info(all_runs_df, base_scenario, modifier_index=None):
     if all_runs_df is None or all_runs_df.empty: return None
-    family_df = all_runs_df[all_runs_df['Scenario'].str.startswith(base_scenario)].copy()
-    if family_df.empty: return None
-    
-    # Use the Global Cache
-    global MODIFIER_CACHE
-
-    def parse_modifiers(scenario_name):
-        if scenario_name in MODIFIER_CACHE:
-            return MODIFIER_CACHE[scenario_name]
-
-        modifier_str = scenario_name.replace(base_scenario, '', 1).strip()
-        if not modifier_str: return {}
-        
-        UNIT_MAP = {'s': 'Duration', 'sec': 'Duration', 'm': 'Distance', 'hp': 'Health'}
-        token_pattern = re.compile(r'(\d[\d.]*%?[a-zA-Z]*|[A-Za-z]+)')
-        tokens = token_pattern.findall(modifier_str)
-        
-        def is_value(token):
-            if re.fullmatch(r'[\d.]+%?', token): return True
-            unit_match = re.fullmatch(r'([\d.]+%?)(\w+)', token)
-            if unit_match and unit_match.groups()[1] in UNIT_MAP: return True
-            return False
-            
-        modifiers = {}
-        consumed = [False] * len(tokens); i = 0
-        while i < len(tokens) - 1:
-            if not consumed[i] and not consumed[i+1]:
-                t1, t2 = tokens[i], tokens[i+1]
-                if not is_value(t1) and is_value(t2): 
-                    modifiers[t1] = (t2, 'word_value'); consumed[i] = consumed[i+1] = True; i += 2; continue
-                elif is_value(t1) and not is_value(t2): 
-                    modifiers[t2] = (t1, 'value_word'); consumed[i] = consumed[i+1] = True; i += 2; continue
-            i += 1
-        for i, token in enumerate(tokens):
-            if not consumed[i]:
-                unit_match = re.fullmatch(r'([\d.]+%?)(\w+)', token)
-                if unit_match:
-                    value, unit = unit_match.groups()
-                    if unit in UNIT_MAP: modifiers[UNIT_MAP[unit]] = (token, 'standalone'); consumed[i] = True
-                elif '%' in token and is_value(token):
-                    modifiers['Percent'] = (token, 'standalone'); consumed[i] = True
-        
-        if not all(consumed):
-             MODIFIER_CACHE[scenario_name] = {}
-             return {}
-             
-        MODIFIER_CACHE[scenario_name] = modifiers
-        return modifiers
-        
-    family_df['Modifiers'] = family_df['Scenario'].apply(parse_modifiers)
-    return family_df
\ No newline at end of file
+    index = get_scenario_index(all_runs_df)
+    members = index.family(base_scenario)
+    if not members: return None
+    family_df = all_runs_df.iloc[index.family_rows(base_scenario)].copy()
+    if modifier_index is None: modifier_index = ModifierIndex()
+
+    # One lookup per member name, then spread to the runs as columns
+    table = modifier_index.family_table(base_scenario, members)
+    counts = table['Scenario'].value_counts()
+    single = table[table['Scenario'].map(counts) == 1].set_index('Scenario')
+    names = family_df['Scenario'].astype(object) # Plain map, not a categorical one
+    family_df['Mod_Axis'] = names.map(single['Axis'])
+    family_df['Mod_Value'] = names.map(single['Value'])
+    family_df['Mod_Pattern'] = names.map(single['Pattern'])
+    family_df['Mod_Count'] = names.map(counts).fillna(0).astype(int)
+    return family_df
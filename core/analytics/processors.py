@@ -1,129 +1,796 @@
 import os
+import re
+import numpy as np
 import pandas as pd
 from pathlib import Path
 import json
 import bisect
-from core.analytics.parsers import parse_kovaaks_stats_file
+import time
+import shutil
+import hashlib
+import multiprocessing
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from core.analytics.parsers import parse_kovaaks_stats_file, ModifierIndex
+from core.analytics.history_store import ColumnStore, FileManifest
+from core.analytics.kernels import expanding_pct_rank
+from core.analytics.schema import compact_enriched, pack_flags
+from core.analytics.sessions import SESSION_COLUMNS, with_sessions
+from core.analytics.write_behind import WriteBehind
 
 APP_DATA_DIR = Path.home() / '.VSV_cache_config'
 APP_DATA_DIR.mkdir(exist_ok=True) 
 
-CACHE_HISTORY_PATH = APP_DATA_DIR / 'vsv_history_cache.pkl'
-CACHE_INFO_PATH = APP_DATA_DIR / 'vsv_cache_info.json'
-CACHE_ENRICHED_PATH = APP_DATA_DIR / 'vsv_enriched_cache.pkl'
-CACHE_META_PATH = APP_DATA_DIR / 'vsv_meta.json'
+# One sub directory per stats folder (see FolderCache)
+CACHE_FOLDERS_DIR = APP_DATA_DIR / 'vsv_folders'
+CACHE_MODIFIERS_PATH = APP_DATA_DIR / 'vsv_modifier_index.json'
+
+# Folder caches kept on disk. Past either bound the least recently used ones are deleted.
+MAX_FOLDER_CACHES = 4
+MAX_FOLDER_CACHE_BYTES = 2 * 1024 ** 3
+
+# Single-folder layout (before per-folder caches). Adopted by the folder it was built from.
+SHARED_HISTORY_DIR = APP_DATA_DIR / 'vsv_history_store'
+SHARED_INFO_PATH = APP_DATA_DIR / 'vsv_cache_info.json'
+SHARED_ENRICHED_DIR = APP_DATA_DIR / 'vsv_enriched_store'
+SHARED_STATE_PATH = APP_DATA_DIR / 'vsv_enrich_state.json'
+
+# Legacy pickle caches (pre column store). Migrated once, then deleted.
+LEGACY_HISTORY_PATH = APP_DATA_DIR / 'vsv_history_cache.pkl'
+LEGACY_ENRICHED_PATH = APP_DATA_DIR / 'vsv_enriched_cache.pkl'
+LEGACY_META_PATH = APP_DATA_DIR / 'vsv_meta.json'
 
 # Increment this when logic changes to force a cache rebuild
-CACHE_VERSION = 2
-
-def _detect_and_assign_sessions(history_df, session_gap_minutes=30):
-    if history_df.empty or 'Timestamp' not in history_df.columns: return history_df
-    df = history_df.copy()
-    df.sort_values('Timestamp', inplace=True)
-    time_diffs = df['Timestamp'].diff()
-    session_starts = time_diffs > pd.Timedelta(minutes=session_gap_minutes)
-    session_ids = session_starts.cumsum()
-    df['SessionID'] = session_ids
-    return df
-
-def find_and_process_stats(stats_folder_path, session_gap_minutes=30):
-    path_obj = Path(stats_folder_path)
-    if not path_obj.is_dir(): return None
-    
-    processed_files_info = {}
-    cached_history_df = pd.DataFrame()
-    
-    # 1. Load File Info Cache
-    if os.path.exists(CACHE_HISTORY_PATH) and os.path.exists(CACHE_INFO_PATH):
+CACHE_VERSION = 4
+
+# Raw parsed runs are not affected by enrichment logic changes, so they have their own version
+HISTORY_VERSION = 1
+
+# A run is the same run in every folder it shows up in (copied / synced stats files).
+# Their hash is stored with the raw history as 'RowHash' (see row_hashes).
+DEDUP_COLUMNS = ['Scenario', 'Timestamp', 'Score', 'Sens']
+
+# KovaaK's names stats files '<Scenario> - Challenge - YYYY.MM.DD-HH.MM.SS Stats.csv',
+# so new files sort after the newest known one (the scan's high-water mark)
+STATS_TIME_RE = re.compile(r'(\d{4}\.\d{2}\.\d{2}-\d{2}\.\d{2}\.\d{2})')
+# A directory mtime is only trusted once it is older than this at scan time
+RACY_MTIME_SECONDS = 2.0
+
+# Files handed to a worker process per task. Big enough to amortize the
+# pickling round trip, small enough to keep the progress bar moving.
+PARSE_CHUNK_SIZE = 256
+# Smaller batches parse serially: every spawned worker re-imports the app (about a
+# second), which costs more than it saves on a few thousand files
+PARALLEL_MIN_FILES = 4096
+
+# Cache persistence runs behind the loaders (see WriteBehind). Keys: (cache root, store) / 'modifiers'
+_writer = WriteBehind()
+
+def flush_cache_writes(timeout=None):
+    """Waits for every queued cache write. Called before caches are deleted, and on exit."""
+    return _writer.flush(timeout)
+
+def _await_writes(caches, *stores):
+    """
+    Waits for the queued writes into these stores ('history', 'enriched') of these caches
+    before they are read back. Loader threads only; other caches keep writing behind.
+    """
+    _writer.flush(keys={(cache.root, store) for cache in caches for store in stores})
+
+def _write_json(path, data):
+    tmp = path.with_suffix('.tmp')
+    with open(tmp, 'w') as f: json.dump(data, f)
+    os.replace(tmp, path)
+
+def resolve_worker_count(workers):
+    """0 (or None) means 'Auto': one worker per CPU core."""
+    if not workers: return os.cpu_count() or 1
+    return max(1, int(workers))
+
+def _parse_chunk(file_paths):
+    # Top-level so it can be pickled into worker processes
+    return [parse_kovaaks_stats_file(fp) for fp in file_paths]
+
+def parse_stats_files(file_paths, workers=1, progress_callback=None):
+    """
+    Parses stats files in chunks, optionally across a process pool.
+    Results keep the order of file_paths, so the output is identical to the serial path.
+    progress_callback(done, total) is called after every chunk.
+    """
+    total = len(file_paths)
+    chunks = [file_paths[i:i + PARSE_CHUNK_SIZE] for i in range(0, total, PARSE_CHUNK_SIZE)]
+    workers = min(resolve_worker_count(workers), len(chunks))
+
+    def run(chunk_results):
+        parsed = []
+        done = 0
+        for chunk, chunk_parsed in zip(chunks, chunk_results):
+            parsed.extend(chunk_parsed)
+            done += len(chunk)
+            if progress_callback: progress_callback(done, total)
+        return parsed
+
+    if workers > 1 and total >= PARALLEL_MIN_FILES:
         try:
-            cached_history_df = pd.read_pickle(CACHE_HISTORY_PATH)
-            with open(CACHE_INFO_PATH, 'r') as f: processed_files_info = json.load(f)
-        except: pass
-            
-    # 2. Optimized Scan
-    new_files_to_process = []
-    current_files_info = {}
-    files_changed = False
-    
+            # Spawn, not fork: this runs on a loader QThread next to the GUI, writer and
+            # scan threads, and a forked child can inherit one of their locks held
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+                return run(pool.map(_parse_chunk, chunks))
+        except (OSError, BrokenProcessPool) as e:
+            # Pool could not start (sandboxed/frozen env) -> parse on this thread instead
+            print(f"Parallel parse failed, falling back to serial: {e}")
+
+    return run(_parse_chunk(chunk) for chunk in chunks)
+
+def _normalize_folder(path):
+    return os.path.normcase(os.path.abspath(path))
+
+def stats_sources(stats_folder_paths):
+    """
+    Existing stats folders of a path or list of paths, in the given order, without duplicates.
+    Paths are kept as given: they prefix the file keys of the folder's cache_info.json.
+    """
+    if isinstance(stats_folder_paths, (str, os.PathLike)): stats_folder_paths = [stats_folder_paths]
+    sources, seen = [], set()
+    for path in stats_folder_paths or []:
+        if not path or not os.path.isdir(path): continue
+        key = _normalize_folder(path)
+        if key in seen: continue
+        seen.add(key); sources.append(str(path))
+    return sources
+
+class FolderCache:
+    """
+    Cache files of one stats folder, under CACHE_FOLDERS_DIR/<hash of the folder path>.
+    Switching between folders (e.g. a synced copy on a laptop) keeps each one warm.
+    Parsed files are tracked in a FileManifest. A list of folders gets its own cache holding
+    the merged history; its info file maps each source folder to the number of its history
+    rows already merged.
+    """
+    def __init__(self, stats_folder_paths):
+        if isinstance(stats_folder_paths, (str, os.PathLike)): stats_folder_paths = [stats_folder_paths]
+        self.sources = sorted({_normalize_folder(p) for p in stats_folder_paths})
+        self.folder = os.pathsep.join(self.sources)
+        self.merged = len(self.sources) > 1
+        self.root = CACHE_FOLDERS_DIR / hashlib.sha1(self.folder.encode('utf-8')).hexdigest()[:16]
+        self.info_path = self.root / 'cache_info.json'
+        self.state_path = self.root / 'enrich_state.json'
+        self.files = FileManifest(self.root / 'files.sqlite')
+        self.owner_path = self.root / 'folder.json'
+        self.history = ColumnStore(self.root / 'history_store', HISTORY_VERSION)
+        self.enriched = ColumnStore(self.root / 'enriched_store', CACHE_VERSION)
+
+    def touch(self):
+        """Marks the cache as used now (LRU order)."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.owner_path, 'w') as f: json.dump({'folder': self.folder, 'last_used': time.time()}, f)
+
+def _folder_last_used(root):
+    try:
+        with open(root / 'folder.json', 'r') as f: return float(json.load(f)['last_used'])
+    except (OSError, ValueError, KeyError, TypeError): return 0.0
+
+def _dir_size(root):
+    total = 0
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            try: total += os.path.getsize(os.path.join(dirpath, name))
+            except OSError: pass
+    return total
+
+def _prune_folder_caches(in_use):
+    """Drops least recently used folder caches beyond MAX_FOLDER_CACHES / MAX_FOLDER_CACHE_BYTES."""
+    keep = {cache.root for cache in in_use}
+    try: roots = [p for p in CACHE_FOLDERS_DIR.iterdir() if p.is_dir() and p not in keep]
+    except OSError: return
+    roots.sort(key=_folder_last_used, reverse=True)
+    kept, size = len(keep), sum(_dir_size(root) for root in keep)
+    for root in roots:
+        root_size = _dir_size(root)
+        if kept < MAX_FOLDER_CACHES and size + root_size <= MAX_FOLDER_CACHE_BYTES:
+            kept += 1; size += root_size
+        else: shutil.rmtree(root, ignore_errors=True)
+
+def _adopt_shared_cache(cache):
+    """Moves the single-folder cache into this folder's namespace if it was built from this folder."""
+    if cache.root.exists() or not SHARED_INFO_PATH.exists(): return
+    try:
+        with open(SHARED_INFO_PATH, 'r') as f: files = json.load(f)
+        first = next(iter(files), None)
+        if first is None or os.path.normcase(os.path.dirname(os.path.abspath(first))) != cache.folder: return
+        cache.root.mkdir(parents=True, exist_ok=True)
+        for src, dst in [(SHARED_HISTORY_DIR, cache.history.root), (SHARED_ENRICHED_DIR, cache.enriched.root),
+                         (SHARED_STATE_PATH, cache.state_path), (SHARED_INFO_PATH, cache.info_path)]:
+            if src.exists(): os.replace(src, dst)
+    except Exception as e: print(f"Cache adoption failed: {e}")
+
+def _source_caches(sources):
+    """(view, caches): one FolderCache per source, plus the merged one when there are several."""
+    caches = [FolderCache(source) for source in sources]
+    view = caches[0] if len(caches) == 1 else FolderCache(sources)
+    return view, caches
+
+def open_folder_caches(sources):
+    """_source_caches, with older cache layouts migrated and the LRU updated."""
+    view, caches = _source_caches(sources)
+    _migrate_legacy_pickles()
+    for cache in caches: _adopt_shared_cache(cache)
+    in_use = caches if view in caches else caches + [view]
+    try:
+        for cache in in_use: cache.touch()
+        _prune_folder_caches(in_use)
+    except OSError as e: print(f"Folder cache bookkeeping failed: {e}")
+    return view, caches
+
+_modifier_index = None
+
+def get_modifier_index():
+    """Shared, persistent ModifierIndex (versioned with CACHE_VERSION)."""
+    global _modifier_index
+    if _modifier_index is None: _modifier_index = ModifierIndex(CACHE_MODIFIERS_PATH, CACHE_VERSION)
+    return _modifier_index
+
+def save_modifier_index():
+    """Queues a save of the shared ModifierIndex (a no-op when nothing new was parsed)."""
+    _writer.submit('modifiers', get_modifier_index().save, replace=True)
+
+def _index_modifiers(history_df, appended_df):
+    # Parse the variants of any new scenario names now, on the loader thread.
+    # An empty (new / discarded) index takes the whole history instead.
+    try:
+        index = get_modifier_index()
+        runs_df = appended_df if index.names else history_df
+        index.add_names(runs_df['Scenario'].unique())
+        save_modifier_index()
+    except Exception as e: print(f"Modifier index update failed: {e}")
+
+def has_history_cache(stats_folder_paths):
+    """True when at least one of the folders was parsed before (the first load is not a cold one)."""
+    if SHARED_HISTORY_DIR.exists() or LEGACY_HISTORY_PATH.exists(): return True
+    return any(FolderCache(source).history.exists() for source in stats_sources(stats_folder_paths))
+
+def _migrate_legacy_pickles():
+    """One-shot move of the old pickle caches into the (shared layout) column stores."""
+    if LEGACY_HISTORY_PATH.exists():
+        history_store = ColumnStore(SHARED_HISTORY_DIR, HISTORY_VERSION)
+        try:
+            if not history_store.exists(): history_store.write(pd.read_pickle(LEGACY_HISTORY_PATH))
+            LEGACY_HISTORY_PATH.unlink()
+        except Exception as e: print(f"History cache migration failed: {e}")
+
+    if LEGACY_ENRICHED_PATH.exists():
+        try:
+            meta = {}
+            if LEGACY_META_PATH.exists():
+                with open(LEGACY_META_PATH, 'r') as f: meta = json.load(f)
+            # Same rule as the hot cache: an enriched cache from another version is useless
+            enriched_store = ColumnStore(SHARED_ENRICHED_DIR, CACHE_VERSION)
+            if meta.get('version') == CACHE_VERSION and not enriched_store.exists():
+                enriched_store.write(pd.read_pickle(LEGACY_ENRICHED_PATH).drop(columns=SESSION_COLUMNS, errors='ignore'))
+            LEGACY_ENRICHED_PATH.unlink()
+            if LEGACY_META_PATH.exists(): LEGACY_META_PATH.unlink()
+        except Exception as e: print(f"Enriched cache migration failed: {e}")
+
+def is_stats_file(name):
+    return name.endswith('.csv') and 'Challenge' in name
+
+def snapshot_stats_dir(stats_folder_path):
+    """Names of the stats files currently in the folder (no stat calls, cheap to diff)."""
     try:
         with os.scandir(stats_folder_path) as entries:
-            for entry in entries:
-                if not entry.name.endswith('.csv') or 'Challenge' not in entry.name:
-                    continue
-                mtime = entry.stat().st_mtime
-                fpath = entry.path
-                
-                current_files_info[str(fpath)] = mtime
-                
-                if str(fpath) not in processed_files_info or mtime > processed_files_info[str(fpath)]:
-                    new_files_to_process.append(fpath)
-                    files_changed = True
+            return {entry.name for entry in entries if is_stats_file(entry.name)}
+    except OSError: return set()
+
+def snapshot_stats_dirs(stats_folder_paths):
+    """Paths of the stats files in every source folder (names can repeat across folders)."""
+    return {os.path.join(source, name) for source in stats_sources(stats_folder_paths) for name in snapshot_stats_dir(source)}
+
+def row_hashes(df):
+    """uint64 hash of the DEDUP_COLUMNS of every run. Equal runs hash equal in any folder."""
+    keys = df[DEDUP_COLUMNS].copy()
+    keys['Scenario'] = keys['Scenario'].astype(object)
+    # Same instant, same hash, whatever resolution the parser produced
+    keys['Timestamp'] = keys['Timestamp'].astype('datetime64[ns]')
+    return pd.util.hash_pandas_object(keys, index=False).to_numpy(dtype=np.uint64)
+
+def _load_history_cache(cache):
+    """
+    Returns (cached_history_df, history_loaded). A history only counts as loaded together with
+    its bookkeeping: the file manifest of a folder, the merge counts of a merged view.
+    """
+    if not cache.merged and os.path.exists(cache.info_path): _import_files_info(cache)
+    bookkeeping = _load_merge_counts(cache) is not None if cache.merged else cache.files.exists()
+    if cache.history.exists() and bookkeeping:
+        try:
+            cached_history_df = cache.history.load(mmap=False)
+            if not cached_history_df.empty and 'RowHash' not in cached_history_df.columns:
+                # Written before the de-duplication index: hash once and store it
+                cached_history_df['RowHash'] = row_hashes(cached_history_df)
+                cache.history.write(cached_history_df)
+            return cached_history_df, True
+        except: pass
+    return pd.DataFrame(), False
+
+def _import_files_info(cache):
+    """One-shot move of cache_info.json ({path: mtime}) into the folder's FileManifest."""
+    try:
+        with open(cache.info_path, 'r') as f: files_info = json.load(f)
+        # No scan signals yet: the first scan is a full sweep against these mtimes
+        cache.files.save({os.path.basename(path): mtime for path, mtime in files_info.items()}, replace=True)
+        os.remove(cache.info_path)
+    except Exception as e: print(f"File info migration failed: {e}")
+
+def _load_merge_counts(view):
+    try:
+        with open(view.info_path, 'r') as f: return json.load(f)
+    except (OSError, ValueError): return None
+
+def _source_state(cache):
+    """Cached runs of a source and the bookkeeping for new ones (filled by the scan / watcher)."""
+    cached_history_df, history_loaded = _load_history_cache(cache)
+    return {'history': cached_history_df, 'loaded': history_loaded, 'new_files': [], 'changed': False,
+            'files': {}, 'removed': [], 'signals': None} # Manifest updates, saved with the runs
+
+def _stats_file_time(name):
+    match = STATS_TIME_RE.search(name)
+    return match.group(1) if match else None
+
+def _scan_source(source, cache):
+    """
+    _source_state plus a scan of the folder for new / modified files. None if unreadable.
+    Cheapest signal first, so a refresh does not stat every file:
+      1. directory mtime as recorded (and not racy) -> nothing was added or removed, no listing
+      2. the listing only adds names past the high-water mark -> stat just those
+      3. anything else (removals, older names, no signals yet) -> stat every file
+    Files rewritten in place keep the directory mtime, only a full sweep sees them.
+    """
+    state = _source_state(cache)
+    scanned_at = time.time()
+    try: dir_mtime_ns = os.stat(source).st_mtime_ns
+    except OSError: return None
+
+    signals = cache.files.signals() if state['loaded'] else None
+    # An mtime within the tick of the last scan may have been bumped again in that same tick
+    if (signals and signals['dir_mtime_ns'] == dir_mtime_ns
+            and signals['scanned_at'] - dir_mtime_ns / 1e9 > RACY_MTIME_SECONDS):
+        return state
+
+    try:
+        with os.scandir(source) as it:
+            entries = [entry for entry in it if is_stats_file(entry.name)]
     except OSError:
-        return pd.DataFrame()
+        return None
+
+    known = cache.files.mtimes() if state['loaded'] else {}
+    added = [entry for entry in entries if entry.name not in known]
+    added_times = [_stats_file_time(entry.name) for entry in added]
+    high_water = signals['high_water'] if signals else ''
+    # Entry count: nothing known went missing
+    incremental = (signals is not None and len(entries) == len(known) + len(added)
+                   and all(t is not None and t > high_water for t in added_times))
+
+    if incremental:
+        to_stat = added
+        high_water = max([high_water] + added_times)
+    else:
+        to_stat = entries
+        state['removed'] = list(known.keys() - {entry.name for entry in entries})
+        high_water = max([''] + [t for t in map(_stats_file_time, known.keys() - set(state['removed'])) if t]
+                         + [t for t in added_times if t])
+
+    for entry in to_stat:
+        try: mtime = entry.stat().st_mtime
+        except OSError: continue # Deleted / renamed mid-scan
+        if entry.name not in known or mtime > known[entry.name]:
+            state['files'][entry.name] = mtime
+            state['new_files'].append(entry.path)
+
+    state['changed'] = bool(state['new_files'])
+    state['signals'] = {'dir_mtime_ns': dir_mtime_ns, 'scanned_at': scanned_at, 'high_water': high_water}
+    if state['loaded'] and not state['changed']:
+        # Nothing to parse: record the signals now, or every refresh would list the folder again
+        _writer.submit((cache.root, 'history'), partial(cache.files.save, {}, state['removed'], state['signals']))
+    return state
+
+def _merged_counts(caches, states):
+    return {cache.folder: len(state['history']) for cache, state in zip(caches, states)}
+
+def _view_is_current(view, caches, states):
+    """A merged view is current when it has consumed exactly the stored runs of each source."""
+    if view in caches: return True
+    return _load_merge_counts(view) == _merged_counts(caches, states)
+
+def find_and_process_stats(stats_folder_paths, session_gap_minutes=30, workers=1, progress_callback=None):
+    """
+    Runs of one stats folder or a list of them, enriched. Each folder keeps its own raw
+    history; several are merged into one, with runs found in more than one folder kept once.
+    """
+    result = _process_stats(stats_folder_paths, session_gap_minutes, workers, progress_callback)
+    return None if result is None else result[0]
+
+def load_enriched_snapshot(stats_folder_paths, session_gap_minutes=30):
+    """
+    The enriched history as last stored, without scanning the stats folders, so it can be
+    shown right away while reconcile_stats catches up in the background.
+    None when there is no snapshot for these folders.
+    """
+    sources = stats_sources(stats_folder_paths)
+    if not sources: return None
+    view, _ = _source_caches(sources)
+    # No flush: this runs on the UI thread. Writes are atomic per store, so a pending one
+    # only makes the snapshot a bit older, and reconcile_stats brings it up to date.
+    try:
+        enriched_df = view.enriched.load(categorical=('Scenario',))
+        if enriched_df is not None and not enriched_df.empty:
+            return with_sessions(compact_enriched(enriched_df), session_gap_minutes)
+    except Exception as e: print(f"Snapshot load failed: {e}")
+    return None
+
+def reconcile_stats(stats_folder_paths, snapshot_df, session_gap_minutes=30, workers=1, progress_callback=None):
+    """
+    find_and_process_stats for a UI already showing snapshot_df (see load_enriched_snapshot).
+    Returns (enriched_df, delta):
+      snapshot_df, None  -> the snapshot was current
+      enriched_df, delta -> new runs (see make_delta), appended or re-enriched
+      enriched_df, None  -> nothing to append to (no runs / folders gone)
+    """
+    result = _process_stats(stats_folder_paths, session_gap_minutes, workers, progress_callback, known_df=snapshot_df)
+    if result is None: return None, None
+    enriched_df, appended, reenriched = result
+    if enriched_df is None: return snapshot_df, None
+    if enriched_df.empty: return enriched_df, None
+    # Incremental enrichment appends to the stored rows, which are the snapshot's
+    if appended is not None and not reenriched and len(enriched_df) - len(appended) == len(snapshot_df):
+        if appended.empty: return snapshot_df, None
+        return enriched_df, make_delta(enriched_df, appended, False)
+    return enriched_df, make_delta(enriched_df, enriched_df, True)
 
-    if len(current_files_info) != len(processed_files_info):
-        files_changed = True
+def _process_stats(stats_folder_paths, session_gap_minutes, workers=1, progress_callback=None, known_df=None):
+    """
+    find_and_process_stats, returning (enriched_df, appended_df, reenriched) or None without folders.
+    A hot cache gives appended_df None. If it also holds the rows of known_df (the enriched frame on screen)
+    it is not loaded at all (enriched_df None). known_df is also what new runs get appended to (see _enrich_incremental).
+    """
+    sources = stats_sources(stats_folder_paths)
+    if not sources: return None
+
+    view, caches = open_folder_caches(sources)
+    enriched_store = view.enriched
+
+    # 1-2. Load each source's cache and scan its folder (concurrently, it is mostly I/O)
+    _await_writes(caches + [view], 'history') # The previous load may still be writing its runs
+    with ThreadPoolExecutor(max_workers=len(sources)) as pool:
+        states = list(pool.map(_scan_source, sources, caches))
+    if any(state is None for state in states):
+        return pd.DataFrame(), None, False
+
+    files_changed = any(state['changed'] for state in states) or not _view_is_current(view, caches, states)
 
     # 3. HOT CACHE CHECK (With Version Control)
-    if not files_changed and os.path.exists(CACHE_ENRICHED_PATH) and os.path.exists(CACHE_META_PATH):
+    # The store itself rejects data written under another CACHE_VERSION.
+    # It holds no session columns, so any session gap is served from it.
+    _await_writes([view], 'enriched')
+    if not files_changed and enriched_store.exists():
         try:
-            with open(CACHE_META_PATH, 'r') as f: meta = json.load(f)
-            # Check Gap AND Version
-            if meta.get('session_gap') == session_gap_minutes and meta.get('version') == CACHE_VERSION:
-                return pd.read_pickle(CACHE_ENRICHED_PATH)
+            if known_df is not None and enriched_store.row_count == len(known_df): return None, None, False
+            enriched_df = enriched_store.load(categorical=('Scenario',))
+            if enriched_df is not None: return with_sessions(compact_enriched(enriched_df), session_gap_minutes), None, False
         except: pass
 
     # 4. Processing
-    if new_files_to_process:
-        newly_parsed_data = [d for d in (parse_kovaaks_stats_file(fp) for fp in new_files_to_process) if d]
-        if newly_parsed_data:
-            new_df = pd.DataFrame(newly_parsed_data)
-            combined_history_df = pd.concat([cached_history_df, new_df], ignore_index=True)
-            combined_history_df.drop_duplicates(subset=['Scenario', 'Sens', 'Timestamp', 'Score'], inplace=True)
-        else: combined_history_df = cached_history_df
-    else: combined_history_df = cached_history_df
-        
-    if combined_history_df.empty: return pd.DataFrame()
+    return _ingest(view, caches, states, session_gap_minutes, workers, progress_callback, known_df)
 
-    try:
-        combined_history_df.to_pickle(CACHE_HISTORY_PATH)
-        with open(CACHE_INFO_PATH, 'w') as f: json.dump(current_files_info, f, indent=2)
-    except: pass
+def append_stats_files(stats_folder_paths, file_paths, session_gap_minutes=30, known_df=None):
+    """
+    Event driven counterpart of find_and_process_stats: only parses file_paths
+    (e.g. from a directory snapshot diff) instead of scanning the whole folders.
+    known_df is the enriched history already in memory (the views'); new runs are
+    appended to it instead of the one stored on disk.
+    Returns (enriched_df, delta) where delta describes the appended rows (see make_delta),
+    or None when nothing was added. Without a cache it falls back to the full scan.
+    """
+    sources = stats_sources(stats_folder_paths)
+    view, caches = _source_caches(sources) if sources else (None, [])
+    _await_writes(caches + [view] if view else [], 'history', 'enriched')
+    states = [_source_state(cache) for cache in caches]
+    if not states or not all(state['loaded'] for state in states) or not _view_is_current(view, caches, states):
+        enriched_df = find_and_process_stats(stats_folder_paths, session_gap_minutes)
+        if enriched_df is None or enriched_df.empty: return enriched_df, None
+        return enriched_df, make_delta(enriched_df, enriched_df, True)
+
+    owners = {cache.folder: state for cache, state in zip(caches, states)}
+    for fpath in file_paths:
+        if not is_stats_file(os.path.basename(fpath)): continue
+        state = owners.get(_normalize_folder(os.path.dirname(fpath)))
+        if state is None: continue # Folder no longer a source
+        try: mtime = os.stat(fpath).st_mtime
+        except OSError: continue # Deleted / renamed before we got to it
+        state['files'][os.path.basename(fpath)] = mtime
+        state['new_files'].append(fpath)
+
+    # A full refresh may have picked some up already
+    for cache, state in zip(caches, states):
+        known = cache.files.mtimes(state['files'])
+        for fpath in list(state['new_files']):
+            name = os.path.basename(fpath)
+            if name in known and state['files'][name] <= known[name]:
+                del state['files'][name]; state['new_files'].remove(fpath)
+
+    enriched_df, appended, reenriched = _ingest(view, caches, states, session_gap_minutes, known_df=known_df)
+    if appended.empty: return enriched_df, None
+    return enriched_df, make_delta(enriched_df, appended, reenriched)
+
+def make_delta(enriched_df, appended_df, reenriched):
+    """
+    Payload of StateManager.data_appended.
+    Without re-enrichment the new rows are the tail of enriched_df (start:stop).
+    With it, every row may have changed, so start is 0.
+    """
+    rows = len(appended_df)
+    new_rows = appended_df if reenriched else enriched_df.iloc[len(enriched_df) - rows:]
+    return {
+        'start': 0 if reenriched else len(enriched_df) - rows,
+        'stop': len(enriched_df),
+        'rows': rows,
+        'scenarios': set(new_rows['Scenario']),
+        'combos': set(zip(new_rows['Scenario'], new_rows['Sens'])),
+        'sessions': set(new_rows['SessionID'].astype(int)) if 'SessionID' in new_rows else set(),
+        'reenriched': reenriched
+    }
+
+def _ingest(view, caches, states, session_gap_minutes, workers=1, progress_callback=None, known_df=None):
+    """Parses the new files of every source, stores their runs and brings the view up to date."""
+    # One parse call for all sources (a single pool), then each source takes its slice back
+    new_files = [fpath for state in states for fpath in state['new_files']]
+    parsed = parse_stats_files(new_files, workers, progress_callback) if new_files else []
+    offset = 0
+    for cache, state in zip(caches, states):
+        count = len(state['new_files'])
+        new_df = pd.DataFrame([d for d in parsed[offset:offset + count] if d])
+        offset += count
+        state['history'], state['appended'] = _dedupe_runs(state['history'], new_df)
+        # The manifest only after the runs: a failed write leaves the files to parse again
+        _writer.submit((cache.root, 'history'), partial(
+            _store_source, cache, state['history'], state['appended'], state['loaded'],
+            state['files'], state['removed'], state['signals']), replace=not state['loaded'])
+
+    if view in caches:
+        state = states[0]
+        history_df, appended, history_loaded = state['history'], state['appended'], state['loaded']
+    else:
+        history_df, appended, history_loaded = _merge_sources(view, caches, states)
+    return _commit_new_runs(view, history_df, appended, history_loaded, session_gap_minutes, known_df)
+
+def _dedupe_runs(cached_history_df, new_df):
+    """
+    The runs of new_df that are not in cached_history_df yet, appended to it.
+    Duplicates are found through RowHash (no frame wide drop_duplicates).
+    Returns (combined_history_df, appended_df).
+    """
+    if not new_df.empty:
+        if 'RowHash' not in new_df.columns: new_df['RowHash'] = row_hashes(new_df)
+        keep = ~new_df['RowHash'].duplicated().to_numpy()
+        if not cached_history_df.empty:
+            keep &= ~np.isin(new_df['RowHash'].to_numpy(), cached_history_df['RowHash'].to_numpy())
+        new_df = new_df[keep]
+    combined_history_df = pd.concat([cached_history_df, new_df], ignore_index=True) if not new_df.empty else cached_history_df
+    return combined_history_df, combined_history_df.iloc[len(cached_history_df):]
+
+def _store_runs(cache, combined_history_df, appended, history_loaded):
+    if combined_history_df.empty: return
+    if not history_loaded: cache.history.write(combined_history_df)
+    elif not appended.empty: cache.history.append(appended)
+
+def _store_source(cache, combined_history_df, appended, history_loaded, files, removed, signals):
+    _store_runs(cache, combined_history_df, appended, history_loaded)
+    cache.files.save(files, removed, signals, replace=not history_loaded)
+
+def _store_merged(view, merged_df, appended, history_loaded, merged_counts):
+    _store_runs(view, merged_df, appended, history_loaded)
+    _write_json(view.info_path, merged_counts)
 
-    # 5. Enrichment
-    combined_history_df = _detect_and_assign_sessions(combined_history_df, session_gap_minutes)
-    enriched_df = enrich_history_with_stats(combined_history_df)
+def _merge_sources(view, caches, states):
+    """
+    Brings the merged history of several sources up to date with theirs: only rows a source
+    stored since the last merge are looked at. Returns (merged_df, appended_df, history_loaded).
+    Removing or adding a source is a different view, built from the stored source histories.
+    """
+    merged_df, history_loaded = _load_history_cache(view)
+    merged_counts = _load_merge_counts(view) or {}
+    # A rebuilt source history may have a different row order: start the merge over
+    if history_loaded and (not all(state['loaded'] for state in states) or set(merged_counts) != {c.folder for c in caches}
+                           or any(merged_counts[c.folder] > len(state['history']) for c, state in zip(caches, states))):
+        merged_df, merged_counts, history_loaded = pd.DataFrame(), {}, False
+
+    parts = [state['history'].iloc[merged_counts.get(cache.folder, 0):] for cache, state in zip(caches, states)]
+    parts = [part for part in parts if not part.empty]
+    new_df = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+    merged_df, appended = _dedupe_runs(merged_df, new_df)
+    _writer.submit((view.root, 'history'), partial(
+        _store_merged, view, merged_df, appended, history_loaded, _merged_counts(caches, states)), replace=not history_loaded)
+    return merged_df, appended, history_loaded
+
+def _commit_new_runs(cache, history_df, appended, history_loaded, session_gap_minutes, known_df=None):
+    """
+    Enriches the (merged) history, incrementally when possible. Returns (enriched_df, appended_df, reenriched).
+    Only session independent columns are enriched and stored; SESSION_COLUMNS come from with_sessions.
+    """
+    if history_df.empty: return pd.DataFrame(), history_df, False
+
+    # RowHash is bookkeeping of the raw history only
+    cached_rows = len(history_df) - len(appended)
+    history_df = history_df.drop(columns=['RowHash'], errors='ignore')
+    appended = appended.drop(columns=['RowHash'], errors='ignore')
+
+    _index_modifiers(history_df, appended)
+
+    # 5. Incremental Enrichment (only the appended runs)
+    if history_loaded:
+        try:
+            enriched_df = _enrich_incremental(cache, appended, cached_rows, known_df)
+            if enriched_df is not None: return with_sessions(enriched_df, session_gap_minutes), appended, False
+        except Exception as e: print(f"Incremental enrichment failed, rebuilding: {e}")
+
+    # 6. Full Enrichment
+    enriched_df = enrich_history_with_stats(history_df)
     enriched_df = enriched_df.reset_index(drop=True)
 
-    # 6. Save with Version
+    # 7. Save with Version (behind: the state is built on the writer thread too)
+    _writer.submit((cache.root, 'enriched'), partial(_store_enriched, cache, enriched_df), replace=True)
+
+    return with_sessions(enriched_df, session_gap_minutes), appended, True
+
+# --- INCREMENTAL ENRICHMENT ---
+# Runs only ever get appended in time order, so everything enrich_history_with_stats
+# derives for a row depends on the rows before it. Keeping a small running state per
+# (Scenario, Sens) and per Scenario lets new runs be enriched without touching the rest.
+
+def _build_enrich_state(enriched_df):
+    """Running state after the last row of a fully enriched (time sorted) DataFrame."""
+    combos = enriched_df.groupby(['Scenario', 'Sens'], observed=True).agg(Max=('Score', 'max'), Count=('Score', 'size'))
+    scens = enriched_df.groupby('Scenario', observed=True).agg(Max=('Score', 'max'), Count=('Score', 'size'))
+    last = enriched_df.iloc[-1]
+    return {
+        'version': CACHE_VERSION,
+        'rows': len(enriched_df),
+        'last_timestamp': enriched_df['Timestamp'].iloc[-1].isoformat(),
+        # cummax of the last row's groups (see the PB note in _enrich_incremental)
+        'last_combo_max': float(combos['Max'].loc[(last['Scenario'], last['Sens'])]),
+        'last_scen_max': float(scens['Max'].loc[last['Scenario']]),
+        'combos': [[scen, float(sens), float(r.Max), int(r.Count)] for (scen, sens), r in zip(combos.index, combos.itertuples())],
+        'scenarios': [[scen, float(r.Max), int(r.Count)] for scen, r in zip(scens.index, scens.itertuples())]
+    }
+
+def _load_enrich_state(cache):
     try:
-        enriched_df.to_pickle(CACHE_ENRICHED_PATH)
-        with open(CACHE_META_PATH, 'w') as f: 
-            json.dump({'session_gap': session_gap_minutes, 'version': CACHE_VERSION}, f)
-    except: pass
+        with open(cache.state_path, 'r') as f: state = json.load(f)
+        if state.get('version') == CACHE_VERSION: return state
+    except (OSError, ValueError): pass
+    return None
+
+def _store_enriched(cache, enriched_df):
+    cache.enriched.write(enriched_df, meta={})
+    _write_json(cache.state_path, _build_enrich_state(enriched_df))
+
+def _append_enriched(cache, new_df, state):
+    cache.enriched.append(new_df)
+    _write_json(cache.state_path, state)
+
+def _enrich_incremental(cache, appended_df, cached_rows, known_df=None):
+    """
+    Enriches only appended_df on top of the stored enriched history (session independent columns).
+    known_df, the same history already in memory (with or without SESSION_COLUMNS), saves
+    reading it back from disk. Returns the full enriched DataFrame, or None when a full
+    rebuild is required (no usable state, or a run older than the stored history).
+    """
+    enriched_store = cache.enriched
+    state = _load_enrich_state(cache)
+    if state is None: return None
+    if state['rows'] != cached_rows or enriched_store.row_count != cached_rows: return None
+
+    columns = enriched_store.columns
+    if known_df is not None and len(known_df) == cached_rows and set(columns) <= set(known_df.columns):
+        enriched_df = known_df[columns]
+    else:
+        enriched_df = enriched_store.load(categorical=('Scenario',))
+        if enriched_df is None: return None
+        enriched_df = compact_enriched(enriched_df)
+    if appended_df.empty: return enriched_df
+    if not set(appended_df.columns) <= set(enriched_df.columns): return None # New parser fields
+
+    new_df = appended_df.sort_values('Timestamp').reset_index(drop=True)
+    last_ts = pd.Timestamp(state['last_timestamp'])
+    if new_df['Timestamp'].iloc[0] <= last_ts: return None # Out of order
+
+    combos = {(scen, sens): [mx, cnt] for scen, sens, mx, cnt in state['combos']}
+    scens = {scen: [mx, cnt] for scen, mx, cnt in state['scenarios']}
+
+    # Sorted prior scores, only for the combos that got new runs
+    new_scens = set(new_df['Scenario'])
+    touched = set(zip(new_df['Scenario'], new_df['Sens']))
+    prior = enriched_df.loc[enriched_df['Scenario'].isin(new_scens), ['Scenario', 'Sens', 'Score']]
+    sorted_scores = {key: sorted(grp.tolist()) for key, grp in prior.groupby(['Scenario', 'Sens'], observed=True)['Score'] if key in touched}
+
+    ranks = [("SINGULARITY", 100), ("ARCADIA", 95), ("UBER", 90), ("EXALTED", 82), ("BLESSED", 75), ("TRANSMUTE", 55)]
+    gated = {"SINGULARITY", "ARCADIA", "UBER"}
+    # enrich_history_with_stats shifts the grouped cummax over the whole frame, so a row is
+    # compared against the running max of the previous row's group. Mirrored here so both paths agree.
+    prev_combo_max = state['last_combo_max']
+    prev_scen_max = state['last_scen_max']
+
+    out = {col: [] for col in ['Is_First', 'Is_PB', 'Is_Scen_First', 'Is_Scen_PB']}
+    for r_name, _ in ranks: out[f'Rank_{r_name}'] = []
+
+    for scen, sens, score in zip(new_df['Scenario'], new_df['Sens'], new_df['Score']):
+        c = combos.get((scen, sens))
+        is_first = c is None
+        if is_first: c = combos[(scen, sens)] = [score, 0]
+        out['Is_First'].append(is_first)
+        out['Is_PB'].append(not is_first and score > prev_combo_max)
+
+        s = scens.get(scen)
+        is_scen_first = s is None
+        if is_scen_first: s = scens[scen] = [score, 0]
+        out['Is_Scen_First'].append(is_scen_first)
+        out['Is_Scen_PB'].append(not is_scen_first and score > prev_scen_max)
+
+        # Same as expanding().rank(pct=True): average rank of the new score among all scores so far
+        scores = sorted_scores.setdefault((scen, sens), [])
+        lo = bisect.bisect_left(scores, score)
+        hi = bisect.bisect_right(scores, score)
+        bisect.insort(scores, score)
+        c[0] = max(c[0], score); c[1] += 1
+        s[0] = max(s[0], score); s[1] += 1
+        prev_combo_max, prev_scen_max = c[0], s[0]
+
+        percentile = (lo + (hi - lo + 2) / 2) / c[1] * 100.0
+        for r_name, r_val in ranks:
+            hit = percentile >= r_val
+            if r_name in gated: hit = hit and c[1] >= 10
+            out[f'Rank_{r_name}'].append(int(hit))
+
+    for col, values in out.items(): new_df[col] = values
+    new_df = pack_flags(new_df).reindex(columns=enriched_df.columns)
+    for col in enriched_df.columns:
+        dtype = enriched_df[col].dtype
+        # Categories / float32 are re-decided by compact_enriched on the combined frame
+        if isinstance(dtype, pd.CategoricalDtype) or pd.api.types.is_float_dtype(dtype): continue
+        if dtype != new_df[col].dtype and not new_df[col].isna().any():
+            new_df[col] = new_df[col].astype(dtype)
+
+    enriched_df = compact_enriched(pd.concat([enriched_df, new_df], ignore_index=True))
 
+    state['rows'] = len(enriched_df)
+    state['last_timestamp'] = new_df['Timestamp'].iloc[-1].isoformat()
+    state['last_combo_max'], state['last_scen_max'] = float(prev_combo_max), float(prev_scen_max)
+    state['combos'] = [[scen, sens, mx, cnt] for (scen, sens), (mx, cnt) in combos.items()]
+    state['scenarios'] = [[scen, mx, cnt] for scen, (mx, cnt) in scens.items()]
+    _writer.submit((cache.root, 'enriched'), partial(_append_enriched, cache, new_df, state))
     return enriched_df
 
 def enrich_history_with_stats(df):
-    """Calculates PBs and Assigns Ranks (Vectorized)"""
+    """
+    Calculates PBs and Assigns Ranks (Vectorized).
+    None of it depends on the session gap: SESSION_COLUMNS are added by with_sessions.
+    """
     if df is None or df.empty: return df
     
     # Sort strictly by time
-    df = df.sort_values('Timestamp').reset_index(drop=True)
+    df = df.drop(columns=SESSION_COLUMNS, errors='ignore').sort_values('Timestamp').reset_index(drop=True)
     
     # --- 1. SESSION CONTEXT LOOKUPS ---
-    df['Scen_Start_SessID'] = df.groupby('Scenario')['SessionID'].transform('min')
-    df['Combo_Start_SessID'] = df.groupby(['Scenario', 'Sens'])['SessionID'].transform('min')
+    # Gap dependent, so added per gap by with_sessions (core.analytics.sessions)
 
     # --- 2. VECTORIZED PBs & FIRSTS ---
-    g_sens = df.groupby(['Scenario', 'Sens'])
+    g_sens = df.groupby(['Scenario', 'Sens'], observed=True)
     df['Is_First'] = g_sens.cumcount() == 0
     prev_max_sens = g_sens['Score'].cummax().shift(1).fillna(-999999)
     
     # FIX: A PB must be strictly better than previous AND not the first run
     df['Is_PB'] = (df['Score'] > prev_max_sens) & (~df['Is_First'])
 
-    g_scen = df.groupby('Scenario')
+    g_scen = df.groupby('Scenario', observed=True)
     df['Is_Scen_First'] = g_scen.cumcount() == 0
     prev_max_scen = g_scen['Score'].cummax().shift(1).fillna(-999999)
     
@@ -131,15 +798,14 @@ def enrich_history_with_stats(df):
     df['Is_Scen_PB'] = (df['Score'] > prev_max_scen) & (~df['Is_Scen_First'])
 
     # --- 3. VECTORIZED RANKS ---
-    percentiles = df.groupby(['Scenario', 'Sens'])['Score'].transform(
-        lambda x: x.expanding().rank(pct=True)
-    )
+    # Same values as groupby().transform(lambda x: x.expanding().rank(pct=True)), without the per-group loop
+    percentiles = pd.Series(expanding_pct_rank(df['Score'].to_numpy(), g_sens.ngroup().to_numpy()), index=df.index)
     percentiles = percentiles * 100.0
     
     ranks = [("SINGULARITY", 100), ("ARCADIA", 95), ("UBER", 90), ("EXALTED", 82), ("BLESSED", 75), ("TRANSMUTE", 55)]
     gated = {"SINGULARITY", "ARCADIA", "UBER"}
     
-    run_counts = df.groupby(['Scenario', 'Sens']).cumcount() + 1
+    run_counts = df.groupby(['Scenario', 'Sens'], observed=True).cumcount() + 1
     
     for r_name, r_val in ranks:
         col = f'Rank_{r_name}'
@@ -158,4 +824,4 @@ def enrich_history_with_stats(df):
         col = f'Rank_{r}'
         df[col] = df[col].astype(int)
 
-    return df
\ No newline at end of file
+    return compact_enriched(df)
\ No newline at end of file
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+# --- COMPACT ENRICHED SCHEMA ---
+# The enriched history is held by every widget, so it is kept small:
+#   Scenario                      -> category (sorted categories, only used ones)
+#   Score / Sens                  -> float32, but only when every value survives the round trip
+#   SessionID / *_Start_SessID    -> int32
+#   Is_* / Rank_* booleans        -> one uint16 'Flags' column, read back with flag()
+
+# Bit of each packed boolean in 'Flags'
+FLAG_BITS = {
+    'Is_First': 0, 'Is_PB': 1, 'Is_Scen_First': 2, 'Is_Scen_PB': 3,
+    'Rank_SINGULARITY': 4, 'Rank_ARCADIA': 5, 'Rank_UBER': 6,
+    'Rank_EXALTED': 7, 'Rank_BLESSED': 8, 'Rank_TRANSMUTE': 9
+}
+RANK_FLAGS = [name for name in FLAG_BITS if name.startswith('Rank_')]
+
+FLOAT32_COLUMNS = ['Score', 'Sens']
+INT32_COLUMNS = ['SessionID', 'Scen_Start_SessID', 'Combo_Start_SessID']
+
+def flag(df, name):
+    """Boolean Series for a packed flag (or the plain column on an unpacked frame)."""
+    if name in df.columns: return df[name].astype(bool)
+    bits = (df['Flags'].to_numpy() >> FLAG_BITS[name]) & 1
+    return pd.Series(bits.astype(bool), index=df.index, name=name)
+
+def pack_flags(df):
+    """Replaces the boolean Is_* / Rank_* columns with 'Flags'."""
+    present = [name for name in FLAG_BITS if name in df.columns]
+    if not present: return df
+    packed = np.zeros(len(df), dtype=np.uint16)
+    for name in present:
+        packed |= df[name].to_numpy().astype(np.uint16) << FLAG_BITS[name]
+    df = df.drop(columns=present)
+    df['Flags'] = packed
+    return df
+
+def unpack_flags(df):
+    """Inverse of pack_flags (debugging / comparing against older caches)."""
+    if 'Flags' not in df.columns: return df
+    df = df.copy()
+    for name in FLAG_BITS:
+        df[name] = flag(df, name)
+    for name in RANK_FLAGS: df[name] = df[name].astype(int)
+    return df.drop(columns=['Flags'])
+
+def _is_float32_safe(values):
+    with np.errstate(over='ignore', invalid='ignore'):
+        return np.array_equal(values.astype(np.float32).astype(np.float64), values, equal_nan=True)
+
+def compact_enriched(df):
+    """Applies the compact schema. Columns that already match are left alone (no copies)."""
+    if df is None or df.empty: return df
+    df = pack_flags(df)
+    if 'Scenario' in df.columns and not isinstance(df['Scenario'].dtype, pd.CategoricalDtype):
+        df['Scenario'] = df['Scenario'].astype('category')
+    for col in FLOAT32_COLUMNS:
+        if col in df.columns and df[col].dtype == np.float64 and _is_float32_safe(df[col].to_numpy()):
+            df[col] = df[col].astype(np.float32)
+    for col in INT32_COLUMNS:
+        if col in df.columns and df[col].dtype == np.int64:
+            df[col] = df[col].astype(np.int32)
+    return df
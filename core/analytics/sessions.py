@@ -0,0 +1,73 @@
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+# --- SESSION COLUMNS ---
+# The only enriched columns that depend on the session gap. Everything else
+# (PBs, firsts, ranks) is stored once; these are derived per gap from the
+# time between consecutive runs, so changing the gap never re-enriches.
+SESSION_COLUMNS = ['SessionID', 'Scen_Start_SessID', 'Combo_Start_SessID']
+
+# Gap values whose columns are kept per index (the settings spinner revisits the same few)
+MAX_MEMO_GAPS = 8
+
+class SessionIndex:
+    """
+    Gap independent parts of the session columns of a time sorted enriched DataFrame:
+        gaps      -> ns between each run and the previous one (0 for the first)
+        scen_first / combo_first -> row of the first run of each row's Scenario / (Scenario, Sens)
+    Since SessionID never decreases over time, a group's start session is the session of its first run.
+    """
+    def __init__(self, df):
+        self.source = df
+        self.rows = len(df)
+        ts = df['Timestamp'].to_numpy().astype('datetime64[ns]').view(np.int64)
+        self.gaps = np.zeros(self.rows, dtype=np.int64)
+        self.gaps[1:] = np.diff(ts)
+        self.scen_first = _first_rows(df.groupby('Scenario', observed=True, sort=False).ngroup().to_numpy())
+        self.combo_first = _first_rows(df.groupby(['Scenario', 'Sens'], observed=True, sort=False).ngroup().to_numpy())
+        self.memo = OrderedDict()
+
+    def columns(self, session_gap_minutes):
+        """{column: int32 array} of SESSION_COLUMNS for the gap, memoized."""
+        if session_gap_minutes in self.memo:
+            self.memo.move_to_end(session_gap_minutes)
+            return self.memo[session_gap_minutes]
+        # Same rule as before: a new session starts after a gap strictly longer than the setting
+        session_ids = np.cumsum(self.gaps > int(session_gap_minutes * 60e9), dtype=np.int32)
+        cols = {
+            'SessionID': session_ids,
+            'Scen_Start_SessID': session_ids[self.scen_first],
+            'Combo_Start_SessID': session_ids[self.combo_first]
+        }
+        # Shared by every frame built for this gap, like the read-only mapped store columns
+        for arr in cols.values(): arr.flags.writeable = False
+        self.memo[session_gap_minutes] = cols
+        if len(self.memo) > MAX_MEMO_GAPS: self.memo.popitem(last=False)
+        return cols
+
+def _first_rows(group_codes):
+    """Row of the first occurrence of each row's group code."""
+    first = pd.Series(group_codes).drop_duplicates()
+    lookup = np.empty(group_codes.max() + 1 if len(group_codes) else 0, dtype=np.int32)
+    lookup[first.to_numpy()] = first.index.to_numpy()
+    return lookup[group_codes]
+
+_index_cache = {'index': None}
+
+def get_session_index(df):
+    """Shared SessionIndex (rebuilt when handed a different DataFrame, e.g. after new runs)."""
+    index = _index_cache['index']
+    if index is not None and index.source is df: return index
+    index = SessionIndex(df)
+    _index_cache['index'] = index
+    return index
+
+def with_sessions(df, session_gap_minutes):
+    """df (time sorted, enriched) with SESSION_COLUMNS for the gap. Other columns are shared, not copied."""
+    if df is None or df.empty or 'Timestamp' not in df.columns: return df
+    index = get_session_index(df)
+    out = df.assign(**index.columns(session_gap_minutes))
+    # Same rows, so the index (and its memo) carries over to the result
+    index.source = out
+    return out
@@ -2,6 +2,7 @@ import pandas as pd
 import numpy as np
 from datetime import timedelta
 from collections import defaultdict
+from core.analytics.schema import flag, RANK_FLAGS
 
 def format_timedelta(td):
     if isinstance(td, (int, float)): td = timedelta(seconds=td)
@@ -34,25 +35,98 @@ def calculate_detailed_stats(runs_df):
     stats['launchpad_avg'] = pre_pb['Score'].mean() if not pre_pb.empty else 0.0
     return stats
 
+def _scenario_counts(df):
+    # value_counts on a categorical also lists unplayed categories (with 0)
+    counts = df['Scenario'].value_counts()
+    return counts[counts > 0]
+
 def calculate_profile_stats(df):
     if df is None or df.empty: return {}
     stats = {
         'total_runs': len(df),
         'active_time': df['Duration'].sum(),
         'unique_scens': df['Scenario'].nunique(),
-        'unique_combos': df.groupby(['Scenario', 'Sens']).ngroups,
-        'total_pbs': df['Is_PB'].sum()
+        'unique_combos': df.groupby(['Scenario', 'Sens'], observed=True).ngroups,
+        'total_pbs': flag(df, 'Is_PB').sum()
     }
     ranks = {}
-    for col in df.columns:
-        if col.startswith('Rank_'):
-            ranks[col.replace('Rank_', '')] = df[col].sum()
+    for col in RANK_FLAGS:
+        ranks[col.replace('Rank_', '')] = flag(df, col).sum()
     stats['ranks'] = ranks
-    stats['top_scens'] = df['Scenario'].value_counts().head(10).to_dict()
+    counts = _scenario_counts(df)
+    stats['scen_counts'] = counts.to_dict()
+    stats['top_scens'] = counts.head(10).to_dict()
+    return stats
+
+def update_profile_stats(stats, new_rows):
+    """
+    Folds appended (already enriched) runs into a calculate_profile_stats() result.
+    Is_First / Is_Scen_First mark combos / scenarios never played before, so nothing
+    outside new_rows has to be looked at.
+    """
+    if not stats: return calculate_profile_stats(new_rows)
+    if new_rows is None or new_rows.empty: return stats
+    stats = dict(stats)
+    stats['total_runs'] += len(new_rows)
+    stats['active_time'] += new_rows['Duration'].sum()
+    stats['unique_scens'] += int(flag(new_rows, 'Is_Scen_First').sum())
+    stats['unique_combos'] += int(flag(new_rows, 'Is_First').sum())
+    stats['total_pbs'] += flag(new_rows, 'Is_PB').sum()
+
+    ranks = dict(stats['ranks'])
+    for col in RANK_FLAGS:
+        name = col.replace('Rank_', '')
+        ranks[name] = ranks.get(name, 0) + flag(new_rows, col).sum()
+    stats['ranks'] = ranks
+
+    counts = dict(stats['scen_counts'])
+    for scen, n in _scenario_counts(new_rows).items():
+        counts[scen] = counts.get(scen, 0) + n
+    stats['scen_counts'] = counts
+    stats['top_scens'] = pd.Series(counts).sort_values(ascending=False, kind='stable').head(10).to_dict()
     return stats
 
 # --- CORE SESSION LOGIC ---
 
+def _prefix_baselines(history_df, keys):
+    """
+    Per (SessionID, key): max / sum / count of all runs of that key in EARLIER sessions.
+    Only keys played in the session are included, keys never played before are left out.
+    """
+    agg = history_df.groupby(['SessionID'] + keys, observed=True)['Score'].agg(['max', 'sum', 'count'])
+    by_key = agg.groupby(level=keys, observed=True, sort=False)
+    prior_max = by_key['max'].cummax().groupby(level=keys, observed=True, sort=False).shift(1)
+    prior_sum = by_key['sum'].cumsum().groupby(level=keys, observed=True, sort=False).shift(1)
+    prior_cnt = by_key['count'].cumsum().groupby(level=keys, observed=True, sort=False).shift(1)
+
+    out = defaultdict(dict)
+    for idx, mx, sm, cnt in zip(agg.index, prior_max.values, prior_sum.values, prior_cnt.values):
+        if np.isnan(cnt): continue
+        key = idx[1] if len(keys) == 1 else idx[1:]
+        out[idx[0]][key] = (mx, sm, cnt)
+    return out
+
+def build_session_baselines(history_df):
+    """
+    One chronological pass over history_df -> {SessionID: baselines} where baselines holds the
+    'scen_max', 'grid_max', 'scen_avg', 'grid_avg' dicts analyze_session would otherwise derive
+    from everything before the session. Each dict only covers the groups played in that session.
+    """
+    if history_df is None or history_df.empty: return {}
+    scen = _prefix_baselines(history_df, ['Scenario'])
+    grid = _prefix_baselines(history_df, ['Scenario', 'Sens'])
+
+    index = {}
+    for sess_id in history_df['SessionID'].unique():
+        s, g = scen.get(sess_id, {}), grid.get(sess_id, {})
+        index[int(sess_id)] = {
+            'scen_max': {k: v[0] for k, v in s.items()},
+            'grid_max': {k: v[0] for k, v in g.items()},
+            'scen_avg': {k: v[1] / v[2] for k, v in s.items()},
+            'grid_avg': {k: v[1] / v[2] for k, v in g.items()}
+        }
+    return index
+
 def _get_pb_indices(scores_series, baseline, stack_pbs, count_new):
     """
     Determines which indices in a series of scores are PBs based on rules.
@@ -93,35 +167,211 @@ def _get_pb_indices(scores_series, baseline, stack_pbs, count_new):
 
     return pb_indices
 
-def analyze_session(session_df, history_df, flow_window=5, stack_pbs=False, count_new=False, summary_only=False):
+def _pb_flags(df, keys, count_new, container='SessionID', prior=None):
+    """
+    Row-wise PB flags for every container (session / day) at once, same rules as
+    _get_pb_indices(stack_pbs=True). df must be sorted by Timestamp.
+    prior: optional Series (indexed by keys) with the best scores from before df.
+    Returns (flags, group codes per (container, keys)).
+    """
+    codes = df.groupby([container] + keys, observed=True).ngroup().to_numpy()
+    cont_max = df.groupby([container] + keys, observed=True)['Score'].max()
+
+    # Baseline = best of all earlier containers (NaN if the group was never played before)
+    baseline = cont_max.groupby(level=keys, observed=True).cummax().groupby(level=keys, observed=True).shift(1)
+    if prior is not None:
+        baseline = np.fmax(baseline.to_numpy(), prior.reindex(baseline.index.droplevel(0)).to_numpy())
+    baseline = np.asarray(baseline, dtype=np.float64)[codes]
+    # Running best inside the container before each run (NaN for the group's first run)
+    prev_in_sess = df['Score'].groupby(codes).cummax().groupby(codes).shift(1).to_numpy()
+
+    scores = df['Score'].to_numpy()
+    has_base = ~np.isnan(baseline)
+    with np.errstate(invalid='ignore'):
+        flags = has_base & (scores > np.fmax(baseline, prev_in_sess))
+        if count_new:
+            # No baseline: the first run sets it and is never a PB itself
+            flags |= ~has_base & ~np.isnan(prev_in_sess) & (scores > prev_in_sess)
+    return flags & (codes >= 0), codes
+
+def summarize_session_pbs(history_df, stack_pbs=False, count_new=False, start=0):
+    """
+    Batch version of analyze_session(..., summary_only=True) for every session in history_df.
+    Returns a DataFrame indexed by SessionID with 'scen_pb_count' and 'sens_pb_count'.
+    Unstacked counts one PB per group, i.e. groups that have at least one stacked PB.
+    start: only summarize the sessions from this row on; the rows before it (whole, older
+    sessions) just give the best scores to beat.
+    """
+    if history_df is None or len(history_df) <= start:
+        return pd.DataFrame(columns=['scen_pb_count', 'sens_pb_count'])
+    cols = ['SessionID', 'Scenario', 'Sens', 'Score', 'Timestamp']
+    df = history_df[cols].iloc[start:].sort_values('Timestamp', kind='stable')
+    head = history_df[cols].iloc[:start] if start else None
+    sess_ids = df['SessionID'].to_numpy()
+
+    def count(keys):
+        prior = head.groupby(keys, observed=True)['Score'].max() if start else None
+        flags, codes = _pb_flags(df, keys, count_new, prior=prior)
+        if stack_pbs: per_row = pd.Series(flags, index=sess_ids)
+        else:
+            hit = pd.Series(flags).groupby(codes).any()
+            per_row = pd.Series(hit.to_numpy()[codes] & ~pd.Series(codes).duplicated().to_numpy(), index=sess_ids)
+        return per_row.groupby(level=0).sum()
+
+    return pd.DataFrame({
+        'scen_pb_count': count(['Scenario']),
+        'sens_pb_count': count(['Scenario', 'Sens'])
+    }).astype(int)
+
+# --- DAILY PB TIMELINE (Calendar) ---
+PB_TRACKS = {'scen': ['Scenario'], 'sens': ['Scenario', 'Sens']}
+
+class PBTimeline:
+    """
+    PB events of the whole history with the day as container (calendar rules): a run is
+    compared to the best of all earlier days and the runs before it on the same day.
+    Computed once for both tracks and every stack_pbs / count_new mode, so the month view,
+    day details and activity markers are lookups. Rows are kept in time order, 'pos' maps
+    them back to positions in the source df.
+    """
+    def __init__(self, df):
+        self.source = None
+        self.rows = 0
+        self.pos = np.empty(0, dtype=np.int64)
+        self.day = np.empty(0, dtype='datetime64[D]')
+        self.frame = None # Day / Scenario / Sens / Score / Duration in time order
+        self.flags = {}   # (track, stack_pbs, count_new) -> bool per row of frame
+        self.daily = None # Per day: runs, duration and one PB count column per flags key
+        self._update(df, 0)
+
+    @staticmethod
+    def _col(key): return '%s_%d_%d' % key
+
+    def extend(self, df, start):
+        """df = the known rows followed by new ones from 'start' on. Rebuilds if that doesn't line up."""
+        self._update(df, start if 0 < start == self.rows else 0)
+
+    def _update(self, df, start):
+        self.source = df
+        if start == len(df): return
+        ts = df['Timestamp'].to_numpy()
+        new_pos = start + np.argsort(ts[start:], kind='stable')
+        if start and ts[new_pos[0]] < ts[self.pos[-1]]: return self._update(df, 0) # Not an append in time
+
+        new = pd.DataFrame({
+            'Day': ts[new_pos].astype('datetime64[D]'),
+            'Scenario': df['Scenario'].to_numpy()[new_pos],
+            'Sens': df['Sens'].to_numpy()[new_pos],
+            'Score': df['Score'].to_numpy()[new_pos],
+            'Duration': df['Duration'].to_numpy()[new_pos]
+        })
+        # Days before the first new run are final, redo from the start of that day
+        cut = int(np.searchsorted(self.day, new['Day'].to_numpy()[0], 'left')) if start else 0
+        head = self.frame.iloc[:cut] if start else None
+        frame = pd.concat([self.frame.iloc[cut:], new], ignore_index=True) if start else new
+
+        flags = {}
+        for track, keys in PB_TRACKS.items():
+            prior = head.groupby(keys, observed=True)['Score'].max() if cut else None
+            for count_new in (False, True):
+                stacked, codes = _pb_flags(frame, keys, count_new, 'Day', prior)
+                # Unstacked = one PB per (day, group): its last stacked one, the first run reaching the day best
+                hit = np.flatnonzero(stacked)
+                best = np.zeros(len(stacked), dtype=bool)
+                best[hit[~pd.Series(codes[hit]).duplicated(keep='last').to_numpy()]] = True
+                flags[(track, True, count_new)] = stacked
+                flags[(track, False, count_new)] = best
+
+        cols = {'runs': np.ones(len(frame), dtype=np.int64), 'duration': frame['Duration'].to_numpy()}
+        for key, arr in flags.items(): cols[self._col(key)] = arr.astype(np.int64)
+        daily = pd.DataFrame(cols).groupby(frame['Day'].to_numpy()).sum()
+
+        if start:
+            first_day = frame['Day'].iloc[0]
+            daily = pd.concat([self.daily[self.daily.index < first_day], daily])
+            flags = {k: np.concatenate([self.flags[k][:cut], v]) for k, v in flags.items()}
+            frame = pd.concat([head, frame], ignore_index=True)
+            new_pos = np.concatenate([self.pos, new_pos])
+
+        self.frame, self.flags, self.daily, self.pos = frame, flags, daily, new_pos
+        self.day = frame['Day'].to_numpy().astype('datetime64[D]')
+        self.rows = len(df)
+
+    # --- LOOKUPS ---
+    def daily_stats(self, stack_pbs, count_new):
+        """{'YYYY-MM-DD': {'runs', 'duration', 'pbs_scen', 'pbs_sens'}} for the calendar cells."""
+        d = self.daily
+        if d is None or d.empty: return {}
+        dates = np.datetime_as_string(d.index.to_numpy().astype('datetime64[D]'), unit='D')
+        return {date: {'runs': runs, 'duration': dur, 'pbs_scen': scen, 'pbs_sens': sens}
+                for date, runs, dur, scen, sens in zip(
+                    dates, d['runs'].tolist(), d['duration'].tolist(),
+                    d[self._col(('scen', stack_pbs, count_new))].tolist(),
+                    d[self._col(('sens', stack_pbs, count_new))].tolist())}
+
+    def _day_span(self, date_str):
+        day = np.datetime64(date_str, 'D')
+        return np.searchsorted(self.day, day, 'left'), np.searchsorted(self.day, day, 'right')
+
+    def day_rows(self, date_str):
+        """Positions (in the source df) of the runs on that day, in time order."""
+        lo, hi = self._day_span(date_str)
+        return self.pos[lo:hi]
+
+    def pb_rows(self, date_str, track, stack_pbs, count_new):
+        """Positions of that day's PB runs for track 'scen' or 'sens'."""
+        lo, hi = self._day_span(date_str)
+        return self.pos[lo:hi][self.flags[(track, stack_pbs, count_new)][lo:hi]]
+
+_timeline_cache = {'timeline': None}
+
+def get_pb_timeline(df, delta=None):
+    """
+    Shared PBTimeline for df, built once per data load.
+    With an append delta (see StateManager.data_appended) the cached one is extended instead.
+    """
+    timeline = _timeline_cache['timeline']
+    if timeline is not None and timeline.source is df: return timeline
+    if timeline is not None and delta is not None and not delta['reenriched']:
+        timeline.extend(df, delta['start'])
+    else:
+        timeline = PBTimeline(df)
+    _timeline_cache['timeline'] = timeline
+    return timeline
+
+def analyze_session(session_df, history_df, flow_window=5, stack_pbs=False, count_new=False, summary_only=False, baselines=None):
     """
     Analyzes a session with strict separation of Scenario vs Sensitivity Tracks.
     If summary_only=True, skips graph generation and returns just the PB counts.
+    baselines: this session's entry from build_session_baselines(); skips the history scan.
     """
     if session_df.empty: return None
     
     # 1. Prepare Snapshots
     session_start = session_df['Timestamp'].min()
     session_df = session_df.sort_values('Timestamp')
-    prior_history = history_df[history_df['Timestamp'] < session_start]
+    prior_history = None if baselines is not None else history_df[history_df['Timestamp'] < session_start]
 
     # 2. Establish Baselines
     base_grid_max = {}
     base_scen_max = {}
     
-    if not prior_history.empty:
-        base_grid_max = prior_history.groupby(['Scenario', 'Sens'])['Score'].max().to_dict()
-        base_scen_max = prior_history.groupby('Scenario')['Score'].max().to_dict()
+    if baselines is not None:
+        base_grid_max = baselines['grid_max']
+        base_scen_max = baselines['scen_max']
+    elif not prior_history.empty:
+        base_grid_max = prior_history.groupby(['Scenario', 'Sens'], observed=True)['Score'].max().to_dict()
+        base_scen_max = prior_history.groupby('Scenario', observed=True)['Score'].max().to_dict()
         
     # 3. Calculate PBs
     scen_pb_indices = set()
-    for scen, group in session_df.groupby('Scenario'):
+    for scen, group in session_df.groupby('Scenario', observed=True):
         baseline = base_scen_max.get(scen)
         pube_idxs = _get_pb_indices(group['Score'], baseline, stack_pbs, count_new)
         scen_pb_indices.update(pube_idxs)
         
     sens_pb_indices = set()
-    for (scen, sens), group in session_df.groupby(['Scenario', 'Sens']):
+    for (scen, sens), group in session_df.groupby(['Scenario', 'Sens'], observed=True):
         baseline = base_grid_max.get((scen, sens))
         pube_idxs = _get_pb_indices(group['Score'], baseline, stack_pbs, count_new)
         sens_pb_indices.update(pube_idxs)
@@ -143,8 +393,12 @@ def analyze_session(session_df, history_df, flow_window=5, stack_pbs=False, coun
     # ---------------------------------
         
     # Averages for Context (Only needed for full report)
-    base_grid_avg = prior_history.groupby(['Scenario', 'Sens'])['Score'].mean().to_dict()
-    base_scen_avg = prior_history.groupby('Scenario')['Score'].mean().to_dict()
+    if baselines is not None:
+        base_grid_avg = baselines['grid_avg']
+        base_scen_avg = baselines['scen_avg']
+    else:
+        base_grid_avg = prior_history.groupby(['Scenario', 'Sens'], observed=True)['Score'].mean().to_dict()
+        base_scen_avg = prior_history.groupby('Scenario', observed=True)['Score'].mean().to_dict()
     
     # 4. Build Output Data
     graph_data_grid = []
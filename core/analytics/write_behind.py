@@ -0,0 +1,56 @@
+import threading
+
+class WriteBehind:
+    """
+    Runs cache writes on one background thread, in submission order, so loaders can
+    hand their data to the UI without waiting on the disk.
+    Jobs share a key per target (e.g. one folder's history store). A job submitted with
+    replace=True rewrites its whole target, so it drops the jobs still queued under the
+    same key: back-to-back refreshes only write their last state.
+    Jobs write through a temp file + rename (or a transaction) themselves, so a crash
+    leaves either the old or the new state on disk.
+    """
+    def __init__(self, name='cache-writer'):
+        self.name = name
+        self._jobs = [] # [(key, fn)]
+        self._running = None # Key of the job being written, if any
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def submit(self, key, fn, replace=False):
+        with self._cond:
+            if replace: self._jobs = [job for job in self._jobs if job[0] != key]
+            self._jobs.append((key, fn))
+            if self._thread is None or not self._thread.is_alive():
+                # Daemon: flush() is the exit hook, an idle writer must not keep the process alive
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._jobs)
+                key, fn = self._jobs.pop(0)
+                self._running = key
+            try: fn()
+            except Exception as e: print(f"Cache write failed ({key}): {e}")
+            with self._cond:
+                self._running = None
+                self._cond.notify_all()
+
+    def pending(self, keys=None):
+        with self._cond: return len(self._busy_keys(keys))
+
+    def _busy_keys(self, keys):
+        busy = [key for key, _ in self._jobs]
+        if self._running is not None: busy.append(self._running)
+        return busy if keys is None else [key for key in busy if key in keys]
+
+    def flush(self, timeout=None, keys=None):
+        """
+        Blocks until every queued write is done, or with keys only those under these keys
+        (e.g. before reading their targets back). False if timeout ran out first.
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._busy_keys(keys), timeout)
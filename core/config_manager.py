@@ -1,4 +1,7 @@
+import os
 import json
+import atexit
+import threading
 from pathlib import Path
 
 # --- THE TRUTH SOURCE ---
@@ -6,8 +9,10 @@ DEFAULT_SETTINGS = {
     "config_version": 3,
     "global": {
         "stats_path": "",
+        "extra_stats_paths": [],
         "playlist_path": "",
         "session_gap": 30,
+        "parse_workers": 0,
         "theme": "dark",
         "app_layout": {},
         "open_tabs": [],
@@ -19,10 +24,25 @@ DEFAULT_SETTINGS = {
     "playlist_favorites": []
 }
 
-class ConfigManager:
-    def __init__(self):
-        self.config_path = Path.home() / '.VSV_cache_config' / "v2_config.json"
+# Changes within this window (a held spin box arrow, a drag) are saved as one write
+SAVE_DELAY_SECONDS = 0.5
+
+class SettingsStore:
+    """
+    The settings of one config file, shared by every ConfigManager on it.
+    Changes only mark it dirty; a timer thread saves SAVE_DELAY_SECONDS after the first
+    change, with everything changed by then. Saves are atomic (temp file + rename).
+    flush() saves right away (on exit, also via atexit).
+    """
+    def __init__(self, config_path):
+        self.config_path = config_path
+        self.lock = threading.RLock() # Guards settings against the timer thread's dump
+        self.write_lock = threading.Lock()
+        self.dirty = False
+        self.timer = None
+        self.saves = 0
         self.settings = self._load_settings()
+        atexit.register(self.flush)
 
     def _load_settings(self):
         user_data = {}
@@ -44,9 +64,58 @@ class ConfigManager:
                 default[key] = value
         return default
 
+    def mark_dirty(self):
+        with self.lock:
+            self.dirty = True
+            if self.timer is None:
+                self.timer = threading.Timer(SAVE_DELAY_SECONDS, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def flush(self):
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            if not self.dirty: return
+            data = json.dumps(self.settings, indent=2)
+            self.dirty = False
+        with self.write_lock:
+            try:
+                self.config_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = self.config_path.with_suffix('.tmp')
+                with open(tmp, 'w') as f: f.write(data)
+                os.replace(tmp, self.config_path)
+                self.saves += 1
+            except OSError as e:
+                print(f"Saving settings failed: {e}")
+                self.mark_dirty() # Try again later
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def _settings_store(config_path):
+    with _stores_lock:
+        if config_path not in _stores: _stores[config_path] = SettingsStore(config_path)
+        return _stores[config_path]
+
+class ConfigManager:
+    """
+    Settings access for a widget. Every instance shares one SettingsStore, so a change made
+    through one is seen by all, and none of them overwrites the file with an old copy.
+    """
+    def __init__(self):
+        self.config_path = Path.home() / '.VSV_cache_config' / "v2_config.json"
+        self.store = _settings_store(self.config_path)
+        self.settings = self.store.settings
+
     def save_settings(self):
-        with open(self.config_path, 'w') as f:
-            json.dump(self.settings, f, indent=2)
+        """Schedules a save (batched with other changes, see SettingsStore)."""
+        self.store.mark_dirty()
+
+    def flush(self):
+        """Saves pending changes now (shutdown)."""
+        self.store.flush()
 
     def get(self, key, scenario=None, default=None):
         if scenario and scenario in self.settings["scenarios"]:
@@ -57,13 +126,15 @@ class ConfigManager:
         return default
 
     def set_global(self, key, value):
-        self.settings["global"][key] = value
+        with self.store.lock:
+            self.settings["global"][key] = value
         self.save_settings()
 
     def set_scenario(self, scenario, key, value):
-        if scenario not in self.settings["scenarios"]:
-            self.settings["scenarios"][scenario] = {}
-        self.settings["scenarios"][scenario][key] = value
+        with self.store.lock:
+            if scenario not in self.settings["scenarios"]:
+                self.settings["scenarios"][scenario] = {}
+            self.settings["scenarios"][scenario][key] = value
         self.save_settings()
 
     # --- SCENARIO FAVORITES ---
@@ -71,18 +142,20 @@ class ConfigManager:
         return self.settings.get("favorites", [])
 
     def add_favorite(self, scenario_name):
-        favs = self.get_favorites()
-        if scenario_name not in favs:
+        with self.store.lock:
+            favs = self.get_favorites()
+            if scenario_name in favs: return
             favs.append(scenario_name)
             self.settings["favorites"] = favs
-            self.save_settings()
+        self.save_settings()
 
     def remove_favorite(self, scenario_name):
-        favs = self.get_favorites()
-        if scenario_name in favs:
+        with self.store.lock:
+            favs = self.get_favorites()
+            if scenario_name not in favs: return
             favs.remove(scenario_name)
             self.settings["favorites"] = favs
-            self.save_settings()
+        self.save_settings()
             
     def is_favorite(self, scenario_name):
         return scenario_name in self.get_favorites()
@@ -92,18 +165,20 @@ class ConfigManager:
         return self.settings.get("playlist_favorites", [])
 
     def add_playlist_favorite(self, name):
-        favs = self.get_playlist_favorites()
-        if name not in favs:
+        with self.store.lock:
+            favs = self.get_playlist_favorites()
+            if name in favs: return
             favs.append(name)
             self.settings["playlist_favorites"] = favs
-            self.save_settings()
+        self.save_settings()
 
     def remove_playlist_favorite(self, name):
-        favs = self.get_playlist_favorites()
-        if name in favs:
+        with self.store.lock:
+            favs = self.get_playlist_favorites()
+            if name not in favs: return
             favs.remove(name)
             self.settings["playlist_favorites"] = favs
-            self.save_settings()
+        self.save_settings()
             
     def is_playlist_favorite(self, name):
         return name in self.get_playlist_favorites()
\ No newline at end of file
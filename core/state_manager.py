@@ -5,6 +5,10 @@ class StateManager(QObject):
     Central Hub for application state.
     """
     data_updated = pyqtSignal(object) 
+    # (df, delta) after runs were appended. delta = {start, stop, rows, scenarios, combos,
+    # sessions, reenriched}; rows df[start:stop] are the new ones. If reenriched is True,
+    # existing rows may have changed too and listeners should take their full path.
+    data_appended = pyqtSignal(object, object)
     scenario_selected = pyqtSignal(str) 
     variant_selected = pyqtSignal(dict) 
     
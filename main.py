@@ -1,10 +1,12 @@
 import sys
 import time
+import multiprocessing
+import shutil
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QDockWidget, QLabel, QSplitter, 
                              QMenu, QPushButton, QHBoxLayout, QVBoxLayout, QWidget, 
                              QFileDialog, QDialog, QFormLayout, QSpinBox, QMessageBox,
                              QComboBox, QCheckBox, QGroupBox, QGridLayout, QDoubleSpinBox,
-                             QSizePolicy, QProgressBar)
+                             QSizePolicy, QProgressBar, QListWidget)
 from PyQt6.QtGui import QAction, QKeySequence, QShortcut
 from PyQt6.QtCore import Qt, QThread, pyqtSignal, QByteArray, QFileSystemWatcher, QTimer
 from pathlib import Path
@@ -13,7 +15,8 @@ import styles
 from core.state_manager import StateManager
 from core.config_manager import ConfigManager
 from core.analytics import processors
-from core.analytics.processors import CACHE_HISTORY_PATH
+from core.analytics.processors import has_history_cache
+from core.analytics.sessions import with_sessions
 
 # Modules
 from modules.navigation.browser_tabs import BrowserTabs
@@ -45,6 +48,22 @@ class SettingsDialog(QDialog):
         self.sb_gap.setSuffix(" min")
         form_gen.addRow("Session Gap:", self.sb_gap)
 
+        # Live preview while the gap changes (only the session columns are re-derived)
+        self.initial_gap = self.sb_gap.value()
+        self.gap_timer = QTimer(self)
+        self.gap_timer.setSingleShot(True)
+        self.gap_timer.setInterval(150)
+        self.gap_timer.timeout.connect(self.preview_gap)
+        self.sb_gap.valueChanged.connect(lambda _: self.gap_timer.start())
+
+        # 0 = Auto (one per CPU core), 1 = Serial
+        self.sb_workers = QSpinBox()
+        self.sb_workers.setRange(0, 64)
+        self.sb_workers.setSpecialValueText("Auto")
+        self.sb_workers.setValue(self.config_manager.get("parse_workers", default=0))
+        self.sb_workers.setToolTip("Processes used to parse new stats files. 1 disables parallel parsing.")
+        form_gen.addRow("Parse Workers:", self.sb_workers)
+
          # --- Playlist Path Selector ---
         self.btn_playlist_path = QPushButton("Select Folder...")
         self.lbl_playlist_path = QLabel(self.config_manager.get("playlist_path", default="Not Set"))
@@ -56,6 +75,22 @@ class SettingsDialog(QDialog):
         path_layout.addWidget(self.lbl_playlist_path)
         path_layout.addWidget(self.btn_playlist_path)
         form_gen.addRow("Playlist Path:", path_layout)
+
+        # --- Extra Stats Folders (merged with the main one, duplicates kept once) ---
+        self.list_extra_paths = QListWidget()
+        self.list_extra_paths.addItems(self.config_manager.get("extra_stats_paths", default=[]))
+        self.list_extra_paths.setMaximumHeight(70)
+        self.list_extra_paths.setToolTip("Other stats folders (backups, a second PC...) loaded together with the main one.")
+        btn_add_extra = QPushButton("Add..."); btn_add_extra.clicked.connect(self.add_extra_folder)
+        btn_remove_extra = QPushButton("Remove"); btn_remove_extra.clicked.connect(self.remove_extra_folder)
+        extra_btns = QVBoxLayout()
+        extra_btns.addWidget(btn_add_extra)
+        extra_btns.addWidget(btn_remove_extra)
+        extra_btns.addStretch()
+        extra_layout = QHBoxLayout()
+        extra_layout.addWidget(self.list_extra_paths)
+        extra_layout.addLayout(extra_btns)
+        form_gen.addRow("Extra Stats Folders:", extra_layout)
         
         self.cb_startup = QComboBox()
         self.cb_startup.addItems(["Last", "Calendar", "Ongoing", "Session Report", "Career Profile"])
@@ -120,7 +155,17 @@ class SettingsDialog(QDialog):
 
     def on_rebuild_clicked(self):
         if self.parent_window: self.parent_window.full_rebuild()
-        self.reject()
+        super().reject() # The rebuild reloads everything, no preview to undo
+
+    def preview_gap(self):
+        if self.parent_window: self.parent_window.preview_session_gap(self.sb_gap.value())
+
+    def reject(self):
+        # Cancel: put the views back on the saved gap
+        self.gap_timer.stop()
+        if self.parent_window and self.sb_gap.value() != self.initial_gap:
+            self.parent_window.preview_session_gap(self.initial_gap)
+        super().reject()
 
     def select_playlist_folder(self):
         current = self.config_manager.get("playlist_path", "")
@@ -129,6 +174,18 @@ class SettingsDialog(QDialog):
         if folder:
             self.lbl_playlist_path.setText(folder)
 
+    def add_extra_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, "Add Stats Folder", str(Path.home()))
+        if folder and folder not in self.extra_paths():
+            self.list_extra_paths.addItem(folder)
+
+    def remove_extra_folder(self):
+        for item in self.list_extra_paths.selectedItems():
+            self.list_extra_paths.takeItem(self.list_extra_paths.row(item))
+
+    def extra_paths(self):
+        return [self.list_extra_paths.item(i).text() for i in range(self.list_extra_paths.count())]
+
     def get_values(self):
         # We need to grab the path from the label if it changed, 
         # or rely on config if user didn't touch it. 
@@ -140,7 +197,9 @@ class SettingsDialog(QDialog):
 
         return {
             "session_gap": self.sb_gap.value(),
+            "parse_workers": self.sb_workers.value(),
             "playlist_path": pl_path,
+            "extra_stats_paths": self.extra_paths(),
             "startup_tab_mode": self.cb_startup.currentText(),
             "calendar_compare_mode": self.cb_cal_mode.currentText(),
             "ongoing_min_pct": self.sb_ong_min.value(),
@@ -153,14 +212,41 @@ class SettingsDialog(QDialog):
 
 class DataLoader(QThread):
     finished = pyqtSignal(object)
-    def __init__(self, path, session_gap): 
+    reconciled = pyqtSignal(object, object) # df, delta (with snapshot_df, see reconcile_stats)
+    progress = pyqtSignal(int, int) # done, total
+    def __init__(self, paths, session_gap, workers=1, snapshot_df=None): 
         super().__init__()
-        self.path = path
+        self.paths = paths
         self.session_gap = session_gap
+        self.workers = workers
+        self.snapshot_df = snapshot_df # Already on screen: only report what changed
+        self.snapshot = set()
     def run(self):
-        df = processors.find_and_process_stats(self.path, session_gap_minutes=self.session_gap)
+        # Taken before the scan: files landing mid-load show up in the next diff
+        self.snapshot = processors.snapshot_stats_dirs(self.paths)
+        if self.snapshot_df is not None:
+            df, delta = processors.reconcile_stats(self.paths, self.snapshot_df, session_gap_minutes=self.session_gap,
+                                                   workers=self.workers, progress_callback=self.progress.emit)
+            self.reconciled.emit(df, delta)
+            return
+        df = processors.find_and_process_stats(self.paths, session_gap_minutes=self.session_gap,
+                                               workers=self.workers, progress_callback=self.progress.emit)
         self.finished.emit(df)
 
+class DeltaLoader(QThread):
+    """Parses just the files a directory diff reported as new."""
+    finished = pyqtSignal(object, object) # df, delta (None if nothing was added)
+    def __init__(self, paths, file_paths, session_gap, known_df=None):
+        super().__init__()
+        self.paths = paths
+        self.file_paths = file_paths
+        self.session_gap = session_gap
+        self.known_df = known_df # What the views hold: appended to without reloading it
+    def run(self):
+        df, delta = processors.append_stats_files(self.paths, sorted(self.file_paths), session_gap_minutes=self.session_gap,
+                                                  known_df=self.known_df)
+        self.finished.emit(df, delta)
+
 class KovaaksV2App(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -175,15 +261,21 @@ class KovaaksV2App(QMainWindow):
         self.current_stats_path = None
         self.is_initial_load = True
         self.load_start_time = 0
+        self.worker = None
+        self.delta_worker = None
+        self.dir_snapshot = set() # Stats file paths (all sources) as of the last load
+        self.current_df = None # Last DataFrame handed to the views
         
         self.file_watcher = QFileSystemWatcher(self)
         self.file_watcher.directoryChanged.connect(self.on_dir_changed)
         self.debounce_timer = QTimer(self)
         self.debounce_timer.setSingleShot(True)
-        self.debounce_timer.setInterval(2000) 
-        self.debounce_timer.timeout.connect(self.refresh_stats)
+        self.debounce_timer.setInterval(500) 
+        self.debounce_timer.timeout.connect(self.load_new_files)
         
         self.state_manager.chart_title_changed.connect(self.update_header_title)
+        self.state_manager.data_updated.connect(self.on_data_changed)
+        self.state_manager.data_appended.connect(self.on_data_changed)
 
         self.setDockOptions(QMainWindow.DockOption.AllowNestedDocks | 
                             QMainWindow.DockOption.AnimatedDocks | 
@@ -311,7 +403,9 @@ class KovaaksV2App(QMainWindow):
         if dlg.exec():
             vals = dlg.get_values()
             self.config_manager.set_global("session_gap", vals["session_gap"])
+            self.config_manager.set_global("parse_workers", vals["parse_workers"])
             self.config_manager.set_global("playlist_path", vals["playlist_path"])
+            self.config_manager.set_global("extra_stats_paths", vals["extra_stats_paths"])
             self.config_manager.set_global("startup_tab_mode", vals["startup_tab_mode"])
             self.config_manager.set_global("calendar_compare_mode", vals["calendar_compare_mode"])
             self.config_manager.set_global("ongoing_min_pct", vals["ongoing_min_pct"])
@@ -321,16 +415,30 @@ class KovaaksV2App(QMainWindow):
             self.config_manager.set_global("dev_mode", vals["dev_mode"])
             self.refresh_stats()
 
-    def update_watcher(self, path):
+    def on_data_changed(self, df, delta=None):
+        self.current_df = df
+
+    def preview_session_gap(self, gap):
+        """Settings preview: every view gets the data with sessions split at gap (memoized per gap)."""
+        if self.current_df is None or self.current_df.empty: return
+        self.state_manager.data_updated.emit(with_sessions(self.current_df, gap))
+
+    def stats_sources(self):
+        """Main stats folder first, then the extra ones from the preferences."""
+        if not self.current_stats_path: return []
+        return [self.current_stats_path] + list(self.config_manager.get("extra_stats_paths", default=[]))
+
+    def update_watcher(self, paths):
         if self.file_watcher.directories():
             self.file_watcher.removePaths(self.file_watcher.directories())
-        if path and self.chk_auto.isChecked():
-            self.file_watcher.addPath(path)
+        paths = [p for p in paths if Path(p).is_dir()]
+        if paths and self.chk_auto.isChecked():
+            self.file_watcher.addPaths(paths)
 
     def on_auto_toggled(self, state):
         self.config_manager.set_global("auto_refresh", self.chk_auto.isChecked())
         if self.chk_auto.isChecked():
-            self.update_watcher(self.current_stats_path)
+            self.update_watcher(self.stats_sources())
         else:
             if self.file_watcher.directories():
                 self.file_watcher.removePaths(self.file_watcher.directories())
@@ -338,10 +446,39 @@ class KovaaksV2App(QMainWindow):
     def on_dir_changed(self, path):
         self.debounce_timer.start()
 
+    def load_new_files(self):
+        """Watcher path: diff the folders against the last snapshot and only parse what is new."""
+        if not self.current_stats_path: return
+        if (self.worker and self.worker.isRunning()) or (self.delta_worker and self.delta_worker.isRunning()):
+            self.debounce_timer.start() # Try again once the current load is done
+            return
+        if not self.dir_snapshot:
+            self.refresh_stats()
+            return
+
+        sources = self.stats_sources()
+        new_paths = processors.snapshot_stats_dirs(sources) - self.dir_snapshot
+        if not new_paths: return # Deletions / temp files: nothing to add
+
+        self.load_start_time = time.time()
+        self.delta_worker = DeltaLoader(sources, new_paths, self.config_manager.get("session_gap", default=30), self.current_df)
+        self.delta_worker.finished.connect(self.on_delta_loaded)
+        self.delta_worker.start()
+
+    def on_delta_loaded(self, df, delta):
+        self.dir_snapshot |= self.delta_worker.file_paths
+        if df is None or not delta: return
+
+        self.state_manager.data_appended.emit(df, delta)
+        duration = time.time() - self.load_start_time
+        print(f"{delta['rows']} rows appended ({duration:.2f}s)")
+        if self.config_manager.get("dev_mode", default=False):
+            self.btn_refresh.setText(f"Refresh (F5) [+{delta['rows']} rows, {duration:.2f}s]")
+
     def auto_load(self):
         saved_path = self.config_manager.get("stats_path")
         if saved_path and Path(saved_path).exists():
-            self.start_loading(saved_path)
+            self.start_loading(saved_path, show_snapshot=True)
             return
 
         # Expanded Path List (Windows + Linux + Steam Deck)
@@ -378,13 +515,21 @@ class KovaaksV2App(QMainWindow):
         folder = QFileDialog.getExistingDirectory(self, "Select Stats Folder", start_dir)
         if folder:
             self.config_manager.set_global("stats_path", folder)
-            self.start_loading(folder)
+            self.start_loading(folder, show_snapshot=True)
 
     def full_rebuild(self):
-        from core.analytics.processors import APP_DATA_DIR
+        from core.analytics.processors import APP_DATA_DIR, CACHE_FOLDERS_DIR
+        processors.flush_cache_writes() # Nothing may still be writing into what gets deleted
         try:
             for f in APP_DATA_DIR.glob("*"):
+                if f == CACHE_FOLDERS_DIR: continue # Other folders' caches stay warm
                 if f.is_file(): f.unlink()
+                elif f.is_dir(): shutil.rmtree(f, ignore_errors=True)
+            sources = self.stats_sources()
+            caches = [processors.FolderCache(source) for source in sources]
+            if len(sources) > 1: caches.append(processors.FolderCache(sources)) # Merged view
+            for cache in caches:
+                shutil.rmtree(cache.root, ignore_errors=True)
             print("Cache cleared.")
         except Exception as e:
             print(f"Error clearing cache: {e}")
@@ -394,9 +539,14 @@ class KovaaksV2App(QMainWindow):
         if self.current_stats_path:
             self.start_loading(self.current_stats_path)
 
-    def start_loading(self, path):
+    def start_loading(self, path, show_snapshot=False):
+        """
+        Loads the stats folder(s) on a worker thread. With show_snapshot the last stored
+        enriched history is shown right away and the worker only pushes what changed.
+        """
         self.current_stats_path = path
-        self.update_watcher(path) 
+        sources = self.stats_sources()
+        self.update_watcher(sources) 
         
         self.btn_refresh.setEnabled(False)
         self.load_start_time = time.time()
@@ -404,7 +554,7 @@ class KovaaksV2App(QMainWindow):
         # --- UI FEEDBACK ---
         self.loader_bar.setRange(0, 0) 
         
-        if not CACHE_HISTORY_PATH.exists():
+        if not has_history_cache(sources):
              self.btn_refresh.setText("Initializing...")
              self.header_label.setText("ANALYTICS - Building Cache (First Run)")
         else:
@@ -412,19 +562,44 @@ class KovaaksV2App(QMainWindow):
         # -------------------
         
         gap = self.config_manager.get("session_gap", default=30)
-        self.worker = DataLoader(path, gap) 
+        workers = self.config_manager.get("parse_workers", default=0)
+
+        # Stale-while-revalidate: no scan before the first paint
+        snapshot_df = processors.load_enriched_snapshot(sources, gap) if show_snapshot else None
+        if snapshot_df is not None:
+            self.show_data(snapshot_df)
+            print(f"Snapshot shown ({time.time() - self.load_start_time:.2f}s), checking for new runs...")
+
+        self.worker = DataLoader(sources, gap, workers, snapshot_df) 
+        self.worker.progress.connect(self.on_load_progress)
         self.worker.finished.connect(self.on_data_loaded)
+        self.worker.reconciled.connect(self.on_data_reconciled)
         self.worker.start()
 
+    def on_load_progress(self, done, total):
+        # Switch from indeterminate to a real bar once parsing reports in
+        self.loader_bar.setRange(0, total)
+        self.loader_bar.setValue(done)
+
     def on_data_loaded(self, df):
+        self.dir_snapshot = self.worker.snapshot
+        self.show_data(df)
+        self.finish_loading()
+
+    def on_data_reconciled(self, df, delta):
+        """Background check of a shown snapshot: only pushes what changed."""
+        self.dir_snapshot = self.worker.snapshot
+        if df is not self.worker.snapshot_df:
+            if delta: self.state_manager.data_appended.emit(df, delta)
+            else: self.state_manager.data_updated.emit(df)
+        self.worker.snapshot_df = None
+        self.finish_loading()
+
+    def show_data(self, df):
         # 1. EMIT DATA
         self.state_manager.data_updated.emit(df)
-        
-        # 2. STOP ANIMATION (Reset to empty bar)
-        self.loader_bar.setRange(0, 100)
-        self.loader_bar.setValue(0)
-        
-        # 3. AUTO-LOAD LOGIC
+
+        # 2. AUTO-LOAD LOGIC
         if self.is_initial_load:
             saved_tabs = self.config_manager.get("open_tabs", default=[])
             if saved_tabs:
@@ -438,6 +613,11 @@ class KovaaksV2App(QMainWindow):
                     except: pass
             
             self.is_initial_load = False 
+
+    def finish_loading(self):
+        # 3. STOP ANIMATION (Reset to empty bar)
+        self.loader_bar.setRange(0, 100)
+        self.loader_bar.setValue(0)
             
         # 4. STOP TIMER
         duration = time.time() - self.load_start_time
@@ -460,6 +640,9 @@ class KovaaksV2App(QMainWindow):
         }
         self.config_manager.set_global("app_layout", settings)
         self.grid_container.save_state()
+        # Cache writes run behind the loaders: let the queued ones land before exiting
+        processors.flush_cache_writes()
+        self.config_manager.flush() # Settings saves are batched too
         super().closeEvent(event)
 
     def load_app_state(self):
@@ -480,6 +663,8 @@ class KovaaksV2App(QMainWindow):
             self.center_splitter.setSizes([400, 600])
 
 if __name__ == "__main__":
+    # Required for the parse process pool in frozen (PyInstaller) builds
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     window = KovaaksV2App()
     window.show()
@@ -104,8 +104,8 @@ class DayDetailWidget(QWidget):
         if self.day_df is None or self.day_df.empty: return
         group_by_scen = self.chk_group.isChecked()
         pb_icon = "🏆" if group_by_scen else "🎯"
-        if group_by_scen: grouped = self.day_df.groupby('Scenario')
-        else: grouped = self.day_df.groupby(['Scenario', 'Sens'])
+        if group_by_scen: grouped = self.day_df.groupby('Scenario', observed=True)
+        else: grouped = self.day_df.groupby(['Scenario', 'Sens'], observed=True)
         day_start_ts = pd.Timestamp(self.current_date_str)
 
         count_new_mode = self.config.get("calendar_count_new", default=False)
@@ -249,7 +249,9 @@ class CalendarWidget(QWidget):
         self.full_df = None
         
         self.current_date = QDate.currentDate(); self.selected_date = None; self.daily_stats = {} 
+        self.timeline = None # Shared stats.PBTimeline of full_df
         self.setup_ui(); self.state_manager.data_updated.connect(self.on_data_updated)
+        self.state_manager.data_appended.connect(self.on_data_appended)
         self.state_manager.request_date_jump.connect(self.on_date_jump_request)
 
         self.needs_refresh = False
@@ -320,7 +322,6 @@ class CalendarWidget(QWidget):
     def on_data_updated(self, df):
         if df is None or df.empty: return
         self.full_df = df
-        if 'DateStr' not in df.columns: df['DateStr'] = df['Timestamp'].dt.strftime('%Y-%m-%d')
         
         # --- NEW: Lazy Logic ---
         self.needs_refresh = True
@@ -337,82 +338,26 @@ class CalendarWidget(QWidget):
                 self.update_calendar()
                 self.refresh_details()
 
-    def process_daily_stats(self, df):
+    def on_data_appended(self, df, delta):
+        if self.full_df is None: return self.on_data_updated(df)
+        self.full_df = df
+        if self.timeline is not None:
+            # Cheap to keep current while hidden, only the redraw waits for showEvent
+            self.timeline = stats.get_pb_timeline(df, delta)
+
+        if not self.isVisible() or self.needs_refresh:
+            self.needs_refresh = True
+            return
+        # Only the days from the first new run on are recomputed
+        self.process_daily_stats(df, delta)
+
+    def process_daily_stats(self, df, delta=None):
         """
         Rolling History Calculation (Option B: Day as Container).
-        Iterates chronologically, updating baselines day by day.
+        Counts come from the shared PB timeline, toggles just pick another view of it.
         """
-        self.daily_stats = {}
-        
-        stack_pbs = self.chk_stack.isChecked()
-        count_new = self.chk_count_new.isChecked()
-
-        # 1. Sort
-        df = df.sort_values('Timestamp')
-        
-        # 2. History Trackers
-        hist_scen_max = {}
-        hist_grid_max = {}
-        
-        # 3. Group by Date
-        # Using groupby(sort=False) respects the chronological sort we just did
-        grouped = df.groupby('DateStr', sort=False)
-        
-        for date_str, group in grouped:
-            
-            # --- SCENARIO TRACK ---
-            # Reuse core logic: _get_pb_indices handles "Start from Baseline" check
-            # We must pass the baseline for each group
-            scen_pb_count = 0
-            unique_scen_pbs = set()
-            
-            for scen, s_group in group.groupby('Scenario'):
-                baseline = hist_scen_max.get(scen)
-                # This returns indices relative to s_group
-                pb_idxs = stats._get_pb_indices(s_group['Score'], baseline, stack_pbs, count_new)
-                
-                if pb_idxs:
-                    if stack_pbs:
-                        scen_pb_count += len(pb_idxs)
-                    else:
-                        # Unstacked: 1 PB per scenario max
-                        scen_pb_count += 1
-                        unique_scen_pbs.add(scen)
-                
-                # Update Running Max for NEXT day (Standard PB logic: Max of All Time)
-                day_max = s_group['Score'].max()
-                if baseline is None or day_max > baseline:
-                    hist_scen_max[scen] = day_max
-
-            # --- SENS/COMBO TRACK ---
-            sens_pb_count = 0
-            unique_sens_pbs = set() # Store (Scen, Sens) tuples
-            
-            for (scen, sens), g_group in group.groupby(['Scenario', 'Sens']):
-                baseline = hist_grid_max.get((scen, sens))
-                pb_idxs = stats._get_pb_indices(g_group['Score'], baseline, stack_pbs, count_new)
-                
-                if pb_idxs:
-                    if stack_pbs:
-                        sens_pb_count += len(pb_idxs)
-                    else:
-                        sens_pb_count += 1
-                        unique_sens_pbs.add((scen, sens))
-                
-                day_max = g_group['Score'].max()
-                if baseline is None or day_max > baseline:
-                    hist_grid_max[(scen, sens)] = day_max
-            
-            # Store Result
-            self.daily_stats[date_str] = {
-                'runs': len(group),
-                'duration': group['Duration'].sum(),
-                'pbs_scen': scen_pb_count,
-                'pbs_sens': sens_pb_count,
-                # Store these sets for graph rendering later if needed
-                'unique_scen_pbs': unique_scen_pbs,
-                'unique_sens_pbs': unique_sens_pbs
-            }
+        self.timeline = stats.get_pb_timeline(df, delta)
+        self.daily_stats = self.timeline.daily_stats(self.chk_stack.isChecked(), self.chk_count_new.isChecked())
         
         self.update_calendar()
         self.refresh_details()
@@ -443,55 +388,16 @@ class CalendarWidget(QWidget):
             current_grid_date = current_grid_date.addDays(1)
 
     def refresh_details(self):
-        if self.selected_date and self.full_df is not None:
+        if self.selected_date and self.full_df is not None and self.timeline is not None:
             date_str = self.selected_date.strftime('%Y-%m-%d')
             if date_str in self.daily_stats:
-                day_df = self.full_df[self.full_df['DateStr'] == date_str].copy()
-                
-                # For the graph, we need "Valid PBs" lists to draw icons.
-                # Since process_daily_stats aggregates counts, we need to reconstruct 
-                # valid rows for the graph if we want dots.
-                # For V2 simplicity, we can just pass the raw day_df to activity graph,
-                # or we can do a mini-recalc for the visualization. 
-                # Let's do a mini-recalc of the "Valid PB Rows" using the helper to match counts.
-                # Wait, getting the *exact* rows for Stacking ON is easy (it's the indices).
-                # But for Stacking OFF, we just want the Max.
-                
-                # Let's pass the raw df and let ActivityWidget calculate simple peaks for now,
-                # OR to be perfect, we replicate the "Get PB Indices" logic for the graph dots.
-                # Let's iterate the day_df once here to find the exact PB timestamps for the graph.
+                day_df = self.full_df.iloc[self.timeline.day_rows(date_str)].copy()
                 
+                # PB rows for the graph icons, same rules as the cell counts
                 stack = self.chk_stack.isChecked()
                 count_new = self.chk_count_new.isChecked()
-                
-                # We need baselines again. This is inefficient (re-calculating history).
-                # Optimization: We could store the "Day Start Baseline" in daily_stats.
-                # But for a single day click, re-calculating history for one day is fast? 
-                # Actually, filtering history < date is fast.
-                
-                history_df = self.full_df[self.full_df['DateStr'] < date_str]
-                
-                # Recalculate PB Rows for Graph Visualization
-                # SCEN
-                base_scen_max = {}
-                if not history_df.empty: base_scen_max = history_df.groupby('Scenario')['Score'].max().to_dict()
-                valid_scen_rows = []
-                for scen, g in day_df.groupby('Scenario'):
-                    base = base_scen_max.get(scen)
-                    idxs = stats._get_pb_indices(g['Score'], base, stack, count_new)
-                    if idxs: valid_scen_rows.append(g.loc[list(idxs)])
-                
-                # SENS
-                base_grid_max = {}
-                if not history_df.empty: base_grid_max = history_df.groupby(['Scenario', 'Sens'])['Score'].max().to_dict()
-                valid_sens_rows = []
-                for k, g in day_df.groupby(['Scenario', 'Sens']):
-                    base = base_grid_max.get(k)
-                    idxs = stats._get_pb_indices(g['Score'], base, stack, count_new)
-                    if idxs: valid_sens_rows.append(g.loc[list(idxs)])
-                
-                v_scen_df = pd.concat(valid_scen_rows) if valid_scen_rows else pd.DataFrame()
-                v_sens_df = pd.concat(valid_sens_rows) if valid_sens_rows else pd.DataFrame()
+                v_scen_df = self.full_df.iloc[self.timeline.pb_rows(date_str, 'scen', stack, count_new)]
+                v_sens_df = self.full_df.iloc[self.timeline.pb_rows(date_str, 'sens', stack, count_new)]
                 
                 self.activity_graph.load_data(day_df, stack, v_scen_df, v_sens_df)
                 self.detail_panel.load_day(date_str, day_df, self.full_df)
@@ -81,7 +81,7 @@ class DailyActivityWidget(QWidget):
             work_df = df.copy()
             if not stack_pbs:
                 # Group by [Scenario, Sens], pick Max Score
-                idx_to_keep = work_df.groupby(['Scenario', 'Sens'])['Score'].idxmax()
+                idx_to_keep = work_df.groupby(['Scenario', 'Sens'], observed=True)['Score'].idxmax()
                 work_df = work_df.loc[idx_to_keep]
             
             for _, row in work_df.iterrows():
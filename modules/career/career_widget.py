@@ -10,8 +10,11 @@ class CareerWidget(QWidget):
         super().__init__()
         self.state_manager = state_manager
         self.full_df = None
+        self.profile_stats = None
+        self.monthly = {} # Period -> [runs, duration]
         self.setup_ui()
         self.state_manager.data_updated.connect(self.on_data_updated)
+        self.state_manager.data_appended.connect(self.on_data_appended)
 
     def setup_ui(self):
         layout = QVBoxLayout(self)
@@ -35,6 +38,8 @@ class CareerWidget(QWidget):
         try:
             # 1. Calculate and store in a distinct variable name
             profile_stats = stats.calculate_profile_stats(df)
+            self.profile_stats = profile_stats
+            self.monthly = self.build_monthly(df)
             
             if profile_stats:
                 # 2. PASS THE DATA variable, not the module name ('stats')
@@ -46,6 +51,27 @@ class CareerWidget(QWidget):
             import traceback
             traceback.print_exc()
 
+    def on_data_appended(self, df, delta):
+        if delta['reenriched'] or not self.profile_stats: return self.on_data_updated(df)
+        self.full_df = df
+
+        try:
+            new_rows = df.iloc[delta['start']:delta['stop']]
+            self.profile_stats = stats.update_profile_stats(self.profile_stats, new_rows)
+            for period, (runs, duration) in self.build_monthly(new_rows).items():
+                entry = self.monthly.setdefault(period, [0, 0.0])
+                entry[0] += runs; entry[1] += duration
+            self.render_view(self.profile_stats)
+        except Exception as e:
+            print(f"Career Widget Crash: {e}")
+            import traceback
+            traceback.print_exc()
+
+    def build_monthly(self, df):
+        months = df['Timestamp'].dt.to_period('M')
+        agg = df.groupby(months)['Duration'].agg(['size', 'sum'])
+        return {period: [int(row['size']), row['sum']] for period, row in agg.iterrows()}
+
     def render_view(self, data):
         # Clear
         while self.content_layout.count():
@@ -94,13 +120,9 @@ class CareerWidget(QWidget):
         lbl_hist.setStyleSheet("font-weight: bold; font-size: 16px; margin-top: 10px;")
         self.content_layout.addWidget(lbl_hist)
         
-        if self.full_df is not None and not self.full_df.empty:
-            df = self.full_df.copy()
-            df['Month'] = df['Timestamp'].dt.to_period('M')
-            
-            for period in sorted(df['Month'].unique(), reverse=True):
-                m_df = df[df['Month'] == period]
-                self.add_month_row(period.strftime("%B %Y"), len(m_df), m_df['Duration'].sum())
+        for period in sorted(self.monthly.keys(), reverse=True):
+            runs, duration = self.monthly[period]
+            self.add_month_row(period.strftime("%B %Y"), runs, duration)
 
         self.content_layout.addStretch()
 
@@ -162,6 +162,7 @@ class ChartWidget(QWidget):
         for ax in ['bottom', 'left', 'top']: self.plot_widget.getAxis(ax).setPen(color='#363a45'); self.plot_widget.getAxis(ax).setTextPen(color='#787b86')
         self.layout.addWidget(self.plot_widget); self.setup_overlays()
         self.state_manager.data_updated.connect(self.on_data_updated)
+        self.state_manager.data_appended.connect(self.on_data_appended)
         if self.listen_to_global: 
             self.state_manager.scenario_selected.connect(self.on_sidebar_selected)
             self.state_manager.variant_selected.connect(self.on_variant_selected)
@@ -202,6 +203,7 @@ class ChartWidget(QWidget):
             self.label.setPos(index, mouse_point.y())
 
     def on_data_updated(self, df): self.all_runs_df = df
+    def on_data_appended(self, df, delta): self.all_runs_df = df
     
     def on_sidebar_selected(self, scenario_name): 
         # Check if a specific variant was selected very recently (debounce 200ms)
@@ -31,6 +31,7 @@ class GridContainer(QTabWidget):
         self.setCornerWidget(self.btn_clear, Qt.Corner.TopRightCorner)
 
         self.state_manager.data_updated.connect(self.on_data_updated)
+        self.state_manager.data_appended.connect(self.on_data_appended)
         self.state_manager.scenario_selected.connect(self.open_scenario_tab)
         self.state_manager.variant_selected.connect(self.on_variant_selected)
         
@@ -73,6 +74,10 @@ class GridContainer(QTabWidget):
             widget = self.widget(i)
             if isinstance(widget, GridWidget): widget.on_data_updated(df)
 
+    def on_data_appended(self, df, delta):
+        # Each GridWidget handles the delta itself (it listens to data_appended)
+        self.all_runs_df = df
+
     def on_tab_changed(self, index):
         if index == -1: return
         if getattr(self, 'suppress_signal', False): return
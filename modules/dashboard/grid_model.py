@@ -0,0 +1,72 @@
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+import numpy as np
+
+def fmt_score(val):
+    # If 4 digits or more (>= 1000), drop decimal.
+    # Otherwise (0-999), show 1 decimal place.
+    if abs(val) >= 1000:
+        return f"{val:.0f}"
+    return f"{val:.1f}"
+
+class GridModel(QAbstractTableModel):
+    """
+    Read-only model of the comparison grid, backed by NumPy arrays:
+        names  -> row labels (row 0 is the column averages row)
+        values -> float matrix of every column right of the labels (NaN shows as "-")
+        kinds  -> per value column: 'score', 'cm' or 'pct' (how it is formatted)
+        colors -> int matrix like values: index into palette (shared brushes), negative for none
+    Text is only produced in data(), i.e. for the cells Qt actually paints; a background
+    is a lookup into the palette.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.headers = []
+        self.names = []
+        self.values = np.empty((0, 0))
+        self.kinds = []
+        self.colors = None
+        self.palette = []
+
+    def set_grid(self, headers, names, values, kinds, colors=None, palette=None):
+        self.beginResetModel()
+        self.headers = headers
+        self.names = names
+        self.values = values
+        self.kinds = kinds
+        self.colors = colors
+        self.palette = palette or []
+        self.endResetModel()
+
+    def clear(self):
+        self.set_grid([], [], np.empty((0, 0)), [])
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.names)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            if 0 <= section < len(self.headers): return self.headers[section]
+        return None
+
+    def text(self, row, col):
+        if col == 0: return self.names[row]
+        val = self.values[row, col - 1]
+        if np.isnan(val): return "-"
+        kind = self.kinds[col - 1]
+        if kind == 'cm': return f"{val:.1f}cm" if row == 0 else f"{val}cm" # Averages keep one decimal
+        if kind == 'pct': return f"{val:.0f}%"
+        return fmt_score(val)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid(): return None
+        row, col = index.row(), index.column()
+        if role == Qt.ItemDataRole.DisplayRole: return self.text(row, col)
+        if col == 0 or np.isnan(self.values[row, col - 1]): return None
+        if role == Qt.ItemDataRole.TextAlignmentRole: return Qt.AlignmentFlag.AlignCenter
+        if role == Qt.ItemDataRole.BackgroundRole and self.colors is not None:
+            color = self.colors[row, col - 1]
+            return self.palette[color] if color >= 0 else None
+        return None
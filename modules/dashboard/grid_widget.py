@@ -1,17 +1,22 @@
-from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QTableWidget, QTableWidgetItem, 
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QTableView, 
                              QHeaderView, QLabel, QFrame, QHBoxLayout, 
                              QAbstractItemView, QComboBox, QRadioButton, 
                              QCheckBox, QButtonGroup, QMenu, QDialog, QListWidget, QPushButton,
                              QGridLayout, QToolTip, QSpinBox)
 from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QAction, QColor, QCursor
+from PyQt6.QtGui import QAction, QCursor
 import pandas as pd
 import numpy as np
 import re
-from core.analytics import parsers, stats
+from collections import OrderedDict
+from core.analytics import parsers, stats, processors
 from modules.dashboard import strategies
+from modules.dashboard.grid_model import GridModel
 from modules.dashboard.tooltip import CustomTooltip
 
+# Aggregated pivots kept per tab, so flipping between modes / settings is a lookup
+MAX_CACHED_PIVOTS = 16
+
 # --- DIALOGS ---
 class ManageHiddenDialog(QDialog):
     def __init__(self, hidden_scens, hidden_cms, parent=None):
@@ -84,6 +89,7 @@ class GridWidget(QWidget):
         
         self.all_runs_df = None
         self.current_family_df = None # Used for Family View
+        self.current_family_mods = None # Long modifier table of the family (parsers.ModifierIndex.family_table)
         self.playlist_scenarios = []  # Used for Playlist View
         
         self.base_name = "" # Represents Scenario Name OR Playlist Name
@@ -108,6 +114,8 @@ class GridWidget(QWidget):
         self.format_checkboxes = {} 
         self.current_axis = "Sens"
         self.axis_filter_cache = {} 
+        self.pivot_cache = OrderedDict() # _pivot_key() -> {'pivot', 'expires'}
+        self.runs_cache = {'key': None, 'runs': None, 'expires': None} # Last _filter_runs() result (see _tab_runs)
         
         self.tooltip = CustomTooltip(self)
         self.tooltip.hide()
@@ -115,6 +123,7 @@ class GridWidget(QWidget):
         self.setup_ui()
         
         self.state_manager.data_updated.connect(self.on_data_updated)
+        self.state_manager.data_appended.connect(self.on_data_appended)
         
         # --- FIX: REMOVED GLOBAL LISTENER ---
         # self.state_manager.scenario_selected.connect(self.on_scenario_selected)
@@ -216,14 +225,17 @@ class GridWidget(QWidget):
         self.row4.layout().addWidget(btn_manage)
         layout.addWidget(self.row4)
 
-        # Table
-        self.grid = QTableWidget()
+        # Table (a view over GridModel: refreshing resets the model, no per-cell items)
+        self.grid_model = GridModel(self)
+        self.grid = QTableView()
+        self.grid.setModel(self.grid_model)
         self.grid.verticalHeader().setVisible(False)
+        self.grid.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         self.grid.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
         self.grid.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
-        self.grid.cellClicked.connect(self.on_cell_clicked)
+        self.grid.clicked.connect(self.on_cell_clicked)
         self.grid.setMouseTracking(True)
-        self.grid.cellEntered.connect(self.on_cell_entered)
+        self.grid.entered.connect(self.on_cell_entered)
         self.grid.setFocusPolicy(Qt.FocusPolicy.NoFocus)
         self.grid.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.grid.customContextMenuRequested.connect(self.on_table_context_menu)
@@ -267,14 +279,7 @@ class GridWidget(QWidget):
         if not self.is_playlist_mode:
             # Family Mode: We need to re-fetch the family grouping logic 
             # to include any new runs that match the pattern.
-            family_df = parsers.get_scenario_family_info(self.all_runs_df, self.base_name)
-            
-            if family_df is None or family_df.empty:
-                # Fallback: exact match (if no variants found)
-                family_df = self.all_runs_df[self.all_runs_df['Scenario'] == self.base_name].copy()
-                family_df['Modifiers'] = [{}] * len(family_df)
-            
-            self.current_family_df = family_df
+            self.current_family_df = self._fetch_family(self.base_name)
             
             # Note: We don't re-run _setup_axes_for_family() here to prevent 
             # jarring UI resets (e.g., if you were filtering by a specific axis).
@@ -292,12 +297,28 @@ class GridWidget(QWidget):
     
     def on_data_updated(self, df):
         self.all_runs_df = df
+        self.pivot_cache.clear() # New data version
+        self.runs_cache['key'] = None
         self.needs_refresh = True
         
         # Only process immediately if the user is looking at this tab
         if self.isVisible():
             self.reload_data()
 
+    def on_data_appended(self, df, delta):
+        if delta['reenriched']: return self.on_data_updated(df)
+        self.all_runs_df = df
+        self._invalidate_pivots(delta['scenarios'])
+        parsers.get_scenario_index(df, delta) # Extend the shared family index (first tab does the work)
+        # The grid only shows this tab's scenarios: untouched tabs keep their cells
+        if self.is_playlist_mode: affected = any(s in delta['scenarios'] for s in self.playlist_scenarios)
+        else: affected = any(s.startswith(self.base_name) for s in delta['scenarios'])
+        if not affected: return
+
+        self.needs_refresh = True
+        if self.isVisible():
+            self.reload_data()
+
     # --- ENTRY POINT 1: FAMILY VIEW ---
     def on_scenario_selected(self, scenario_name):
         if self.all_runs_df is None: return
@@ -308,10 +329,7 @@ class GridWidget(QWidget):
         self.row1.setVisible(True)
         self.row2.setVisible(False)
         
-        family_df = parsers.get_scenario_family_info(self.all_runs_df, scenario_name)
-        if family_df is None or family_df.empty:
-            family_df = self.all_runs_df[self.all_runs_df['Scenario'] == scenario_name].copy()
-            family_df['Modifiers'] = [{}] * len(family_df)
+        family_df = self._fetch_family(scenario_name)
         self.current_family_df = family_df
 
         self._setup_axes_for_family(family_df)
@@ -319,10 +337,18 @@ class GridWidget(QWidget):
         self.is_loading_state = False
         self.refresh_grid_view()
 
+    def _fetch_family(self, scenario_name):
+        modifier_index = processors.get_modifier_index()
+        self.current_family_mods = parsers.get_family_modifiers(self.all_runs_df, scenario_name, modifier_index)
+        family_df = parsers.get_scenario_family_info(self.all_runs_df, scenario_name, modifier_index)
+        processors.save_modifier_index() # Pairs parsed on demand, written behind like the loader's
+        if family_df is None or family_df.empty:
+            # Fallback: exact match (if no variants found)
+            family_df = parsers.with_no_modifiers(self.all_runs_df[self.all_runs_df['Scenario'] == scenario_name])
+        return family_df
+
     def _setup_axes_for_family(self, family_df):
-        axes = set()
-        for mods in family_df['Modifiers']:
-            if isinstance(mods, dict): axes.update(mods.keys())
+        axes = set(self.current_family_mods['Axis']) if self.current_family_mods is not None else set()
         available_axes = sorted(list(axes))
         if not available_axes: available_axes = ["Default"]
         
@@ -369,10 +395,9 @@ class GridWidget(QWidget):
 
     def rebuild_format_options(self):
         patterns = set()
-        if not self.is_playlist_mode and self.current_family_df is not None:
-            for mods in self.current_family_df['Modifiers']:
-                if isinstance(mods, dict) and self.current_axis in mods:
-                    patterns.add(mods[self.current_axis][1])
+        if not self.is_playlist_mode and self.current_family_mods is not None:
+            mods = self.current_family_mods
+            patterns.update(mods.loc[mods['Axis'] == self.current_axis, 'Pattern'])
         
         while self.format_container.count():
             item = self.format_container.takeAt(0)
@@ -531,63 +556,104 @@ class GridWidget(QWidget):
             
         self.config_manager.set_scenario(self.base_name, "grid_view", settings)
 
-    def refresh_grid_view(self):
+    def _pivot_key(self, setting_val):
+        """Everything the aggregated pivot depends on, besides the runs themselves (see _invalidate_pivots)."""
+        if self.is_playlist_mode:
+            source = ('playlist', self.base_name, tuple(self.playlist_scenarios))
+        else:
+            disabled_formats = frozenset(pat for pat, chk in self.format_checkboxes.items() if not chk.isChecked())
+            source = ('family', self.base_name, self.current_axis, disabled_formats)
+        recent_days = self.sb_recent_days.value() if self.chk_recent.isChecked() else None
+        if isinstance(setting_val, list): setting_val = tuple(setting_val)
+        return (source, frozenset(self.hidden_scenarios), recent_days, self.active_agg.name, setting_val)
+
+    def _invalidate_pivots(self, scenarios):
+        """Drops the cached pivots (and runs) that new runs of these scenarios can change."""
+        def affected(source):
+            if source[0] == 'playlist': return any(s in source[2] for s in scenarios)
+            return any(s.startswith(source[1]) for s in scenarios)
+        for key in list(self.pivot_cache):
+            if affected(key[0]): del self.pivot_cache[key]
+        if self.runs_cache['key'] is not None and affected(self.runs_cache['key'][0]): self.runs_cache['key'] = None
+
+    def _tab_runs(self, key):
+        """
+        _filter_runs(), reused while only the mode / its setting change. Handing the aggregation
+        the same frame lets it keep its sorted order (kernels.get_order_stats) across rank ticks.
+        """
+        cached = self.runs_cache
+        if cached['key'] == key[:3] and (cached['expires'] is None or pd.Timestamp.now() <= cached['expires']):
+            return cached['runs']
+        runs = self._filter_runs()
+        expires = None
+        if self.chk_recent.isChecked() and not runs.empty:
+            # The oldest run leaves the recent window then
+            expires = runs['Timestamp'].min() + pd.Timedelta(days=self.sb_recent_days.value())
+        self.runs_cache = {'key': key[:3], 'runs': runs, 'expires': expires}
+        return runs
+
+    def _filter_runs(self):
+        """Runs the grid aggregates: the tab's scenarios / variants, minus hidden ones, within the recent window."""
         df_to_process = pd.DataFrame()
-        
+
         if self.is_playlist_mode:
             mask = self.all_runs_df['Scenario'].isin(self.playlist_scenarios)
-            df_to_process = self.all_runs_df[mask].copy()
+            df_to_process = self.all_runs_df[mask]
             if self.hidden_scenarios:
                 df_to_process = df_to_process[~df_to_process['Scenario'].isin(self.hidden_scenarios)]
-            df_to_process['Modifiers'] = [{}] * len(df_to_process)
+            df_to_process = parsers.with_no_modifiers(df_to_process)
         else:
-            if self.current_family_df is None: return
-            records = self.current_family_df.to_dict('records')
-            active_formats = {pat: chk.isChecked() for pat, chk in self.format_checkboxes.items()}
-            filtered_rows = []
-            
-            for row in records:
-                scen = row['Scenario']
-                if scen in self.hidden_scenarios: continue
-                if scen == self.base_name:
-                    filtered_rows.append(row)
-                    continue
-                
-                mods = row['Modifiers']
-                if isinstance(mods, dict) and self.current_axis in mods:
-                    mod_keys = list(mods.keys())
-                    remaining = [k for k in mod_keys if k != self.current_axis]
-                    if len(remaining) == 0:
-                        val, pat = mods[self.current_axis]
-                        if pat in active_formats:
-                            if active_formats[pat]: filtered_rows.append(row)
-                        else: filtered_rows.append(row)
-            
-            if filtered_rows: df_to_process = pd.DataFrame(filtered_rows)
+            family_df = self.current_family_df
+            names = family_df['Scenario']
+            disabled_formats = [pat for pat, chk in self.format_checkboxes.items() if not chk.isChecked()]
+
+            # Mod_Axis is only set for single-modifier variants; the base is always shown
+            mask = family_df['Mod_Axis'] == self.current_axis
+            if disabled_formats: mask &= ~family_df['Mod_Pattern'].isin(disabled_formats)
+            mask |= names == self.base_name
+            if self.hidden_scenarios: mask &= ~names.isin(self.hidden_scenarios)
+            df_to_process = family_df[mask]
 
-        if df_to_process.empty: self.grid.clear(); return
+        if df_to_process.empty: return df_to_process
 
         if self.chk_recent.isChecked():
             days = self.sb_recent_days.value()
             cutoff_date = pd.Timestamp.now() - pd.Timedelta(days=days)
             df_to_process = df_to_process[df_to_process['Timestamp'] >= cutoff_date]
-            
-            if df_to_process.empty:
-                self.grid.clear()
-                return
 
-        if self.current_axis == "Sens" or self.is_playlist_mode: 
-            df_to_process['ActiveAxis'] = df_to_process['Sens']
-        else:
-            df_to_process['ActiveAxis'] = df_to_process['Modifiers'].apply(
-                lambda m: m[self.current_axis][0] if self.current_axis in m else np.nan)
+            if df_to_process.empty: return df_to_process
+
+        # assign: df_to_process is a filtered view of the shared frames
+        if self.current_axis == "Sens" or self.is_playlist_mode:
+            return df_to_process.assign(ActiveAxis=df_to_process['Sens'])
+        return df_to_process.assign(ActiveAxis=df_to_process['Mod_Value'].where(df_to_process['Mod_Axis'] == self.current_axis))
+
+    def refresh_grid_view(self):
+        if not self.is_playlist_mode and self.current_family_df is None: return
 
         setting_val = None
         if self.agg_setting_widget:
             setting_val = self.active_agg.get_setting_value(self.agg_setting_widget)
-        
-        summary = self.active_agg.calculate(df_to_process, setting_val)
-        pivot = summary.pivot_table(index='Scenario', columns='Sens', values='Score')
+
+        # The aggregation is the expensive part: reuse it while the inputs are the same
+        key = self._pivot_key(setting_val)
+        entry = self.pivot_cache.get(key)
+        if entry is not None and entry['expires'] is not None and pd.Timestamp.now() > entry['expires']:
+            entry = None # Its oldest run has left the recent window
+        df_to_process = None
+        if entry is None:
+            df_to_process = self._tab_runs(key)
+            entry = {'pivot': None, 'expires': self.runs_cache['expires']}
+            if not df_to_process.empty:
+                summary = self.active_agg.calculate(df_to_process, setting_val)
+                entry['pivot'] = summary.pivot_table(index='Scenario', columns='Sens', values='Score', observed=True)
+            self.pivot_cache[key] = entry
+            if len(self.pivot_cache) > MAX_CACHED_PIVOTS: self.pivot_cache.popitem(last=False)
+        else:
+            self.pivot_cache.move_to_end(key)
+
+        if entry['pivot'] is None: self.grid_model.clear(); return
+        pivot = entry['pivot']
 
         sens_filter = self.sens_combo.currentText()
         step = 0
@@ -610,10 +676,11 @@ class GridWidget(QWidget):
             days = 14
             if self.hl_setting_widget: days = self.active_hl.get_setting_value(self.hl_setting_widget)
             cutoff = pd.Timestamp.now() - pd.Timedelta(days=days)
+            if self.is_playlist_mode and df_to_process is None: df_to_process = self._tab_runs(key) # Pivot came from the cache
             src = df_to_process if self.is_playlist_mode else self.current_family_df
             recent_df = src[src['Timestamp'] >= cutoff]
             if not recent_df.empty:
-                self.recent_data_map = recent_df.groupby(['Scenario', 'Sens'])['Score'].max().to_dict()
+                self.recent_data_map = recent_df.groupby(['Scenario', 'Sens'], observed=True)['Score'].max().to_dict()
 
         self.populate_table(pivot)
 
@@ -641,235 +708,116 @@ class GridWidget(QWidget):
             return pivot_df.reindex(rows)
 
     def populate_table(self, df):
-        self.grid.clear()
-        
         # 1. SETUP COLUMNS
         data_cols = sorted(df.columns, key=lambda x: float(x) if str(x).replace('.','').isdigit() else str(x))
-        
+
         headers = ["Scenario / Sensitivity"] + [str(c) for c in data_cols] + ["AVG", "Best", "CM"]
+        kinds = ['score'] * (len(data_cols) + 2) + ['cm']
         if not self.is_playlist_mode:
             headers.append("%")
-            
-        self.grid.setRowCount(len(df) + 1)
-        self.grid.setColumnCount(len(headers))
-        self.grid.setHorizontalHeaderLabels(headers)
-        
-        header = self.grid.horizontalHeader()
-        header.setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)
-        if len(headers) > 1:
-            for i in range(1, len(headers)): 
-                header.setSectionResizeMode(i, QHeaderView.ResizeMode.Stretch)
-
-        # --- NEW: Formatting Helper ---
-        def fmt_score(val):
-            # If 4 digits or more (>= 1000), drop decimal.
-            # Otherwise (0-999), show 1 decimal place.
-            if abs(val) >= 1000:
-                return f"{val:.0f}"
-            return f"{val:.1f}"
-        # ------------------------------
-
-        # 2. PRE-CALCULATE CONTEXT (Global)
-        all_data_values = df.values.flatten()
-        all_data_values = all_data_values[~np.isnan(all_data_values)]
-        
-        global_ctx = {
-            'g_min': all_data_values.min() if len(all_data_values) > 0 else 0,
-            'g_max': all_data_values.max() if len(all_data_values) > 0 else 1
-        }
-        
+            kinds.append('pct')
+
+        # 2. ROW STATS (whole matrix at once, empty rows come out NaN and show as "-")
+        vals = df[data_cols].to_numpy(dtype=np.float64)
+        filled = ~np.isnan(vals)
+        has_vals = filled.any(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            row_avg = np.where(filled, vals, 0).sum(axis=1) / filled.sum(axis=1)
+            col_avg = np.where(filled, vals, 0).sum(axis=0) / filled.sum(axis=0)
+        row_min = np.where(filled, vals, np.inf).min(axis=1, initial=np.inf)
+        row_max = np.where(filled, vals, -np.inf).max(axis=1, initial=-np.inf)
+        row_min[~has_vals] = np.nan
+        row_max[~has_vals] = np.nan
+
+        # CM = sensitivity of the row's best score (first one on ties, like idxmax)
+        col_cms = np.array([self._col_float(c) for c in data_cols], dtype=np.float64)
+        row_cm = np.full(len(df), np.nan)
+        if data_cols: row_cm[has_vals] = col_cms[np.where(filled, vals, -np.inf).argmax(axis=1)][has_vals]
+
         base_pb_score = 1.0
         if not self.is_playlist_mode and self.base_name in df.index:
             base_pb_score = df.loc[self.base_name].max()
+        row_pct = np.where(has_vals, 0.0, np.nan)
+        if base_pb_score > 0: row_pct = (row_max / base_pb_score) * 100
 
-        # 3. PRE-CALCULATE ROWS & ACCUMULATE TOP ROW DATA
-        processed_rows = []
-        # We store LISTS of values for the top row
-        top_row_acc = {c: [] for c in data_cols}
-        top_row_acc['AVG'] = []
-        top_row_acc['Best'] = []
-        # CM and % don't need color accumulation usually, but let's keep structure
-        top_row_acc['CM'] = [] 
-        top_row_acc['%'] = []
-
-        for sc, row in df.iterrows():
-            vals = row.dropna().values
-            if len(vals) == 0:
-                processed_rows.append({'name': sc, 'empty': True})
-                continue
-
-            row_min = vals.min()
-            row_max = vals.max()
-            row_avg = vals.mean()
-            
-            row_cm = np.nan
-            try:
-                best_sens_col = row.idxmax()
-                row_cm = float(best_sens_col) 
-            except: pass
-
-            row_pct = 0
-            if base_pb_score > 0:
-                row_pct = (row_max / base_pb_score) * 100
-
-            p_row = {
-                'name': sc,
-                'empty': False,
-                'vals': row,
-                'stats': {'AVG': row_avg, 'Best': row_max, 'CM': row_cm, '%': row_pct},
-                'ctx': {
-                    'r_min': row_min, 'r_max': row_max,
-                    'g_min': global_ctx['g_min'], 'g_max': global_ctx['g_max']
-                }
-            }
-            processed_rows.append(p_row)
-
-            # Accumulate
-            for c in data_cols:
-                v = row.get(c, np.nan)
-                if pd.notna(v): top_row_acc[c].append(v)
-            
-            top_row_acc['AVG'].append(row_avg)
-            top_row_acc['Best'].append(row_max)
-            if not np.isnan(row_cm): top_row_acc['CM'].append(row_cm)
-            top_row_acc['%'].append(row_pct)
-
-        # 4. CALCULATE TOP ROW CONTEXT (The Fix)
-        # We need to know the Min/Max of the AVERAGES to color the top row properly relative to itself.
-        top_row_means = []
-        
-        # Calculate means for Data Columns
-        for c in data_cols:
-            if top_row_acc[c]: top_row_means.append(np.mean(top_row_acc[c]))
-            
-        # Calculate means for Aggregates (AVG, Best)
-        # Note: Best in top row = Mean of Bests. 
-        if top_row_acc['AVG']: top_row_means.append(np.mean(top_row_acc['AVG']))
-        if top_row_acc['Best']: top_row_means.append(np.mean(top_row_acc['Best']))
-        
-        # Create the specific context for the Top Row
-        top_ctx = global_ctx.copy()
-        if top_row_means:
-            top_ctx['r_min'] = min(top_row_means)
-            top_ctx['r_max'] = max(top_row_means)
-        else:
-            top_ctx['r_min'] = 0
-            top_ctx['r_max'] = 1
-
-        # 5. RENDER TOP ROW
-        self.grid.setItem(0, 0, QTableWidgetItem("-- Column Averages --"))
-        
-        def render_top_cell(col_idx, values, is_highlighted=True):
-            if not values:
-                self.grid.setItem(0, col_idx, QTableWidgetItem("-"))
-                return
-            
-            mean_val = np.mean(values)
-            
-            txt = fmt_score(mean_val)
-            
-            if headers[col_idx] == "CM": txt = f"{mean_val:.1f}cm" # CM always keeps precision
-            if headers[col_idx] == "%": txt = f"{mean_val:.0f}%"   # % usually fine as integer
-            
-            it = QTableWidgetItem(txt)
-            it.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            
-            if is_highlighted:
-                # ... (Highlight logic same) ...
-                col = self.active_hl.get_color(mean_val, top_ctx, None)
-                if col: it.setBackground(col)
-                else: it.setBackground(QColor(40,44,52))
-            
-            self.grid.setItem(0, col_idx, it)
+        # 3. TOP ROW: column averages, and the mean of each aggregate over the non-empty rows
+        def mean_of(arr):
+            arr = arr[~np.isnan(arr)]
+            return arr.mean() if len(arr) else np.nan
+        top_row = np.concatenate([col_avg, [mean_of(row_avg), mean_of(row_max), mean_of(row_cm), mean_of(row_pct)]])
 
+        body = np.column_stack([vals, row_avg, row_max, row_cm, row_pct])
+        values = np.vstack([top_row, body])[:, :len(kinds)]
 
-        # Render Data Cols
-        for i, c in enumerate(data_cols):
-            render_top_cell(i + 1, top_row_acc[c], is_highlighted=True)
-            
-        # Render Aggregates
-        base_idx = len(data_cols) + 1
-        render_top_cell(base_idx, top_row_acc['AVG'], is_highlighted=True)
-        render_top_cell(base_idx + 1, top_row_acc['Best'], is_highlighted=True)
-        render_top_cell(base_idx + 2, top_row_acc['CM'], is_highlighted=False)
-        if not self.is_playlist_mode:
-            render_top_cell(base_idx + 3, top_row_acc['%'], is_highlighted=False)
+        # 4. HIGHLIGHT CONTEXT (Global, and the Top Row relative to itself)
+        all_data_values = vals[filled]
+        g_min = all_data_values.min() if len(all_data_values) > 0 else 0
+        g_max = all_data_values.max() if len(all_data_values) > 0 else 1
 
-        # 6. RENDER DATA ROWS (Standard)
+        # We need to know the Min/Max of the AVERAGES to color the top row properly relative to itself.
+        top_row_means = top_row[:len(data_cols) + 2]
+        top_row_means = top_row_means[~np.isnan(top_row_means)]
+        top_ctx = {'g_min': g_min, 'g_max': g_max, 'r_min': 0, 'r_max': 1}
+        if len(top_row_means):
+            top_ctx['r_min'] = top_row_means.min()
+            top_ctx['r_max'] = top_row_means.max()
+
+        # 5. HIGHLIGHT: palette index per cell, for the whole grid in one pass per row kind
         hl_setting = None
         if self.hl_setting_widget:
             hl_setting = self.active_hl.get_setting_value(self.hl_setting_widget)
-
-        for i, p_row in enumerate(processed_rows):
-            row_idx = i + 1
-            self.grid.setItem(row_idx, 0, QTableWidgetItem(str(p_row['name'])))
-            
-            if p_row['empty']:
-                for c_i in range(1, self.grid.columnCount()):
-                    self.grid.setItem(row_idx, c_i, QTableWidgetItem("-"))
-                continue
-
-            for c_i, c in enumerate(data_cols):
-                val = p_row['vals'].get(c, np.nan)
-                if pd.notna(val):
-                    it = QTableWidgetItem(fmt_score(val))
-                    it.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                    
-                    ctx = p_row['ctx'].copy()
-                    if row_idx > 1:
-                        prev_item = self.grid.item(row_idx-1, c_i+1)
-                        if prev_item and prev_item.text() != "-" and prev_item.text():
-                            try: ctx['prev_val'] = float(prev_item.text())
-                            except: ctx['prev_val'] = None
-                    
-                    if hasattr(self, 'recent_data_map'):
-                        ctx['recent_max'] = self.recent_data_map.get((p_row['name'], c))
-
-                    col = self.active_hl.get_color(val, ctx, hl_setting)
-                    if col: it.setBackground(col)
-                    self.grid.setItem(row_idx, c_i+1, it)
-                else:
-                    self.grid.setItem(row_idx, c_i+1, QTableWidgetItem("-"))
-
-            # Row Aggregates
-            it_avg = QTableWidgetItem(fmt_score(p_row['stats']['AVG']))
-            it_avg.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            col_avg = self.active_hl.get_color(p_row['stats']['AVG'], p_row['ctx'], hl_setting)
-            if col_avg: it_avg.setBackground(col_avg)
-            self.grid.setItem(row_idx, base_idx, it_avg)
-
-            it_best = QTableWidgetItem(fmt_score(p_row['stats']['Best']))
-            it_best.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            col_best = self.active_hl.get_color(p_row['stats']['Best'], p_row['ctx'], hl_setting)
-            if col_best: it_best.setBackground(col_best)
-            self.grid.setItem(row_idx, base_idx + 1, it_best)
-
-            cm_val = p_row['stats']['CM']
-            cm_str = f"{cm_val}cm" if not np.isnan(cm_val) else "-"
-            it_cm = QTableWidgetItem(cm_str)
-            it_cm.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.grid.setItem(row_idx, base_idx + 2, it_cm)
-
-            if not self.is_playlist_mode:
-                pct_val = p_row['stats']['%']
-                it_pct = QTableWidgetItem(f"{pct_val:.0f}%")
-                it_pct.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                self.grid.setItem(row_idx, base_idx + 3, it_pct)
+        n_colored = len(data_cols) + 2 # Data columns, AVG and Best (CM and % stay plain)
+        body_vals = body[:, :n_colored]
+
+        # Previous row as displayed (the rounded text), data columns only
+        shown = np.where(np.abs(vals) >= 1000, np.round(vals), np.round(vals, 1))
+        prev_val = np.full(body_vals.shape, np.nan)
+        prev_val[1:, :len(data_cols)] = shown[:-1]
+
+        recent_max = np.full(body_vals.shape, np.nan)
+        if self.recent_data_map:
+            row_of = {sc: i for i, sc in enumerate(df.index)}
+            col_of = {c: i for i, c in enumerate(data_cols)}
+            for (sc, c), v in self.recent_data_map.items():
+                if sc in row_of and c in col_of: recent_max[row_of[sc], col_of[c]] = v
+
+        body_ctx = {'r_min': row_min[:, None], 'r_max': row_max[:, None], 'g_min': g_min, 'g_max': g_max,
+                    'prev_val': prev_val, 'recent_max': recent_max}
+        body_colors = self.active_hl.get_color_indices(body_vals, body_ctx, hl_setting)
+
+        # Top row: relative to itself, without a setting, neutral where the mode has no colour
+        top_vals = top_row[None, :n_colored]
+        top_ctx.update(prev_val=np.full(top_vals.shape, np.nan), recent_max=np.full(top_vals.shape, np.nan))
+        top_colors = self.active_hl.get_color_indices(top_vals, top_ctx, None)
+        top_colors[top_colors == strategies.NO_COLOR] = strategies.COLOR_NEUTRAL
+
+        colors = np.full(values.shape, strategies.NO_COLOR, dtype=np.int16)
+        colors[:, :n_colored] = np.vstack([top_colors, body_colors])
+        colors[np.isnan(values)] = strategies.NO_COLOR
+
+        names = ["-- Column Averages --"] + [str(sc) for sc in df.index]
+        self.grid_model.set_grid(headers, names, values, kinds, colors, strategies.get_palette())
+        self.grid.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)
+
+    def _col_float(self, col):
+        try: return float(col)
+        except: return np.nan
 
     def on_table_context_menu(self, pos):
-        item = self.grid.itemAt(pos)
-        if not item: return
-        if item.column() != 0: return 
+        index = self.grid.indexAt(pos)
+        if not index.isValid(): return
+        if index.column() != 0: return
+        name = self.grid_model.text(index.row(), 0)
         menu = QMenu(self)
-        hide_action = QAction(f"Hide Scenario: {item.text()}", self)
-        hide_action.triggered.connect(lambda: self.hide_scenario(item.text()))
+        hide_action = QAction(f"Hide Scenario: {name}", self)
+        hide_action.triggered.connect(lambda: self.hide_scenario(name))
         menu.addAction(hide_action)
         menu.exec(self.grid.viewport().mapToGlobal(pos))
 
     def on_header_context_menu(self, pos):
         idx = self.grid.horizontalHeader().logicalIndexAt(pos)
-        if idx <= 0: return 
-        header_text = self.grid.horizontalHeaderItem(idx).text()
+        if idx <= 0: return
+        header_text = self.grid_model.headers[idx]
         if header_text in ["AVG", "Best", "%", "cm"]: return
         menu = QMenu(self)
         hide_action = QAction(f"Hide {header_text}", self)
@@ -895,46 +843,43 @@ class GridWidget(QWidget):
             self.save_view_settings()
             self.refresh_grid_view()
 
-    def on_cell_clicked(self, r, c):
+    def on_cell_clicked(self, index):
+        r, c = index.row(), index.column()
         # NEW: Ignore the top row (index 0) explicitly
         if r == 0: return
 
-        item_scen = self.grid.item(r, 0)
-        if not item_scen: return
-        
-        scenario_name = item_scen.text()
+        scenario_name = self.grid_model.text(r, 0)
 
         sens_val = None
-        
+
         if c > 0:
-            header_text = self.grid.horizontalHeaderItem(c).text()
+            header_text = self.grid_model.headers[c]
             if header_text not in ["AVG", "Best", "%"]:
                 try:
                     clean_text = header_text.replace("cm", "").strip()
                     sens_val = float(clean_text)
-                except: sens_val = None 
-        
+                except: sens_val = None
+
         self.state_manager.variant_selected.emit({
             'scenario': scenario_name,
             'sens': sens_val
         })
 
-    def on_cell_entered(self, row, col):
+    def on_cell_entered(self, index):
+        row, col = index.row(), index.column()
         if row <= 0 or col < 0: self.tooltip.hide(); return
-        item_scen = self.grid.item(row, 0)
-        if not item_scen: self.tooltip.hide(); return
-        scenario_name = item_scen.text()
+        scenario_name = self.grid_model.text(row, 0)
         if scenario_name == "-- Average --": self.tooltip.hide(); return
-        
+
         sens_val = None
-        sens_str = self.grid.horizontalHeaderItem(col).text().replace("cm", "")
+        sens_str = self.grid_model.headers[col].replace("cm", "")
         if col > 0:
             try: sens_val = float(sens_str)
             except: pass
-            
+
         src_df = self.all_runs_df if self.is_playlist_mode else self.current_family_df
         if src_df is None: return
-        
+
         df = src_df[src_df['Scenario'] == scenario_name]
         if sens_val is not None:
             df = df[df['Sens'] == sens_val]
@@ -942,15 +887,15 @@ class GridWidget(QWidget):
         else:
             if col == 0: sub_title = "Sensitivity: All"
             else: self.tooltip.hide(); return
-            
+
         if df.empty: self.tooltip.hide(); return
-        
+
         from core.analytics import stats
         stats_data = stats.calculate_detailed_stats(df)
         scores = df.sort_values('Timestamp')['Score'].tolist()
-        
+
         self.tooltip.update_data(scenario_name, sub_title, stats_data, scores)
-        
+
         cursor_pos = QCursor.pos()
         self.tooltip.move(cursor_pos.x() + 20, cursor_pos.y() + 20)
         self.tooltip.show()
@@ -1,8 +1,19 @@
 from PyQt6.QtWidgets import QSpinBox, QDoubleSpinBox, QWidget, QHBoxLayout, QLabel, QPushButton
 from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QColor
+from PyQt6.QtGui import QColor, QBrush
 import pandas as pd
 import numpy as np
+from core.analytics.kernels import get_order_stats
+
+# --- COLOUR PALETTE ---
+# Highlights map the whole grid to indices into one shared palette, so painting a cell
+# is a list lookup instead of a new QColor:
+#   0 .. HEAT_STEPS-1 -> traffic light ramp (red -> yellow -> green) by ratio
+#   COLOR_*           -> the fixed colours
+HEAT_STEPS = 256
+NO_COLOR = -1
+COLOR_DROP, COLOR_HIT, COLOR_MISS, COLOR_NEUTRAL = range(HEAT_STEPS, HEAT_STEPS + 4)
+FIXED_COLORS = [(89, 32, 32), (46, 105, 49), (83, 31, 31), (40, 44, 52)]
 
 # --- BASE CLASSES ---
 
@@ -16,7 +27,13 @@ class AggregationMode(StrategyBase):
     def calculate(self, df, setting_val): pass
 
 class HighlightMode(StrategyBase):
-    def get_color(self, val, ctx, setting_val): pass
+    def get_color_indices(self, vals, ctx, setting_val):
+        """
+        Palette index (see get_palette) for every cell of the float matrix vals, NO_COLOR for none.
+        ctx: 'r_min' / 'r_max' (one per row, shaped (rows, 1)), 'g_min' / 'g_max',
+        'prev_val' / 'recent_max' (matrices like vals, NaN where there is none).
+        """
+        return np.full(vals.shape, NO_COLOR, dtype=np.int16)
 
 # --- HELPER FOR UI CONSISTENCY ---
 def make_spin_container(val, min_v, max_v, label_text=None, label_after=False):
@@ -117,19 +134,20 @@ class ModePB(AggregationMode):
             
         rank = rank if rank else 1
         grouper = ['Scenario', 'Sens']
-        if rank == 1: return df.groupby(grouper)['Score'].max().reset_index()
-        def get_nth(g): return g.nlargest(rank).iloc[-1] if len(g) >= rank else np.nan
-        return df.groupby(grouper)['Score'].apply(get_nth).reset_index()
+        if rank == 1: return df.groupby(grouper, observed=True)['Score'].max().reset_index()
+        # Sorted once per run set, so every further rank of the spinner is a lookup
+        order_stats = get_order_stats(df)
+        return order_stats.frame(order_stats.nth_best(rank))
 
 class ModeAvg(AggregationMode):
     name = "Average Score"
     def calculate(self, df, val):
-        return df.groupby(['Scenario', 'Sens'])['Score'].mean().reset_index()
+        return df.groupby(['Scenario', 'Sens'], observed=True)['Score'].mean().reset_index()
 
 class ModeCount(AggregationMode):
     name = "Play Count"
     def calculate(self, df, val):
-        return df.groupby(['Scenario', 'Sens'])['Score'].size().reset_index()
+        return df.groupby(['Scenario', 'Sens'], observed=True)['Score'].size().reset_index()
 
 class ModePercentile(AggregationMode):
     name = "Nth Percentile"
@@ -142,32 +160,26 @@ class ModePercentile(AggregationMode):
 
     def calculate(self, df, p):
         p = (p / 100.0) if p else 0.75
-        return df.groupby(['Scenario', 'Sens'])['Score'].quantile(p).reset_index()
+        order_stats = get_order_stats(df)
+        return order_stats.frame(order_stats.quantile(p))
 
 # --- 2. HIGHLIGHT MODES ---
 
 class HLRowHeatmap(HighlightMode):
     name = "Row Heatmap"
-    def get_color(self, val, ctx, setting):
-        r_min, r_max = ctx['r_min'], ctx['r_max']
-        if r_max <= r_min: return None
-        ratio = (val - r_min)/(r_max - r_min)
-        return get_traffic_light_color(ratio)
+    def get_color_indices(self, vals, ctx, setting):
+        return heat_indices(vals, ctx['r_min'], ctx['r_max'])
 
 class HLGlobalHeatmap(HighlightMode):
     name = "Global Heatmap"
-    def get_color(self, val, ctx, setting):
-        g_min, g_max = ctx['g_min'], ctx['g_max']
-        if g_max <= g_min: return None
-        ratio = (val - g_min)/(g_max - g_min)
-        return get_traffic_light_color(ratio)
+    def get_color_indices(self, vals, ctx, setting):
+        return heat_indices(vals, ctx['g_min'], ctx['g_max'])
 
 class HLDrop(HighlightMode):
     name = "Performance Drop"
-    def get_color(self, val, ctx, setting):
-        if ctx.get('prev_val') is not None:
-            if val < ctx['prev_val']: return QColor(89, 32, 32)
-        return None
+    def get_color_indices(self, vals, ctx, setting):
+        # NaN compares False: no previous value, no colour
+        return np.where(vals < ctx['prev_val'], COLOR_DROP, NO_COLOR).astype(np.int16)
 
 class HLTarget(HighlightMode):
     name = "Target Score"
@@ -178,11 +190,10 @@ class HLTarget(HighlightMode):
     get_setting_value = standard_get_val
     set_setting_value = standard_set_val
 
-    def get_color(self, val, ctx, target):
+    def get_color_indices(self, vals, ctx, target):
         if not target: target = 1000
-        if val >= target: return QColor(46, 105, 49)
-        else: return QColor(83, 31, 31)
-    
+        return np.where(vals >= target, COLOR_HIT, COLOR_MISS).astype(np.int16)
+
 class HLRecent(HighlightMode):
     name = "Recent Success"
     def get_setting_widget(self):
@@ -192,30 +203,45 @@ class HLRecent(HighlightMode):
     get_setting_value = standard_get_val
     set_setting_value = standard_set_val
 
-    def get_color(self, val, ctx, setting):
-        recent = ctx.get('recent_max')
-        if recent is None or pd.isna(recent): return None
-        if recent >= val: return QColor(46, 105, 49)
-        else: return QColor(83, 31, 31)
+    def get_color_indices(self, vals, ctx, setting):
+        recent = ctx['recent_max']
+        out = np.where(recent >= vals, COLOR_HIT, COLOR_MISS).astype(np.int16)
+        out[np.isnan(recent)] = NO_COLOR
+        return out
 
 class HLNone(HighlightMode):
     name = "None"
-    def get_color(self, val, ctx, setting): return None
 
 # --- UTILS ---
-def get_traffic_light_color(ratio):
-    ratio = max(0.0, min(1.0, ratio))
+def heat_indices(vals, lo, hi):
+    """Ramp index of (vals - lo) / (hi - lo), NO_COLOR where the range is empty (hi <= lo)."""
+    lo, hi = np.broadcast_to(lo, vals.shape), np.broadcast_to(hi, vals.shape)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ratio = np.clip((vals - lo) / (hi - lo), 0.0, 1.0)
+    out = np.full(vals.shape, NO_COLOR, dtype=np.int16)
+    ok = (hi > lo) & ~np.isnan(ratio)
+    out[ok] = np.rint(ratio[ok] * (HEAT_STEPS - 1)).astype(np.int16)
+    return out
+
+def traffic_light_ramp(steps=HEAT_STEPS):
+    """(steps, 3) RGB of the red -> yellow -> green ramp at ratios 0 .. 1."""
+    ratio = np.linspace(0.0, 1.0, steps)[:, None]
     c_red = np.array([120, 47, 47])
     c_yel = np.array([122, 118, 50])
     c_grn = np.array([54, 107, 54])
-    
-    if ratio < 0.5:
-        local_r = ratio * 2
-        res = (1 - local_r) * c_red + local_r * c_yel
-    else:
-        local_r = (ratio - 0.5) * 2
-        res = (1 - local_r) * c_yel + local_r * c_grn
-    return QColor(int(res[0]), int(res[1]), int(res[2]))
+
+    local_r = np.where(ratio < 0.5, ratio * 2, (ratio - 0.5) * 2)
+    res = np.where(ratio < 0.5, (1 - local_r) * c_red + local_r * c_yel, (1 - local_r) * c_yel + local_r * c_grn)
+    return res.astype(int)
+
+_palette = {'brushes': None}
+
+def get_palette():
+    """Shared QBrush per palette index (built on first use, after the QApplication exists)."""
+    if _palette['brushes'] is None:
+        rgb = [tuple(c) for c in traffic_light_ramp().tolist()] + FIXED_COLORS
+        _palette['brushes'] = [QBrush(QColor(r, g, b)) for r, g, b in rgb]
+    return _palette['brushes']
 
 AGGREGATION_MODES = [ModePB, ModePercentile, ModeAvg, ModeCount]
 HIGHLIGHT_MODES = [HLRowHeatmap, HLGlobalHeatmap, HLDrop, HLTarget, HLRecent, HLNone]
\ No newline at end of file
@@ -2,6 +2,7 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QLineEdit, QTreeWidget,
                              QTreeWidgetItem, QLabel, QFrame, QMenu)
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QAction
+import bisect
 
 class NavigationWidget(QWidget):
     def __init__(self, state_manager, config_manager=None):
@@ -9,9 +10,11 @@ class NavigationWidget(QWidget):
         self.state_manager = state_manager
         self.config_manager = config_manager # Stores it
         self.scenario_list = []
+        self.recent_list = []
         self.setup_ui()
         
         self.state_manager.data_updated.connect(self.on_data_updated)
+        self.state_manager.data_appended.connect(self.on_data_appended)
         
         if self.config_manager:
             self.refresh_favorites()
@@ -71,15 +74,32 @@ class NavigationWidget(QWidget):
                 QTreeWidgetItem(self.all_root, [scen])
         
         # 3. Always update Recents (Fast and changes every run)
-        self.recents_root.takeChildren()
         recent_df = df.sort_values('Timestamp', ascending=False)
-        recents = recent_df['Scenario'].drop_duplicates().head(25).tolist()
-        for scen in recents:
-            QTreeWidgetItem(self.recents_root, [scen])
+        self.set_recents(recent_df['Scenario'].drop_duplicates().head(25).tolist())
             
         if hasattr(self, 'config_manager'):
             self.refresh_favorites()
 
+    def on_data_appended(self, df, delta):
+        if delta['reenriched']: return self.on_data_updated(df)
+
+        # New scenarios slot into the sorted list, existing items stay untouched
+        for scen in sorted(delta['scenarios'] - set(self.scenario_list)):
+            pos = bisect.bisect_left(self.scenario_list, scen)
+            self.scenario_list.insert(pos, scen)
+            self.all_root.insertChild(pos, QTreeWidgetItem([scen]))
+
+        # Appended runs are the newest ones: they go on top of the old recents
+        new_recents = df['Scenario'].iloc[delta['start']:delta['stop']][::-1].drop_duplicates().tolist()
+        recents = new_recents + [s for s in self.recent_list if s not in new_recents]
+        self.set_recents(recents[:25])
+
+    def set_recents(self, recents):
+        self.recent_list = recents
+        self.recents_root.takeChildren()
+        for scen in recents:
+            QTreeWidgetItem(self.recents_root, [scen])
+
     def refresh_favorites(self):
         if not hasattr(self, 'config_manager'): return
         favs = self.config_manager.get_favorites()
@@ -4,6 +4,7 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTableWidget,
                              QCheckBox, QComboBox, QSpinBox, QDoubleSpinBox)
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QColor
+import bisect
 import pandas as pd
 import numpy as np
 from core.config_manager import ConfigManager
@@ -110,9 +111,11 @@ class OngoingWidget(QWidget):
         
         self.full_df = None
         self.display_df = None # Holds the processed rolling stats
+        self.combo_scores = None # (Scenario, Sens) -> [score sum, sorted scores]: rolling stats of appended runs
         
         self.setup_ui()
         self.state_manager.data_updated.connect(self.on_data_updated)
+        self.state_manager.data_appended.connect(self.on_data_appended)
 
     def setup_ui(self):
         layout = QVBoxLayout(self)
@@ -172,7 +175,7 @@ class OngoingWidget(QWidget):
         df = df.sort_values('Timestamp').copy()
         
         # 2. Define the Grouper
-        g = df.groupby(['Scenario', 'Sens'])
+        g = df.groupby(['Scenario', 'Sens'], observed=True)
         
         # 3. Calculate Rolling Stats using TRANSFORM
         # transform() applies the function and maps the result back to the 
@@ -184,12 +187,46 @@ class OngoingWidget(QWidget):
         df['Rolling_Avg'] = g['Score'].transform(lambda x: x.expanding().mean().shift(1))
         df['Rolling_75'] = g['Score'].transform(lambda x: x.expanding().quantile(0.75).shift(1))
         df['Rolling_PB'] = g['Score'].transform(lambda x: x.expanding().max().shift(1))
+
+        # Running state per combo for on_data_appended (one sort for all combos)
+        codes = g.ngroup().to_numpy()
+        scores = df['Score'].to_numpy(dtype=np.float64)
+        order = np.lexsort((scores, codes))
+        bounds = np.flatnonzero(np.diff(codes[order])) + 1
+        self.combo_scores = {key: [float(part.sum()), part.tolist()]
+                             for key, part in zip(g.size().index, np.split(scores[order], bounds))}
         
         # 4. Filter to recent 50
         self.display_df = df.tail(50).iloc[::-1] # Reverse for table (Newest Top)
         
         self.refresh_view()
 
+    def on_data_appended(self, df, delta):
+        if delta['reenriched'] or self.display_df is None or self.combo_scores is None: return self.on_data_updated(df)
+
+        # Only the new runs (the time sorted tail): each is compared against its combo's
+        # runs so far, then added to them. Older rows in the table keep their values.
+        new_rows = df.iloc[delta['start']:delta['stop']].sort_values('Timestamp')
+        rolling = {'Rolling_Avg': [], 'Rolling_75': [], 'Rolling_PB': []}
+        for scen, sens, score in zip(new_rows['Scenario'], new_rows['Sens'], new_rows['Score']):
+            total, scores = self.combo_scores.setdefault((scen, sens), [0.0, []])
+            n = len(scores)
+            if n:
+                # Same as expanding().quantile(0.75): linear interpolation between the order stats
+                pos = 0.75 * (n - 1); lo = int(pos); hi = min(lo + 1, n - 1)
+                rolling['Rolling_Avg'].append(total / n)
+                rolling['Rolling_75'].append(scores[lo] + (scores[hi] - scores[lo]) * (pos - lo))
+                rolling['Rolling_PB'].append(scores[-1])
+            else:
+                for values in rolling.values(): values.append(np.nan)
+            bisect.insort(scores, float(score))
+            self.combo_scores[(scen, sens)][0] = total + score
+
+        new_rows = new_rows.assign(**rolling)
+        self.display_df = pd.concat([new_rows.iloc[::-1], self.display_df]).head(50)
+        
+        self.refresh_view()
+
 
     def refresh_view(self):
         if self.display_df is None or self.display_df.empty: return
@@ -2,19 +2,22 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QListWidget, QListWidgetItem,
                              QLabel)
 from PyQt6.QtCore import Qt, QThread, pyqtSignal, QMutex
 import pandas as pd
+import numpy as np
 from core.config_manager import ConfigManager
 from core.analytics import stats
 
 class AnalysisWorker(QThread):
-    # Signals: SessionID, ScenPBCount, SensPBCount
-    result_ready = pyqtSignal(int, int, int)
+    # Signal: {SessionID: (ScenPBCount, SensPBCount)} for all requested sessions at once
+    results_ready = pyqtSignal(object)
     finished = pyqtSignal()
     
-    def __init__(self, full_df, session_ids, stack_pbs, count_new):
+    def __init__(self, full_df, session_ids, stack_pbs, count_new, start_row=0):
         super().__init__()
         # We perform a shallow copy. Pandas is usually copy-on-write, so this is safe for reading.
         self.full_df = full_df
         self.session_ids = session_ids
+        # Sessions before this row are not requested, they only provide the scores to beat
+        self.start_row = start_row
         self.stack_pbs = stack_pbs
         self.count_new = count_new
         self.is_aborted = False
@@ -23,39 +26,21 @@ class AnalysisWorker(QThread):
         self.is_aborted = True
 
     def run(self):
-        # We loop through sessions.
-        # To optimize, we can sort them, but the order doesn't strictly matter 
-        # as long as we emit the ID.
-        
-        for sess_id in self.session_ids:
-            if self.is_aborted: return
-            
-            # Extract specific session
-            session_df = self.full_df[self.full_df['SessionID'] == sess_id]
-            if session_df.empty: continue
-            
-            # Run the FAST PATH analysis
-            # We don't need to slice 'prior_history' manually here; 
-            # analyze_session does it. But passing the whole DF repeatedly is slightly inefficient.
-            # However, for Lazy Loading, accuracy > micro-optimization of DF passing.
-            
-            # Note: analyze_session filters history_df based on timestamp.
-            # Passing self.full_df as 'history_df' is correct.
-            
-            try:
-                counts = stats.analyze_session(
-                    session_df, 
-                    self.full_df, 
-                    stack_pbs=self.stack_pbs, 
-                    count_new=self.count_new, 
-                    summary_only=True
-                )
-                
-                if counts and not self.is_aborted:
-                    self.result_ready.emit(sess_id, counts['scen_pb_count'], counts['sens_pb_count'])
-            except Exception as e:
-                # Silently fail on one session rather than crash thread
-                print(f"Error analyzing session {sess_id}: {e}")
+        # Sessions from start_row on in one vectorized pass (same rules as analyze_session summary_only)
+        try:
+            summary = stats.summarize_session_pbs(self.full_df, self.stack_pbs, self.count_new, self.start_row)
+        except Exception as e:
+            print(f"Error analyzing sessions: {e}")
+            self.finished.emit()
+            return
+        
+        if not self.is_aborted:
+            counts = {}
+            for sess_id in self.session_ids:
+                if sess_id in summary.index:
+                    row = summary.loc[sess_id]
+                    counts[sess_id] = (int(row['scen_pb_count']), int(row['sens_pb_count']))
+            self.results_ready.emit(counts)
                 
         self.finished.emit()
 
@@ -75,6 +60,7 @@ class SessionListWidget(QWidget):
         self.setup_ui()
         
         self.state_manager.data_updated.connect(self.on_data_updated)
+        self.state_manager.data_appended.connect(self.on_data_appended)
         self.state_manager.session_selected.connect(self.on_external_selection)
 
     def setup_ui(self):
@@ -111,6 +97,83 @@ class SessionListWidget(QWidget):
         
         self.update_display(stack, count_new)
 
+    def on_data_appended(self, df, delta):
+        if delta['reenriched'] or self.df is None: return self.on_data_updated(df)
+        self.df = df
+
+        stack = self.config_manager.get("session_stack_pbs", default=False)
+        count_new = self.config_manager.get("session_count_new", default=False)
+
+        # Older sessions can't change: new runs only extend the last one or open new ones
+        if self.worker and self.worker.isRunning():
+            self.worker.abort()
+            self.worker.wait()
+        affected = delta['sessions']
+        self.pb_cache = {k: v for k, v in self.pb_cache.items() if k[0] not in affected}
+
+        # SessionID never decreases over the time sorted frame, so affected rows are a suffix
+        first_row = int(np.searchsorted(df['SessionID'].to_numpy(), min(affected), side='left'))
+        sess_stats = self._session_stats(df.iloc[first_row:])
+
+        for i in reversed(range(self.list_widget.count())):
+            if self.list_widget.item(i).data(Qt.ItemDataRole.UserRole) in affected:
+                self.list_widget.takeItem(i)
+
+        # Newest first, so the affected sessions go on top
+        for row_pos, (sess_id, row) in enumerate(sess_stats.iterrows()):
+            item, _ = self._make_item(int(sess_id), row, stack, count_new)
+            self.list_widget.insertItem(row_pos, item)
+            if self.current_selected_id == int(sess_id): self.list_widget.setCurrentItem(item)
+
+        # Affected sessions plus anything the aborted worker had not reached yet
+        sessions_needing_calc = []
+        for i in range(self.list_widget.count()):
+            sid = self.list_widget.item(i).data(Qt.ItemDataRole.UserRole)
+            if (sid, stack, count_new) not in self.pb_cache: sessions_needing_calc.append(sid)
+
+        if sessions_needing_calc:
+            # Only the affected sessions from first_row on, unless the aborted worker left older ones
+            start_row = first_row if min(sessions_needing_calc) >= min(affected) else 0
+            self.worker = AnalysisWorker(self.df, sessions_needing_calc, stack, count_new, start_row)
+            self.worker.results_ready.connect(self.on_worker_results)
+            self.worker.start()
+
+    def _session_stats(self, df):
+        grouped = df.groupby('SessionID')
+        return grouped.agg(
+            StartTime=('Timestamp', 'min'),
+            Count=('Score', 'size'),
+            Duration=('Duration', 'sum'),
+            MostPlayed=('Scenario', lambda x: x.mode().iloc[0] if not x.empty else "N/A")
+        ).sort_index(ascending=False)
+
+    def _make_item(self, sid, row, stack_pbs, count_new):
+        """Returns (item, needs_pb_calc)."""
+        date_str = row['StartTime'].strftime('%Y-%m-%d %H:%M')
+        duration_min = int(row['Duration'] // 60)
+        
+        # Check Cache
+        cache_key = (sid, stack_pbs, count_new)
+        pb_text = "..."
+        needs_calc = cache_key not in self.pb_cache
+        
+        if not needs_calc:
+            scen_pb, sens_pb = self.pb_cache[cache_key]
+            pb_text = self._format_pb_text(scen_pb, sens_pb)
+        
+        # Store metadata we need to update label later
+        label_base = (f"#{sid} - {date_str}\n"
+                      f"{row['MostPlayed']}\n"
+                      f"{row['Count']} Runs ({duration_min}m)")
+        
+        label_full = f"{label_base} | {pb_text}"
+        
+        item = QListWidgetItem(label_full)
+        item.setData(Qt.ItemDataRole.UserRole, sid)
+        # Store base text so we can append PB later
+        item.setData(Qt.ItemDataRole.UserRole + 1, label_base) 
+        return item, needs_calc
+
     def update_display(self, stack_pbs, count_new):
         if self.df is None: return
         
@@ -122,13 +185,7 @@ class SessionListWidget(QWidget):
         self.list_widget.clear()
         
         # 2. Basic Aggregation (Fast) - Just Date, Duration, Count
-        grouped = self.df.groupby('SessionID')
-        sess_stats = grouped.agg(
-            StartTime=('Timestamp', 'min'),
-            Count=('Score', 'size'),
-            Duration=('Duration', 'sum'),
-            MostPlayed=('Scenario', lambda x: x.mode().iloc[0] if not x.empty else "N/A")
-        ).sort_index(ascending=False)
+        sess_stats = self._session_stats(self.df)
         
         # 3. Populate List (Initially without PBs)
         sessions_needing_calc = []
@@ -137,30 +194,8 @@ class SessionListWidget(QWidget):
         
         for sess_id, row in sess_stats.iterrows():
             sid = int(sess_id)
-            date_str = row['StartTime'].strftime('%Y-%m-%d %H:%M')
-            duration_min = int(row['Duration'] // 60)
-            
-            # Check Cache
-            cache_key = (sid, stack_pbs, count_new)
-            pb_text = "..."
-            
-            if cache_key in self.pb_cache:
-                scen_pb, sens_pb = self.pb_cache[cache_key]
-                pb_text = self._format_pb_text(scen_pb, sens_pb)
-            else:
-                sessions_needing_calc.append(sid)
-            
-            # Store metadata we need to update label later
-            label_base = (f"#{sid} - {date_str}\n"
-                          f"{row['MostPlayed']}\n"
-                          f"{row['Count']} Runs ({duration_min}m)")
-            
-            label_full = f"{label_base} | {pb_text}"
-            
-            item = QListWidgetItem(label_full)
-            item.setData(Qt.ItemDataRole.UserRole, sid)
-            # Store base text so we can append PB later
-            item.setData(Qt.ItemDataRole.UserRole + 1, label_base) 
+            item, needs_calc = self._make_item(sid, row, stack_pbs, count_new)
+            if needs_calc: sessions_needing_calc.append(sid)
             
             self.list_widget.addItem(item)
             
@@ -176,34 +211,28 @@ class SessionListWidget(QWidget):
         # 4. Start Background Worker if needed
         if sessions_needing_calc:
             self.worker = AnalysisWorker(self.df, sessions_needing_calc, stack_pbs, count_new)
-            self.worker.result_ready.connect(self.on_worker_result)
+            self.worker.results_ready.connect(self.on_worker_results)
             self.worker.start()
 
-    def on_worker_result(self, sess_id, scen_pb, sens_pb):
+    def on_worker_results(self, counts):
         # 1. Update Cache
-        # We need to know current toggles to store the key correctly.
-        # We can fetch from config or store them in class.
-        # Ideally, we trust the worker was spawned with current config.
-        # But if user toggled quickly, this result might be stale.
-        # Check if worker is still valid (not aborted).
-        if self.worker and self.worker.is_aborted: return
-
-        stack = self.worker.stack_pbs
-        new = self.worker.count_new
-        self.pb_cache[(sess_id, stack, new)] = (scen_pb, sens_pb)
-        
-        # 2. Update UI Row
-        # Find item by iterating (linear search is fast enough for <5000 items)
-        # Optimization: We could store {sess_id: item} map in update_display
-        # But QListWidget isn't too slow.
+        # Results of a replaced / aborted worker were computed on old data or old toggles
+        worker = self.sender()
+        if worker is not self.worker or worker.is_aborted: return
+
+        stack = worker.stack_pbs
+        new = worker.count_new
+        for sess_id, pbs in counts.items():
+            self.pb_cache[(sess_id, stack, new)] = pbs
         
+        # 2. Update UI Rows in one sweep
         for i in range(self.list_widget.count()):
             item = self.list_widget.item(i)
-            if item.data(Qt.ItemDataRole.UserRole) == sess_id:
+            sess_id = item.data(Qt.ItemDataRole.UserRole)
+            if sess_id in counts:
                 base_text = item.data(Qt.ItemDataRole.UserRole + 1)
-                pb_text = self._format_pb_text(scen_pb, sens_pb)
+                pb_text = self._format_pb_text(*counts[sess_id])
                 item.setText(f"{base_text} | {pb_text}")
-                break
 
     def _format_pb_text(self, scen_pb, sens_pb):
         txt = ""
@@ -100,6 +100,8 @@ class SessionReportWidget(QWidget):
         self.config_manager = ConfigManager()
         
         self.full_df = None
+        self.baselines = {} # build_session_baselines() of baselines_df
+        self.baselines_df = None
         self.summary = None
         self.current_session_id = None
         self.stack_pbs = False 
@@ -108,6 +110,7 @@ class SessionReportWidget(QWidget):
         self.setup_ui()
         
         self.state_manager.data_updated.connect(self.on_data_updated)
+        self.state_manager.data_appended.connect(self.on_data_appended)
         self.state_manager.session_selected.connect(self.on_session_selected)
 
     def setup_ui(self):
@@ -206,6 +209,13 @@ class SessionReportWidget(QWidget):
         elif self.current_session_id is not None:
             self.on_session_selected(self.current_session_id)
 
+    def on_data_appended(self, df, delta):
+        if delta['reenriched']: return self.on_data_updated(df)
+        self.full_df = df
+        # Earlier sessions are unaffected by appended runs
+        if self.current_session_id is None: self.on_data_updated(df)
+        elif self.current_session_id in delta['sessions']: self.on_session_selected(self.current_session_id)
+
     def on_session_selected(self, session_id):
         self.current_session_id = session_id 
         if self.full_df is None: return
@@ -215,11 +225,17 @@ class SessionReportWidget(QWidget):
         session_df.sort_values('Timestamp', inplace=True)
         
         # DIRECT PASS: No local filtering
+        # Built once per data load, then every session click skips the history scan
+        if self.baselines_df is not self.full_df:
+            self.baselines = stats.build_session_baselines(self.full_df)
+            self.baselines_df = self.full_df
+
         self.summary = stats.analyze_session(
             session_df, 
             self.full_df, 
             stack_pbs=self.stack_pbs, 
-            count_new=self.count_new
+            count_new=self.count_new,
+            baselines=self.baselines.get(int(session_id))
         )
         
         if not self.summary: return